@@ -0,0 +1,40 @@
+import os
+import sys
+from pathlib import Path
+
+APP_NAME = "YouTubeDownloader"
+
+
+def _ensure_directory(path):
+    path.mkdir(parents=True, exist_ok=True)
+    return str(path)
+
+
+def get_app_data_directory():
+    """저널, 라이브러리 인덱스 등 영구 데이터를 저장할 디렉터리를 반환합니다."""
+    override = os.environ.get("YTD_DATA_DIR")
+    if override:
+        return _ensure_directory(Path(override))
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":  # macOS
+        base = Path.home() / "Library" / "Application Support"
+    else:  # Linux or other Unix-like systems
+        base = Path(os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share")
+    return _ensure_directory(base / APP_NAME)
+
+
+def get_cache_directory(name=None):
+    """지워져도 되는 캐시 데이터를 저장할 디렉터리를 반환합니다."""
+    override = os.environ.get("YTD_CACHE_DIR")
+    if override:
+        base = Path(override)
+    elif sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local") / APP_NAME / "cache"
+    elif sys.platform == "darwin":  # macOS
+        base = Path.home() / "Library" / "Caches" / APP_NAME
+    else:  # Linux or other Unix-like systems
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / APP_NAME
+    if name:
+        base = base / name
+    return _ensure_directory(base)
@@ -0,0 +1,137 @@
+from postprocess import (output_format, remux_command, transcode_command, pick_encoder, EncoderUnavailable,
+                         REMUX_PRIORITY, TRANSCODE_PRIORITY)
+
+# 오디오만 받을 때 고를 수 있는 변환 대상 (이름 -> 라벨, 확장자, 인코더 후보, 그대로 넣을 수 있는 원본 코덱)
+# 인코더 후보는 (인코더, 필요한 하드웨어 가속, 옵션)이며 ffmpeg 조사 결과에 있는 첫 인코더를 씁니다.
+ORIGINAL = 'original'
+AUDIO_TARGETS = {
+    ORIGINAL: {'label': "원본 코덱 유지", 'ext': None, 'encoders': [], 'copy': ()},
+    'mp3': {'label': "MP3", 'ext': 'mp3', 'encoders': [('libmp3lame', None, []), ('libshine', None, [])],
+            'copy': ('mp3',)},
+    'aac': {'label': "AAC (m4a)", 'ext': 'm4a', 'encoders': [('aac', None, []), ('libfdk_aac', None, [])],
+            'copy': ('mp4a', 'aac')},
+    'opus': {'label': "Opus", 'ext': 'opus', 'encoders': [('libopus', None, []), ('opus', None, ['-strict', '-2'])],
+             'copy': ('opus',)},
+    'flac': {'label': "FLAC (무손실)", 'ext': 'flac', 'encoders': [('flac', None, [])], 'copy': ('flac',),
+             'lossless': True},
+}
+AUDIO_BITRATES = (320, 256, 192, 160, 128, 96)  # kbps
+DEFAULT_BITRATE = 192
+
+# 원본 코덱을 그대로 둘 때 쓰는 컨테이너 (코덱 문자열의 앞부분 -> 확장자)
+ORIGINAL_EXTENSIONS = (('mp4a', 'm4a'), ('aac', 'm4a'), ('opus', 'opus'), ('vorbis', 'ogg'), ('mp3', 'mp3'),
+                       ('flac', 'flac'), ('alac', 'm4a'))
+
+
+def is_audio_only(format):
+    return format.get('vcodec') == 'none' and format.get('acodec') not in (None, 'none')
+
+
+def audio_formats(info):
+    """오디오만 있는 포맷을 비트레이트가 높은 순으로 반환합니다."""
+    formats = [f for f in info.get('formats') or [] if is_audio_only(f) and f.get('ext') != 'mhtml']
+    return sorted(formats, key=lambda f: f.get('abr') or f.get('tbr') or 0, reverse=True)
+
+
+def audio_encoder(target, capabilities=None):
+    """변환 대상에 쓸 (인코더, 옵션). ffmpeg에 맞는 인코더가 없으면 None, 원본 유지면 ('copy', [])입니다.
+    조사 전(capabilities가 None)이면 첫 후보를 씁니다."""
+    if target == ORIGINAL:
+        return 'copy', []
+    return pick_encoder(AUDIO_TARGETS[target]['encoders'], 'audio', capabilities)
+
+
+def unavailable_targets(capabilities):
+    """조사한 ffmpeg로는 변환할 수 없는 대상 목록. 조사 전이면 빈 목록입니다."""
+    if not capabilities or not capabilities.get('encoders', {}).get('audio'):
+        return []
+    return [target for target in AUDIO_TARGETS if audio_encoder(target, capabilities) is None]
+
+
+def is_lossy_target(target):
+    return target != ORIGINAL and not AUDIO_TARGETS[target].get('lossless')
+
+
+def format_key(format):
+    """다운로드 중 목록과 라이브러리에서 쓰는 포맷 키. 오디오 변환 작업은 변환 대상까지 넣습니다 (예: 251-mp3-192k)."""
+    base = format.get('format_selector') or format['format_id']
+    target = format.get('audio_target')
+    if not target:
+        return base
+    if is_lossy_target(target):
+        return f"{base}-{target}-{format.get('audio_bitrate') or DEFAULT_BITRATE}k"
+    return f"{base}-{target}"
+
+
+def target_extension(target, codec, source_ext):
+    """변환 결과 파일의 확장자. 원본 코덱을 유지하면 코덱에 맞는 오디오 컨테이너를 고릅니다."""
+    if target != ORIGINAL:
+        return AUDIO_TARGETS[target]['ext']
+    codec = (codec or '').lower()
+    for prefix, ext in ORIGINAL_EXTENSIONS:
+        if codec.startswith(prefix):
+            return ext
+    return source_ext or 'm4a'
+
+
+def audio_command(ffmpeg_path, source, output, codec, target, bitrate, source_bitrate=None, capabilities=None):
+    """받은 오디오를 대상 형식으로 만드는 (종류, ffmpeg 명령, 우선순위)를 반환합니다.
+
+    코덱이 같고 원본 비트레이트가 요청한 값 이하이면 다시 인코딩하지 않고 리먹스합니다.
+    변환해야 하는데 ffmpeg에 맞는 인코더가 없으면 EncoderUnavailable을 냅니다.
+    """
+    spec = AUDIO_TARGETS[target]
+    ext = target_extension(target, codec, None)
+    codec = (codec or '').lower()
+    same_codec = target == ORIGINAL or (codec and codec.startswith(spec['copy']))
+    small_enough = not is_lossy_target(target) or not source_bitrate or source_bitrate <= bitrate * 1.05
+    if same_codec and small_enough:
+        return "remux", remux_command(ffmpeg_path, source, output, ext), REMUX_PRIORITY
+    encoder = audio_encoder(target, capabilities)
+    if encoder is None:
+        names = ", ".join(name for name, _, _ in spec['encoders'])
+        raise EncoderUnavailable(f"{spec['label']}로 변환하려면 ffmpeg에 인코더가 필요합니다 (후보: {names})")
+    codec_args = ["-map", "0:a:0", "-vn", "-c:a", encoder[0], *encoder[1]]
+    if is_lossy_target(target):
+        codec_args += ["-b:a", f"{bitrate}k"]
+    codec_args += ["-f", output_format(ext)]
+    return "transcode", transcode_command(ffmpeg_path, source, output, codec_args), TRANSCODE_PRIORITY
+
+
+def audio_tags(info):
+    """info dict에서 오디오 파일에 쓸 태그를 만듭니다. 원본 URL은 라이브러리 가져오기에서 영상을 찾는 데 씁니다."""
+    upload_date = info.get('release_date') or info.get('upload_date') or ''
+    url = info.get('webpage_url') or info.get('original_url')
+    tags = {
+        'title': info.get('track') or info.get('title'),
+        'artist': info.get('artist') or info.get('creator') or info.get('uploader') or info.get('channel'),
+        'album': info.get('album'),
+        'date': f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:8]}" if len(upload_date) == 8 else None,
+        'website': url,
+        'comment': url,
+    }
+    return {key: value for key, value in tags.items() if value}
+
+
+def write_tags(path, info):
+    """mutagen으로 제목/아티스트/앨범/날짜/원본 URL 태그를 씁니다. 쓰지 못하면 False를 반환합니다."""
+    try:
+        import mutagen
+    except ImportError:
+        return False
+    try:
+        media = mutagen.File(path, easy=True)
+        if media is None:
+            return False
+        if media.tags is None:
+            media.add_tags()
+        for key, value in audio_tags(info).items():
+            try:
+                media[key] = value
+            except (KeyError, ValueError):
+                pass  # 형식마다 지원하는 키가 다름 (MP4에는 website가 없음 등)
+        media.save()
+        return True
+    except Exception as e:
+        print(f"Error writing audio tags to {path}: {e}")
+        return False
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import deque
+
+BURST_SECONDS = 0.5  # 쉬었던 작업이 한 번에 몰아 받을 수 있는 최대 시간
+THROUGHPUT_WINDOW = 3.0  # 처리량 계산에 쓰는 최근 구간 (초)
+ACTIVE_SECONDS = 2.0  # 이 시간 안에 바이트를 받았거나 한도 때문에 기다리는 작업만 전체 한도를 나눠 씀
+
+
+class _JobState:
+    def __init__(self):
+        self.ready_at = 0.0  # 이 작업이 다음 바이트를 받아도 되는 시각 (가상 시계)
+        self.last_at = None  # 마지막으로 바이트를 받은 시각
+        self.samples = deque()  # (monotonic time, bytes)
+        self.window_bytes = 0
+
+
+class BandwidthGovernor:
+    """모든 다운로드 작업이 함께 쓰는 토큰 버킷 방식의 대역폭 제한기입니다.
+
+    작업은 받은 바이트만큼 consume()을 호출하고, 한도를 넘으면 그 자리에서 잠시 멈춥니다.
+    전체 한도는 지금 바이트를 받고 있는 작업들이 똑같이 나눠 쓰며(작업당 한도가 있으면 그 이하),
+    추출이나 병합 중이라 받는 것이 없는 작업은 몫을 차지하지 않습니다.
+    한도는 실행 중에 바꿔도 바로 다음 consume()부터 적용됩니다. 0은 무제한입니다.
+    """
+
+    def __init__(self, total_rate=0, per_job_rate=0):
+        self.lock = threading.Lock()
+        self.total_rate = total_rate  # bytes/s
+        self.per_job_rate = per_job_rate  # bytes/s
+        self.global_ready_at = 0.0
+        self.jobs = {}
+
+    def set_total_rate(self, rate):
+        with self.lock:
+            self.total_rate = max(0, rate)
+
+    def set_per_job_rate(self, rate):
+        with self.lock:
+            self.per_job_rate = max(0, rate)
+
+    def register(self, job):
+        with self.lock:
+            self.jobs.setdefault(job, _JobState())
+
+    def unregister(self, job):
+        with self.lock:
+            self.jobs.pop(job, None)
+
+    def active_jobs(self, now):
+        """최근 ACTIVE_SECONDS 안에 바이트를 받았거나 아직 한도 때문에 기다리는 작업 수."""
+        since = now - ACTIVE_SECONDS
+        return sum(1 for state in self.jobs.values()
+                   if state.ready_at >= since or (state.last_at is not None and state.last_at >= since))
+
+    def job_rate(self, now=None):
+        """지금 작업 하나가 받을 수 있는 속도 (받고 있는 작업끼리 공평 분배). 0이면 무제한."""
+        rates = []
+        if self.total_rate:
+            now = time.monotonic() if now is None else now
+            rates.append(self.total_rate / max(1, self.active_jobs(now)))
+        if self.per_job_rate:
+            rates.append(self.per_job_rate)
+        return min(rates) if rates else 0
+
+    def consume(self, job, nbytes, cancel_event=None):
+        """nbytes를 받았다고 알립니다. 한도를 넘었으면 필요한 만큼 기다립니다."""
+        if nbytes <= 0:
+            return
+        with self.lock:
+            state = self.jobs.get(job)
+            if state is None:
+                state = self.jobs[job] = _JobState()
+            now = time.monotonic()
+            self._record(state, now, nbytes)
+            state.last_at = now
+
+            wait = 0.0
+            job_rate = self.job_rate(now)
+            if job_rate:
+                state.ready_at = max(state.ready_at, now - BURST_SECONDS) + nbytes / job_rate
+                wait = state.ready_at - now
+            if self.total_rate:
+                self.global_ready_at = max(self.global_ready_at, now - BURST_SECONDS) + nbytes / self.total_rate
+                wait = max(wait, self.global_ready_at - now)
+        if wait > 0:
+            if cancel_event is not None:
+                cancel_event.wait(wait)
+            else:
+                time.sleep(wait)
+
+    @staticmethod
+    def _record(state, now, nbytes):
+        state.samples.append((now, nbytes))
+        state.window_bytes += nbytes
+        while state.samples and state.samples[0][0] < now - THROUGHPUT_WINDOW:
+            state.window_bytes -= state.samples.popleft()[1]
+
+    @staticmethod
+    def _throughput(state, now):
+        while state.samples and state.samples[0][0] < now - THROUGHPUT_WINDOW:
+            state.window_bytes -= state.samples.popleft()[1]
+        return state.window_bytes / THROUGHPUT_WINDOW
+
+    def throughput(self, job):
+        """작업의 최근 실제 처리량 (bytes/s)."""
+        with self.lock:
+            state = self.jobs.get(job)
+            return self._throughput(state, time.monotonic()) if state else 0.0
+
+    def total_throughput(self):
+        with self.lock:
+            now = time.monotonic()
+            return sum(self._throughput(state, now) for state in self.jobs.values())
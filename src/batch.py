@@ -0,0 +1,83 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from downloader import get_video_formats, load_yt_dlp
+from metadata_cache import normalize_video_key
+from playlist import is_playlist_url, select_format, describe_format
+
+DEFAULT_LOOKUP_WORKERS = 4  # 동시에 추출하는 링크 수
+_URL_PATTERN = re.compile(r"https?://[^\s\"'<>,;]+")
+
+
+def parse_urls(text):
+    """붙여 넣은 글이나 텍스트 파일에서 링크를 찾습니다. 같은 영상은 한 번만, 나온 순서대로 반환합니다.
+
+    한 줄에 여러 칸이 있는 표 복사(탭/쉼표 구분)도 받으며, '#'으로 시작하는 줄은 무시합니다.
+    """
+    urls = []
+    seen = set()
+    for line in text.splitlines():
+        if line.lstrip().startswith('#'):
+            continue
+        for url in _URL_PATTERN.findall(line):
+            key = normalize_video_key(url)
+            if key not in seen:
+                seen.add(key)
+                urls.append(url)
+    return urls
+
+
+def choose_formats(infos, format_selector, ffmpeg_path=None):
+    """포맷 정책(선택식)을 각 info에 적용해 describe_format 결과(맞는 포맷이 없으면 None) 목록을 반환합니다."""
+    yt_dlp = load_yt_dlp()
+
+    with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True, 'ffmpeg_location': ffmpeg_path}) as ydl:
+        chosen = [select_format(ydl, info, format_selector) for info in infos]
+    return [describe_format(c) if c is not None else None for c in chosen]
+
+
+class BatchLookup:
+    """여러 링크의 영상 정보를 정해진 수만큼만 동시에 추출합니다. Qt를 import하지 않습니다.
+
+    링크마다 on_result(순번, info, 고른 포맷, 적용한 선택식) 또는 on_error(순번, 메시지)를 추출 스레드에서
+    호출합니다. 도중에 format_selector를 바꾸면 그 뒤에 끝나는 링크부터 새 정책을 적용합니다.
+    """
+
+    def __init__(self, urls, ffmpeg_path, metadata_cache=None, format_selector=None,
+                 max_workers=DEFAULT_LOOKUP_WORKERS):
+        self.urls = list(urls)
+        self.ffmpeg_path = ffmpeg_path
+        self.metadata_cache = metadata_cache
+        self.format_selector = format_selector
+        self.max_workers = max_workers
+        self.cancelled = threading.Event()
+        self.executor = None
+
+    def start(self, on_result, on_error):
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        for index, url in enumerate(self.urls):
+            self.executor.submit(self.lookup, index, url, on_result, on_error)
+        self.executor.shutdown(wait=False)
+
+    def lookup(self, index, url, on_result, on_error):
+        if self.cancelled.is_set():
+            return
+        if is_playlist_url(url):
+            on_error(index, "재생목록 링크는 따로 검색하세요")
+            return
+        try:
+            info = get_video_formats(url, self.ffmpeg_path, self.metadata_cache, {'quiet': True, 'no_warnings': True},
+                                     self.cancelled.is_set)
+            selector = self.format_selector
+            chosen = choose_formats([info], selector, self.ffmpeg_path)[0] if selector else None
+        except Exception as e:
+            if not self.cancelled.is_set():
+                on_error(index, str(e))
+            return
+        if not self.cancelled.is_set():
+            on_result(index, info, chosen, selector)
+
+    def cancel(self):
+        """남은 링크는 건너뛰고, 추출 중인 링크는 다음 요청 전에 멈춥니다."""
+        self.cancelled.set()
@@ -0,0 +1,142 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from playlist_view import format_duration
+
+COLUMNS = ["#", "제목", "채널", "길이", "포맷", "크기", "상태"]
+FORMAT_COLUMN = 4
+STATUS_COLUMN = 6
+SORT_ROLE = Qt.ItemDataRole.UserRole  # 정렬할 때 쓰는 원래 값 (초, 바이트, 해상도)
+
+# 항목 상태
+LOOKING = "확인 중"
+READY = "준비됨"
+NO_FORMAT = "맞는 포맷 없음"
+FAILED = "오류"
+QUEUED = "대기열에 추가됨"
+
+
+def format_size(size_bytes):
+    if not size_bytes:
+        return ""
+    if size_bytes < 1024 * 1024 * 1024:
+        return f"{size_bytes / (1024 * 1024):.1f} MB"
+    return f"{size_bytes / (1024 * 1024 * 1024):.2f} GB"
+
+
+def format_label(format):
+    if format is None:
+        return ""
+    if format.get('vcodec') == 'none':
+        return f"오디오 {format.get('ext', '')}"
+    height = format.get('height')
+    return f"{height}p {format.get('ext', '')}" if height else format.get('ext', '')
+
+
+class BatchModel(QAbstractTableModel):
+    """여러 링크 검색 결과 모델. 링크마다 정보를 찾는 대로 행이 채워집니다.
+
+    정렬은 QSortFilterProxyModel에 SORT_ROLE을 지정해 원래 값으로 합니다.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []  # {'url', 'title', 'channel', 'duration', 'thumbnail', 'info', 'format', 'status', 'error'}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        item = self.rows[row]
+        column = index.column()
+        format = item['format']
+        if role == SORT_ROLE:
+            if column == 0:
+                return row
+            if column == 3:
+                return item['duration'] or 0
+            if column == FORMAT_COLUMN:
+                return (format or {}).get('height') or 0
+            if column == 5:
+                return (format or {}).get('filesize') or 0
+            return str(self.data(index) or "")
+        if role == Qt.ItemDataRole.ToolTipRole:
+            if column == STATUS_COLUMN and item['error']:
+                return item['error']
+            if column == 1:
+                return item['url']
+            return None
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if column == 0:
+            return str(row + 1)
+        if column == 1:
+            return item['title']
+        if column == 2:
+            return item['channel']
+        if column == 3:
+            return format_duration(item['duration'])
+        if column == FORMAT_COLUMN:
+            return format_label(format)
+        if column == 5:
+            return format_size((format or {}).get('filesize'))
+        if column == STATUS_COLUMN:
+            return item['status']
+        return None
+
+    def set_urls(self, urls):
+        self.beginResetModel()
+        self.rows = [{'url': url, 'title': url, 'channel': "", 'duration': None, 'thumbnail': None, 'info': None,
+                      'format': None, 'status': LOOKING, 'error': None} for url in urls]
+        self.endResetModel()
+
+    def clear(self):
+        self.set_urls([])
+
+    def set_info(self, row, info, format):
+        item = self.rows[row]
+        item.update(title=info.get('title') or item['url'], channel=info.get('channel') or info.get('uploader') or "",
+                    duration=info.get('duration'), thumbnail=info.get('thumbnail'), info=info)
+        self.set_format(row, format)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+
+    def set_format(self, row, format):
+        """포맷 정책을 적용한 결과를 반영합니다. 대기열에 넣은 항목은 바꾸지 않습니다."""
+        item = self.rows[row]
+        if item['status'] == QUEUED:
+            return
+        item['format'] = format
+        item['status'] = READY if format is not None else NO_FORMAT
+        self.dataChanged.emit(self.index(row, FORMAT_COLUMN), self.index(row, STATUS_COLUMN))
+
+    def set_error(self, row, message):
+        item = self.rows[row]
+        item.update(status=FAILED, error=message)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+
+    def mark_queued(self, row):
+        self.rows[row]['status'] = QUEUED
+        index = self.index(row, STATUS_COLUMN)
+        self.dataChanged.emit(index, index)
+
+    def rows_with_status(self, status):
+        return [row for row, item in enumerate(self.rows) if item['status'] == status]
+
+    def counts(self):
+        counts = {}
+        for item in self.rows:
+            counts[item['status']] = counts.get(item['status'], 0) + 1
+        return counts
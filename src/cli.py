@@ -0,0 +1,324 @@
+"""GUI 없이 여러 영상을 내려받는 명령행 진입점.
+
+URL 목록을 파일이나 표준 입력에서 한 줄에 하나씩 읽고, 진행 상황과 결과를
+표준 출력에 JSON 한 줄씩 기록합니다. PyQt6를 import하지 않습니다.
+
+    python cli.py -i urls.txt -o ~/Videos -c 4
+    cat urls.txt | python cli.py -o ~/Videos > log.jsonl
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+from bandwidth import BandwidthGovernor
+from downloader import DownloadJob
+from library import LibraryIndex
+from metadata_cache import MetadataCache
+from playlist import is_playlist_url, iter_playlist, QUALITY_PRESETS, AUDIO_PRESET
+from scheduler import DownloadScheduler
+from segmented import MAX_SEGMENTS
+from postprocess import PostProcessPool
+from audio import AUDIO_TARGETS, DEFAULT_BITRATE, unavailable_targets
+from ffmpeg_probe import shared_probe
+from http_pool import shared_pools, DEFAULT_POOL_SIZE
+from retry_policy import retry_engine
+from metrics import event_log, parse_level, LEVELS, MetricsServer
+
+DEFAULT_FORMAT = QUALITY_PRESETS[0][1]
+PROGRESS_EVENT_INTERVAL = 1.0  # 작업당 progress 이벤트 최소 간격 (초)
+
+# yt-dlp가 표준 출력에 로그를 쓰지 않도록 함 (표준 출력은 JSON 이벤트 전용)
+YDL_OPTIONS = {
+    'quiet': True,
+    'no_warnings': True,
+    'noprogress': True,
+    'logtostderr': True,
+}
+
+
+class EventWriter:
+    """이벤트를 JSON 한 줄씩 씁니다. 여러 작업 스레드에서 호출됩니다."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def emit(self, event, **fields):
+        record = {"time": round(time.time(), 3), "event": event}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+class CliJob(DownloadJob):
+    def __init__(self, batch, job_id, url, format_spec, output_dir, ffmpeg_path, metadata_cache, library=None,
+                 governor=None, segments=1, stream_merge=False, postprocess_pool=None, audio=None):
+        format = {'format_id': format_spec, 'format_selector': format_spec, 'ext': 'mp4'}
+        format.update(audio or {})
+        super().__init__(job_id, url, format, output_dir, None, ffmpeg_path, metadata_cache,
+                         ydl_options=YDL_OPTIONS, library=library, governor=governor, segments=segments,
+                         stream_merge=stream_merge, postprocess_pool=postprocess_pool)
+        self.batch = batch
+        self.last_progress_event = 0
+        self.started_at = None
+
+    def on_started(self):
+        self.started_at = time.monotonic()
+        self.batch.events.emit("started", job=self.job_id, url=self.url)
+
+    def on_progress(self, progress, time_left):
+        now = time.monotonic()
+        if time_left not in ("Merging...", "Complete") and now - self.last_progress_event < PROGRESS_EVENT_INTERVAL:
+            return
+        self.last_progress_event = now
+        self.batch.events.emit("progress", job=self.job_id, progress=round(progress, 1), eta=time_left,
+                               downloaded_bytes=self.downloaded_bytes, speed=int(self.speed), merging=self.merging,
+                               **self.connection_fields())
+
+    def on_finished(self):
+        self.batch.events.emit("finished", job=self.job_id, url=self.url, title=self.video_title,
+                               path=self.full_path, format_id=self.format.get('format_id'),
+                               elapsed=round(time.monotonic() - self.started_at, 3), **self.connection_fields(),
+                               **self.postprocess_fields(), **self.retry_fields(), **self.metrics.fields())
+        self.batch.job_done(True)
+
+    def connection_fields(self):
+        """구간 다운로드면 구간 수를, 조각(DASH/HLS) 다운로드면 동시 조각 수와 마지막 조각 파일의 처리량을 넣습니다."""
+        if self.segmented_download is not None and self.segmented_download.segment_count:
+            return {"segments": self.segmented_download.segment_count}
+        if self.fragment_concurrency:
+            return {"fragments": self.fragment_concurrency, "fragment_throughput": int(self.fragment_throughput)}
+        return {}
+
+    def postprocess_fields(self):
+        """후처리 풀에서 병합했으면 대기 시간, 실행 시간, CPU 시간(초)을 넣습니다."""
+        task = self.postprocess_task
+        if task is None:
+            return {}
+        return {"postprocess": {"kind": task.kind, "wait_time": round(task.wait_time, 3),
+                                "wall_time": round(task.wall_time or 0, 3),
+                                "cpu_time": None if task.cpu_time is None else round(task.cpu_time, 3)}}
+
+    def retry_fields(self):
+        """재시도가 있었으면 재시도 수와 백오프로 기다린 시간(초)을 넣습니다."""
+        if not self.retries:
+            return {}
+        return {"retries": self.retries, "backoff": round(self.backoff_seconds, 3)}
+
+    def on_error(self, message):
+        self.batch.events.emit("error", job=self.job_id, url=self.url, error=message, **self.retry_fields())
+        self.batch.job_done(False)
+
+    def on_deferred(self, host, retry_at):
+        # 끝난 작업이 아님: 스케줄러가 차단기가 닫히면 다시 실행
+        self.batch.events.emit("deferred", job=self.job_id, url=self.url, host=host,
+                               retry_in=round(max(0, retry_at - time.time()), 1), **self.retry_fields())
+
+    def on_skipped(self, path):
+        self.batch.events.emit("skipped", job=self.job_id, url=self.url, path=path)
+        self.batch.job_done(True, skipped=True)
+
+
+class Batch:
+    """입력된 URL들을 스케줄러에 넣고 모두 끝날 때까지 기다립니다."""
+
+    def __init__(self, events, output_dir, format_spec, concurrency, ffmpeg_path, metadata_cache=None, library=None,
+                 governor=None, segments=1, stream_merge=False, audio=None):
+        self.events = events
+        self.audio = audio  # 오디오만 받을 때의 변환 설정 (audio_target, audio_bitrate)
+        self.segments = segments
+        self.stream_merge = stream_merge
+        self.postprocess_pool = PostProcessPool()
+        self.library = library
+        self.governor = governor
+        self.output_dir = output_dir
+        self.format_spec = format_spec
+        self.ffmpeg_path = ffmpeg_path
+        self.metadata_cache = metadata_cache
+        self.scheduler = DownloadScheduler(max_downloads=concurrency)
+        self.jobs = {}
+        self.condition = threading.Condition()
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0  # 라이브러리에 이미 있어 건너뛴 작업 수
+        self.expansion_errors = 0  # 펼치지 못한 재생목록 수
+
+    def add_url(self, url):
+        if is_playlist_url(url):
+            self.add_playlist(url)
+        else:
+            self.submit(url)
+
+    def add_playlist(self, url):
+        try:
+            entries = iter_playlist(url, self.ffmpeg_path)
+            playlist = next(entries)
+            self.events.emit("playlist", url=url, title=playlist['title'], count=playlist['count'])
+            for entry in entries:
+                self.submit(entry['url'], playlist=url)
+        except Exception as e:
+            self.events.emit("error", url=url, error=str(e))
+            self.expansion_errors += 1
+
+    def submit(self, url, playlist=None):
+        with self.condition:
+            self.submitted += 1
+            job_id = self.submitted
+        job = CliJob(self, job_id, url, self.format_spec, self.output_dir, self.ffmpeg_path, self.metadata_cache,
+                     self.library, self.governor, self.segments, self.stream_merge, self.postprocess_pool, self.audio)
+        self.jobs[job_id] = job
+        fields = {"playlist": playlist} if playlist else {}
+        self.events.emit("queued", job=job_id, url=url, **fields)
+        self.scheduler.submit(job_id, job)
+
+    def job_done(self, succeeded, skipped=False):
+        with self.condition:
+            if skipped:
+                self.skipped += 1
+            if succeeded:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            self.condition.notify_all()
+
+    def wait(self):
+        with self.condition:
+            # 짧게 나눠 기다려야 메인 스레드에서 Ctrl+C를 받을 수 있음
+            while self.succeeded + self.failed < self.submitted:
+                self.condition.wait(0.5)
+
+    def cancel_all(self):
+        for job_id, job in self.jobs.items():
+            self.scheduler.cancel(job_id)
+            job.cancel()
+
+
+def read_urls(stream):
+    for line in stream:
+        url = line.strip()
+        if url and not url.startswith('#'):
+            yield url
+
+
+def find_ffmpeg(path=None):
+    """--ffmpeg 인자, 같이 배포된 ffmpeg, PATH 순서로 찾습니다."""
+    if path:
+        return path
+    bundled = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ffmpeg')
+    if os.path.isfile(bundled):
+        return bundled
+    return shutil.which('ffmpeg')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="YouTube 영상을 GUI 없이 내려받습니다. 결과는 JSON Lines로 출력합니다.")
+    parser.add_argument("-i", "--input", default="-",
+                        help="URL 목록 파일 (한 줄에 하나, '#'으로 시작하면 무시). 기본값: 표준 입력")
+    parser.add_argument("-o", "--output-dir", default=os.getcwd(), help="저장할 폴더. 기본값: 현재 폴더")
+    parser.add_argument("-f", "--format",
+                        help=f"yt-dlp 포맷 선택식. 기본값: {DEFAULT_FORMAT} (--audio이면 {AUDIO_PRESET[1]})")
+    parser.add_argument("-c", "--concurrency", type=int, default=3, help="동시 다운로드 수. 기본값: 3")
+    parser.add_argument("--ffmpeg", help="ffmpeg 실행 파일 경로")
+    parser.add_argument("--rate-limit", type=float, default=0, metavar="MB/S",
+                        help="전체 다운로드 속도 제한 (MB/s, 작업들이 똑같이 나눠 씀). 기본값: 무제한")
+    parser.add_argument("--per-job-limit", type=float, default=0, metavar="MB/S",
+                        help="작업 하나의 속도 제한 (MB/s). 기본값: 무제한")
+    parser.add_argument("--segments", type=int, default=4, metavar="N",
+                        help=f"단일 파일 포맷을 나눠 받을 연결 수 (1~{MAX_SEGMENTS}, 1이면 나누지 않음). 기본값: 4")
+    parser.add_argument("--stream-merge", action="store_true",
+                        help="비디오와 오디오를 받으면서 바로 ffmpeg로 합칩니다 (중간 파일 없음, 속도 제한과 함께 쓰면 무시됨)")
+    parser.add_argument("--audio", choices=list(AUDIO_TARGETS), metavar="CODEC",
+                        help=f"오디오 스트림만 받아 변환합니다 ({', '.join(AUDIO_TARGETS)}). "
+                             "코덱이 같으면 다시 인코딩하지 않고, 태그를 씁니다")
+    parser.add_argument("--audio-bitrate", type=int, default=DEFAULT_BITRATE, metavar="KBPS",
+                        help=f"--audio 변환 비트레이트 (kbps, 무손실/원본 유지는 무시). 기본값: {DEFAULT_BITRATE}")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE, metavar="N",
+                        help=f"호스트마다 다시 쓰려고 열어 두는 연결 수 (영상 서버는 더 많이 둠). 기본값: {DEFAULT_POOL_SIZE}")
+    parser.add_argument("--log-file", metavar="PATH",
+                        help="작업별 지표와 엔진 이벤트를 JSON Lines로 기록할 파일. 기본값: 앱 데이터 폴더의 events.jsonl")
+    parser.add_argument("--log-level", choices=list(LEVELS), default="info",
+                        help="기록할 이벤트 수준 (debug이면 진행 상황까지 기록). 기본값: info")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="127.0.0.1:PORT/metrics에서 Prometheus 형식 지표를 내줍니다 (0이면 빈 포트)")
+    parser.add_argument("--no-cache", action="store_true", help="영상 정보 캐시를 사용하지 않습니다")
+    parser.add_argument("--no-library", action="store_true",
+                        help="라이브러리 색인을 사용하지 않습니다 (이미 받은 영상도 다시 받음)")
+    parser.add_argument("--import-library", action="append", default=[], metavar="DIR",
+                        help="시작 전에 폴더의 기존 파일을 라이브러리 색인에 가져옵니다 (여러 번 지정 가능)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.isdir(args.output_dir) or not os.access(args.output_dir, os.W_OK):
+        print(f"Output directory is not writable: {args.output_dir}", file=sys.stderr)
+        return 2
+
+    # 이벤트는 표준 출력에만 쓰고, 실행하는 동안 엔진의 print 로그는 표준 오류로 보냄
+    events = EventWriter(sys.stdout)
+    with contextlib.redirect_stdout(sys.stderr):
+        return run(args, events)
+
+
+def run(args, events):
+    """입력의 URL을 모두 받고 종료 코드를 반환합니다."""
+    metadata_cache = None if args.no_cache else MetadataCache()
+    library = None if args.no_library else LibraryIndex()
+    if library is not None:
+        for directory in args.import_library:
+            events.emit("library_import", directory=directory, imported=library.import_directory(directory))
+    shared_pools.configure(default_size=args.pool_size)
+    event_log.configure(args.log_file, parse_level(args.log_level))
+    if args.metrics_port is not None:
+        try:
+            events.emit("metrics", url=f"http://127.0.0.1:{MetricsServer(args.metrics_port).start()}/metrics")
+        except OSError as e:
+            print(f"Error starting metrics server: {e}")
+    governor = BandwidthGovernor(int(args.rate_limit * 1024 * 1024), int(args.per_job_limit * 1024 * 1024))
+    ffmpeg_path = find_ffmpeg(args.ffmpeg)
+    if ffmpeg_path:
+        # 인코더 목록을 조사해 두면 병합/변환이 하드웨어 인코더를 쓰거나 없는 인코더를 미리 알림 (결과는 캐시됨)
+        capabilities = shared_probe().probe(ffmpeg_path)
+        if args.audio in unavailable_targets(capabilities):
+            print(f"ffmpeg at {ffmpeg_path} has no encoder for --audio {args.audio}", file=sys.stderr)
+            return 2
+    audio = {'audio_target': args.audio, 'audio_bitrate': max(8, args.audio_bitrate)} if args.audio else None
+    format_spec = args.format or (AUDIO_PRESET[1] if args.audio else DEFAULT_FORMAT)
+    batch = Batch(events, args.output_dir, format_spec, max(1, args.concurrency), ffmpeg_path,
+                  metadata_cache, library, governor, max(1, min(args.segments, MAX_SEGMENTS)), args.stream_merge,
+                  audio)
+    started = time.monotonic()
+    try:
+        stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        with stream:
+            for url in read_urls(stream):
+                batch.add_url(url)
+        batch.wait()
+    except KeyboardInterrupt:
+        batch.cancel_all()
+        events.emit("cancelled", submitted=batch.submitted, succeeded=batch.succeeded, failed=batch.failed)
+        return 130
+
+    events.emit("summary", submitted=batch.submitted, succeeded=batch.succeeded, skipped=batch.skipped,
+                failed=batch.failed, playlist_errors=batch.expansion_errors, elapsed=round(time.monotonic() - started, 3))
+    connections = shared_pools.stats()
+    events.emit("connections", requests=connections['requests'], connections=connections['connections'],
+                reuse_ratio=round(connections['reuse_ratio'], 3),
+                average_handshake=round(connections['average_handshake'], 4),
+                handshake_seconds=round(connections['handshake_seconds'], 3))
+    circuits = retry_engine.stats()
+    if circuits:
+        events.emit("circuits", hosts={host: {'state': c['state'], 'trips': c['trips']} for host, c in circuits.items()})
+    return 0 if batch.failed == 0 and batch.expansion_errors == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
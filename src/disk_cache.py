@@ -0,0 +1,95 @@
+import os
+import threading
+
+
+class DiskCache:
+    """디렉터리 하나를 전체 크기 상한이 있는 LRU 캐시로 사용합니다.
+
+    파일의 mtime을 마지막 사용 시각으로 쓰며, 상한을 넘으면 오래된 파일부터 지웁니다.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.usage = 0
+        self.entries = {}  # file name -> size
+        self._scan()
+
+    def _scan(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        size = entry.stat().st_size
+                        self.entries[entry.name] = size
+                        self.usage += size
+        except OSError as e:
+            print(f"Error scanning cache directory {self.directory}: {e}")
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def read(self, name):
+        """저장된 바이트를 반환합니다. 없으면 None."""
+        path = self.path(name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # LRU 순서 갱신
+        except OSError:
+            pass
+        return data
+
+    def write(self, name, data):
+        path = self.path(name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing cache file {path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+        with self.lock:
+            self.usage += len(data) - self.entries.get(name, 0)
+            self.entries[name] = len(data)
+            if self.usage > self.max_bytes:
+                self._evict()
+        return True
+
+    def remove(self, name):
+        with self.lock:
+            self._remove(name)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _remove(self, name):
+        try:
+            os.remove(self.path(name))
+        except OSError:
+            pass
+        self.usage -= self.entries.pop(name, 0)
+
+    def _evict(self):
+        # 상한의 90%까지 오래된 순서로 제거
+        target = self.max_bytes * 0.9
+        entries = []
+        for name in self.entries:
+            try:
+                entries.append((os.path.getmtime(self.path(name)), name))
+            except OSError:
+                entries.append((0, name))
+        for _, name in sorted(entries):
+            if self.usage <= target:
+                break
+            self._remove(name)
@@ -0,0 +1,287 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QRect, QRectF, QEvent, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QPixmap, QPen
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+
+COLUMNS = ["썸네일", "비디오 이름", "해상도", "파일 크기", "진행률", "남은 시간", "속도", "상태"]
+(THUMBNAIL_COLUMN, TITLE_COLUMN, RESOLUTION_COLUMN, SIZE_COLUMN, PROGRESS_COLUMN, TIME_COLUMN, SPEED_COLUMN,
+ STATUS_COLUMN) = range(8)
+
+# 델리게이트가 사용하는 사용자 정의 역할
+ProgressRole = Qt.ItemDataRole.UserRole + 1  # (progress, color)
+CancellableRole = Qt.ItemDataRole.UserRole + 2  # 취소 버튼 표시 여부
+
+MERGED_COLOR = "#4CAF50"  # Green color for merged format
+VIDEO_COLOR = "#2196F3"  # Blue color for video download
+AUDIO_COLOR = "#4CAF50"  # Green color for audio download
+
+
+def format_speed(bytes_per_second):
+    if not bytes_per_second:
+        return ""
+    if bytes_per_second < 1024 * 1024:
+        return f"{bytes_per_second / 1024:.0f} KB/s"
+    return f"{bytes_per_second / (1024 * 1024):.1f} MB/s"
+
+
+def format_job_speed(bytes_per_second, connections=0):
+    """작업 속도와, 조각/구간 다운로드면 동시 연결 수를 함께 표시합니다. (예: "3.2 MB/s ×4")"""
+    text = format_speed(bytes_per_second)
+    if text and connections:
+        text += f" ×{connections}"
+    return text
+
+
+def progress_color(is_merged_format, is_video):
+    if is_merged_format:
+        return MERGED_COLOR
+    elif is_video:
+        return VIDEO_COLOR
+    return AUDIO_COLOR
+
+
+class JobRecord:
+    """다운로드 목록의 한 행. 위젯 없이 값만 보관합니다."""
+    __slots__ = ("title", "resolution", "size_text", "thumbnail_url", "progress", "time_left", "speed",
+                 "connections", "is_merged_format", "is_video", "status_text", "status_tooltip", "cancellable")
+
+    def __init__(self, title, resolution, size_text, thumbnail_url, is_merged_format):
+        self.title = title
+        self.resolution = resolution
+        self.size_text = size_text
+        self.thumbnail_url = thumbnail_url
+        self.progress = 0.0
+        self.time_left = ""
+        self.speed = 0  # bytes/s
+        self.connections = 0  # 동시 연결 수 (조각/구간 다운로드가 아니면 0)
+        self.is_merged_format = is_merged_format
+        self.is_video = True
+        self.status_text = "대기 중"
+        self.status_tooltip = None  # 후처리 시간 등 상태에 덧붙이는 설명
+        self.cancellable = True
+
+
+class DownloadListModel(QAbstractTableModel):
+    """다운로드 목록 모델. 행 번호가 곧 작업 ID이며 행은 삭제되지 않습니다."""
+
+    def __init__(self, thumbnail_service, thumbnail_size, parent=None):
+        super().__init__(parent)
+        self.records = []
+        self.thumbnail_service = thumbnail_service
+        self.thumbnail_size = thumbnail_size
+        self.thumbnail_rows = {}  # url -> [row, ...]
+        self.requested_thumbnails = set()  # 로딩 중인 URL
+        self.default_thumbnail = QPixmap(*thumbnail_size)
+        self.default_thumbnail.fill(Qt.GlobalColor.lightGray)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.records[index.row()]
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == TITLE_COLUMN:
+                return record.title
+            if column == RESOLUTION_COLUMN:
+                return record.resolution
+            if column == SIZE_COLUMN:
+                return record.size_text
+            if column == TIME_COLUMN:
+                return record.time_left
+            if column == SPEED_COLUMN:
+                return format_job_speed(record.speed, record.connections)
+            if column == STATUS_COLUMN:
+                return record.status_text
+        elif role == Qt.ItemDataRole.ToolTipRole and column == SPEED_COLUMN and record.connections:
+            return f"동시 연결 {record.connections}개 (조각/구간 나눠 받기)"
+        elif role == Qt.ItemDataRole.ToolTipRole and column == STATUS_COLUMN:
+            return record.status_tooltip
+        elif role == Qt.ItemDataRole.DecorationRole and column == THUMBNAIL_COLUMN:
+            return self.thumbnail(record.thumbnail_url)
+        elif role == Qt.ItemDataRole.TextAlignmentRole and column in (THUMBNAIL_COLUMN, SPEED_COLUMN, STATUS_COLUMN):
+            return Qt.AlignmentFlag.AlignCenter
+        elif role == ProgressRole and column == PROGRESS_COLUMN:
+            return (record.progress, progress_color(record.is_merged_format, record.is_video))
+        elif role == CancellableRole and column == STATUS_COLUMN:
+            return record.cancellable
+        return None
+
+    def thumbnail(self, url):
+        """보이는 행이 그려질 때에만 썸네일을 요청합니다."""
+        if not url:
+            return self.default_thumbnail
+        pixmap = self.thumbnail_service.memory.get((url, tuple(self.thumbnail_size)))
+        if pixmap is not None:
+            return pixmap
+        if url not in self.requested_thumbnails:
+            self.requested_thumbnails.add(url)
+            self.thumbnail_service.request(url, self.thumbnail_size,
+                                           lambda pixmap, url=url: self.thumbnail_loaded(url))
+        return self.default_thumbnail
+
+    def thumbnail_loaded(self, url):
+        self.requested_thumbnails.discard(url)
+        for row in self.thumbnail_rows.get(url, []):
+            index = self.index(row, THUMBNAIL_COLUMN)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def add_job(self, record):
+        row = len(self.records)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.records.append(record)
+        if record.thumbnail_url:
+            self.thumbnail_rows.setdefault(record.thumbnail_url, []).append(row)
+        self.endInsertRows()
+        return row
+
+    def record(self, row):
+        return self.records[row]
+
+    def update_progress(self, row, progress, time_left, is_merged_format, is_video, speed=0, connections=0):
+        record = self.records[row]
+        record.progress = progress
+        record.speed = speed
+        record.connections = connections
+        record.is_merged_format = is_merged_format
+        record.is_video = is_video
+        if time_left == "Merging...":
+            record.time_left = time_left
+            record.status_text = "병합중"
+            record.cancellable = False
+        elif time_left == "Complete":
+            record.time_left = time_left
+            record.status_text = "완료됨"
+            record.cancellable = False
+        else:
+            record.time_left = time_left
+            record.status_text = ""
+            record.cancellable = True
+        self._row_changed(row, PROGRESS_COLUMN, STATUS_COLUMN)
+
+    def set_status(self, row, text, cancellable=False):
+        record = self.records[row]
+        record.status_text = text or ""
+        record.cancellable = cancellable
+        self._row_changed(row, STATUS_COLUMN, STATUS_COLUMN)
+
+    def set_status_tooltip(self, row, text):
+        self.records[row].status_tooltip = text
+        self._row_changed(row, STATUS_COLUMN, STATUS_COLUMN)
+
+    def set_speed(self, row, speed):
+        self.records[row].speed = speed
+        self._row_changed(row, SPEED_COLUMN, SPEED_COLUMN)
+
+    def reset_progress(self, row):
+        record = self.records[row]
+        record.progress = 0.0
+        record.time_left = ""
+        record.speed = 0
+        record.connections = 0
+        self._row_changed(row, PROGRESS_COLUMN, SPEED_COLUMN)
+
+    def _row_changed(self, row, first_column, last_column):
+        self.dataChanged.emit(self.index(row, first_column), self.index(row, last_column))
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """썸네일을 칸 가운데에 그립니다."""
+
+    def paint(self, painter, option, index):
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is None:
+            return super().paint(painter, option, index)
+        target = QRect(0, 0, pixmap.width(), pixmap.height())
+        target.moveCenter(option.rect.center())
+        painter.drawPixmap(target, pixmap)
+
+
+class ProgressDelegate(QStyledItemDelegate):
+    """진행률 막대를 위젯 없이 직접 그립니다."""
+
+    def paint(self, painter, option, index):
+        value = index.data(ProgressRole)
+        if value is None:
+            return super().paint(painter, option, index)
+        progress, color = value
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = QRectF(option.rect.adjusted(5, 0, -5, 0))
+        rect.setHeight(min(rect.height() - 16, 20))
+        rect.moveCenter(QRectF(option.rect).center())
+
+        painter.setPen(QPen(QColor("#CCCCCC"), 1))
+        painter.setBrush(QColor("#F0F0F0"))
+        painter.drawRoundedRect(rect, 5, 5)
+
+        fraction = max(0.0, min(progress, 100.0)) / 100.0
+        if fraction > 0:
+            chunk = QRectF(rect.adjusted(1, 1, -1, -1))
+            chunk.setWidth(chunk.width() * fraction)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(color))
+            painter.drawRoundedRect(chunk, 4, 4)
+        painter.restore()
+
+
+class StatusDelegate(QStyledItemDelegate):
+    """상태 문구와 취소 버튼을 그리고, 버튼 클릭을 cancel_requested 시그널로 알립니다."""
+    cancel_requested = pyqtSignal(int)  # row
+
+    BUTTON_COLOR = QColor("#FF4136")
+    BUTTON_HOVER_COLOR = QColor("#FF7166")
+
+    def button_rect(self, option, has_text):
+        rect = option.rect.adjusted(2, 2, -2, -2)
+        if has_text:
+            rect.setTop(rect.center().y())
+        return rect
+
+    def paint(self, painter, option, index):
+        text = index.data(Qt.ItemDataRole.DisplayRole) or ""
+        cancellable = index.data(CancellableRole)
+
+        painter.save()
+        painter.setPen(QColor("#333333"))
+        if cancellable:
+            text_rect = QRect(option.rect)
+            if text:
+                text_rect.setBottom(option.rect.center().y())
+                painter.drawText(text_rect, Qt.AlignmentFlag.AlignCenter, text)
+            button = self.button_rect(option, bool(text))
+            hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(self.BUTTON_HOVER_COLOR if hovered else self.BUTTON_COLOR)
+            painter.drawRoundedRect(QRectF(button), 3, 3)
+            painter.setPen(QColor("white"))
+            font = painter.font()
+            font.setPixelSize(12)
+            painter.setFont(font)
+            painter.drawText(button, Qt.AlignmentFlag.AlignCenter, "취소")
+        else:
+            painter.drawText(option.rect, Qt.AlignmentFlag.AlignCenter, text)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and index.data(CancellableRole):
+            text = index.data(Qt.ItemDataRole.DisplayRole) or ""
+            if self.button_rect(option, bool(text)).contains(event.position().toPoint()):
+                self.cancel_requested.emit(index.row())
+                return True
+        return super().editorEvent(event, model, option, index)
@@ -0,0 +1,797 @@
+import copy
+import os
+import re
+import threading
+import time
+
+import journal
+from metadata_cache import get_info_expiry, normalize_video_key, EXPIRY_MARGIN
+from playlist import select_format, describe_format
+from http_pool import load_yt_dlp
+from retry_policy import retry_engine, find_circuit_error
+from metrics import JobMetrics, RETRIES, BACKOFF_SECONDS
+from filenames import FilenameReserver
+from fragment_tuner import (FragmentTuner, FragmentGate, tuning_key, ungated_thread, MAX_CONCURRENCY,
+                            TUNE_INTERVAL)
+from ffmpeg_probe import cached_capabilities
+from segmented import SegmentedDownload, is_segmentable
+from streaming_mux import StreamingMux, is_streamable
+from postprocess import PostProcessTask, merge_command, uses_hardware_encoder, FALLBACK_ENCODERS, MERGE_PRIORITY
+from audio import audio_command, format_key, target_extension, write_tags, DEFAULT_BITRATE
+from library import video_key, quick_hash
+
+# 다운로드 엔진. GUI(PyQt6)와 CLI가 함께 사용하므로 Qt를 import하지 않습니다.
+# yt_dlp는 import가 오래 걸려 창이 먼저 뜨도록 처음 쓰는 함수 안에서 import합니다.
+
+# 프로세스 안의 모든 작업이 공유하는 출력 파일 이름 예약
+filename_reserver = FilenameReserver()
+# 사이트별로 익힌 조각(DASH/HLS) 동시 다운로드 수
+fragment_tuner = FragmentTuner()
+
+
+def warm_up():
+    """yt_dlp와 추출기 목록을 미리 불러옵니다. GUI가 창을 띄운 뒤 백그라운드에서 호출합니다."""
+    yt_dlp = load_yt_dlp()
+
+    with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
+        ydl.get_info_extractor('Youtube')
+
+
+class ExtractionCancelled(Exception):
+    pass
+
+
+def get_video_formats(url, ffmpeg_path, cache=None, options=None, is_cancelled=None):
+    """영상 정보(info dict)를 추출합니다. is_cancelled가 참을 반환하면 다음 HTTP 요청 전에 멈춥니다."""
+    if cache is not None:
+        info_dict = cache.get(url)
+        if info_dict is not None:
+            return info_dict
+
+    yt_dlp = load_yt_dlp()
+
+    backoff = retry_engine.sleep_function()
+    ydl_opts = {
+        'ffmpeg_location': ffmpeg_path,
+        'retry_sleep_functions': {'http': backoff, 'extractor': backoff},  # 서버가 제한하면 백오프 후 재시도
+    }
+    ydl_opts.update(options or {})
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        if is_cancelled is not None:
+            # 추출기는 모든 요청을 ydl.urlopen으로 보내므로 여기서 취소를 확인
+            urlopen = ydl.urlopen
+
+            def cancellable_urlopen(req):
+                if is_cancelled():
+                    raise ExtractionCancelled("Extraction cancelled")
+                return urlopen(req)
+            ydl.urlopen = cancellable_urlopen
+        # Extract video information without downloading
+        info_dict = ydl.sanitize_info(ydl.extract_info(url, download=False))
+
+    if cache is not None:
+        cache.put(url, info_dict)
+    return info_dict
+
+
+def check_if_merged_format(format):
+    return 'acodec' in format and format['acodec'] != 'none' and \
+           'vcodec' in format and format['vcodec'] != 'none'
+
+
+def download_key(url, format):
+    """받는 중인 작업을 가리키는 키: (영상 ID 또는 URL, 포맷 키). 제목이 같은 다른 영상과 겹치지 않습니다."""
+    return normalize_video_key(url or ''), format_key(format)
+
+
+def output_base_name(video_title, format):
+    """제목과 해상도로 출력 파일 이름(확장자 제외)을 만듭니다."""
+    safe_title = video_title.replace(' ', '_')
+    if format.get('audio_target'):
+        return f"{safe_title}_audio"
+    resolution = format.get('height', None)
+    if resolution is None:
+        resolution = "Unknown_resolution"
+    else:
+        resolution = f"{resolution}p"
+    return f"{safe_title}_{resolution}"
+
+
+def format_time(seconds):
+    m, s = divmod(seconds, 60)
+    h, m = divmod(m, 60)
+    return f"{h:02.0f}:{m:02.0f}:{s:02.0f}"
+
+
+def temp_file_variants(path):
+    """중간 파일 경로와 그 옆에 만들어지는 .part/.ytdl(yt-dlp), .segments(구간 다운로더) 파일 경로를 반환합니다."""
+    return (path, f"{path}.part", f"{path}.ytdl", f"{path}.segments")
+
+
+def merge_temp_path(path):
+    """yt-dlp 병합기가 최종 파일 대신 먼저 쓰는 임시 출력 경로 (name.temp.ext)."""
+    base, extension = os.path.splitext(path)
+    return f"{base}.temp{extension}"
+
+
+def remove_files(paths):
+    """주어진 파일들만 지웁니다. 디렉터리를 훑지 않습니다."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error deleting temporary file {path}: {e}")
+
+
+def leftover_pattern(full_path, keep_output=False):
+    """full_path로 받던 작업이 남길 수 있는 파일 이름 패턴 (최종 파일, .fNNN, .temp, .part, 조각/구간 파일).
+
+    keep_output이면 최종 파일 이름 자체는 빼고 중간 파일만 맞춥니다.
+    """
+    base_path, extension = os.path.splitext(full_path)
+    base_name = re.escape(os.path.basename(base_path))
+    suffix = r"(?:\.part(?:-Frag\d+)?|\.ytdl|\.segments)"
+    intermediate = rf"{base_name}(?:\.f[\w-]+\.\w+|\.temp{re.escape(extension)}){suffix}?"
+    if keep_output:
+        return rf"{base_name}{re.escape(extension)}{suffix}|{intermediate}"
+    return rf"{base_name}{re.escape(extension)}{suffix}?|{intermediate}"
+
+
+def cleanup_leftover_files(jobs):
+    """시작 시 한 번 실행하는 대체 정리. 추적하지 못한 중간 파일을 디렉터리를 훑어 지웁니다.
+
+    jobs는 output_path를 가진 dict 목록이며, 정리할 작업이 있는 디렉터리만 한 번씩 훑습니다.
+    실패한 작업(status가 failed)은 최종 파일 이름의 파일은 남기고 중간 파일만 지웁니다.
+    """
+    patterns_by_directory = {}
+    for job in jobs:
+        directory = os.path.dirname(job["output_path"])
+        patterns_by_directory.setdefault(directory, []).append(
+            leftover_pattern(job["output_path"], keep_output=job.get("status") == journal.FAILED))
+
+    for directory, patterns in patterns_by_directory.items():
+        if not os.path.isdir(directory):
+            continue
+        pattern = re.compile("|".join(f"(?:{p})" for p in patterns))
+        try:
+            with os.scandir(directory) as entries:
+                leftovers = [entry.path for entry in entries if pattern.fullmatch(entry.name)]
+        except OSError as e:
+            print(f"Error scanning {directory}: {e}")
+            continue
+        remove_files(leftovers)
+
+
+class DownloadJob:
+    """영상 하나를 받는 작업. 스케줄러가 별도 스레드에서 run()을 호출합니다.
+
+    진행 상황은 on_started/on_progress/on_finished/on_error를 통해 알리며,
+    GUI와 CLI는 이 메서드들을 재정의해 사용합니다.
+    """
+
+    def __init__(self, job_id, url, format, output_path, video_title, ffmpeg_path, metadata_cache=None, info=None,
+                 postprocess_slot=None, journal=None, journal_id=None, output_file=None, ydl_options=None,
+                 library=None, governor=None, segments=1, stream_merge=False, postprocess_pool=None):
+        self.job_id = job_id
+        self.url = url
+        self.format = format
+        self.info = info  # 검색 단계에서 이미 추출한 info dict (있으면 재추출 생략)
+        self.output_path = output_path
+        self.video_title = video_title  # None이면 추출한 제목 사용
+        self.ffmpeg_path = ffmpeg_path
+        self.metadata_cache = metadata_cache
+        self.postprocess_slot = postprocess_slot  # 병합 단계 동시 실행 수 제한 (스케줄러 제공)
+        self.holding_postprocess_slot = False
+        self.journal = journal  # 작업 상태와 받은 바이트 수를 기록하는 JobJournal
+        self.journal_id = journal_id
+        self.output_file = output_file  # 이어받기 시 이전에 정한 파일 경로
+        if output_file:
+            filename_reserver.claim(output_file)
+        self.ydl_options = ydl_options or {}  # yt-dlp 추가 옵션 (CLI의 quiet 등)
+        self.library = library  # 이미 받은 파일 색인 (LibraryIndex)
+        self.governor = governor  # 모든 작업이 공유하는 대역폭 제한기 (BandwidthGovernor)
+        self.counted_file = None  # 대역폭 계산 중인 파일과 그 파일에서 센 바이트 수
+        self.counted_bytes = 0
+        self.speed = 0  # 최근 실제 처리량 (bytes/s)
+        self.tuning_key = None  # 조각 동시 수를 익히는 단위 ((미디어 호스트, 스트림 종류))
+        self.fragment_concurrency = 0  # 지금 쓰는 조각 동시 다운로드 수 (조각 다운로드가 아니면 0)
+        self.fragment_throughput = 0  # 마지막 구간에서 잰 조각 다운로드 처리량 (bytes/s)
+        self.fragment_file = None  # 처리량을 재고 있는 조각 파일
+        self.fragment_retries = 0  # 마지막 구간의 조각 재시도 수
+        self.tune_lock = threading.Lock()  # 조각 스레드들이 동시에 진행 상황을 알림
+        self.tune_started = 0.0  # 처리량을 재는 구간의 시작 시각과 그때 받은 바이트 수
+        self.tune_bytes = 0
+        self.retries = 0  # 이 작업의 전체 재시도 수 (HTTP/조각/구간/추출)
+        self.backoff_seconds = 0.0  # 재시도 전에 기다린 시간의 합
+        self.deferred_host = None  # 차단기가 열려 멈춘 호스트 (스케줄러가 닫힐 때 다시 대기열에 넣음)
+        self.metrics = JobMetrics(job_id, url)  # 추출 시간, 첫 바이트, 처리량, 병합 시간
+        self.segments = segments  # 진행형 포맷을 나눠 받을 연결 수 (1이면 yt-dlp가 한 연결로 받음)
+        self.segmented_download = None  # 진행 중인 SegmentedDownload
+        self.stream_merge = stream_merge  # 비디오/오디오를 받으면서 바로 합칠지 (중간 파일 없음)
+        self.streaming_mux = None  # 진행 중인 StreamingMux
+        self.postprocess_pool = postprocess_pool  # 병합을 맡길 PostProcessPool (없으면 yt-dlp가 바로 병합)
+        self.postprocess_task = None
+        self.stream_files = []  # 병합할 비디오/오디오 파일
+        self.is_cancelled = threading.Event()
+        self.fragment_gate = FragmentGate(is_cancelled=self.is_cancelled.is_set)  # 받는 도중 바꾸는 조각 동시 수
+        self.ydl = None
+        self.full_path = None
+        self.total_bytes = 0
+        self.downloaded_bytes = 0
+        self.merging = False
+        self.is_merged_format = check_if_merged_format(format)
+        self.is_video_download = True
+        self.max_progress = 0
+        # 이 작업이 만든 중간 파일 (취소 시 이 파일들만 지움)
+        self.temp_files = set()
+        if self.output_file and self.journal is not None and self.journal_id in self.journal.files:
+            # 이어받는 작업: 지난 실행에서 기록한 중간 파일
+            directory = os.path.dirname(self.output_file)
+            self.temp_files.update(os.path.join(directory, name) for name in self.journal.files[self.journal_id])
+
+    def on_started(self):
+        pass
+
+    def on_progress(self, progress, time_left):
+        pass
+
+    def on_finished(self):
+        pass
+
+    def on_error(self, message):
+        pass
+
+    def on_skipped(self, path):
+        pass
+
+    def on_deferred(self, host, retry_at):
+        pass
+
+    def run(self):
+        self.deferred_host = None
+        if self.is_cancelled.is_set():
+            return  # 대기 중에 취소된 작업
+        self.metrics.start()
+        ungated_thread()  # 작업 스레드의 요청(정보 추출, 매니페스트)은 조각 자리를 쓰지 않음
+        existing = self.find_in_library()
+        if existing is not None:
+            # 이미 받은 영상/포맷: 네트워크 없이 바로 끝냄
+            self.skip(existing)
+            return
+        self.on_started()
+        if self.governor is not None:
+            self.governor.register(self)
+        retry_engine.bind(self.count_retry, self.is_cancelled.is_set)
+
+        try:
+            existing = self.download()
+            if not self.is_cancelled.is_set():
+                if existing is not None:
+                    self.skip(existing)  # 정보를 추출하고 나서야 영상 ID를 알게 된 경우
+                    return
+                if self.postprocess_task is not None:
+                    # 병합/변환은 후처리 풀에서 실행하고, 이 스레드(다운로드 슬롯)는 바로 반납
+                    self.speed = 0
+                    self.merging = True
+                    self.on_progress(99, "Merging...")
+                    if self.postprocess_pool is not None:
+                        self.postprocess_pool.submit(self.postprocess_task)
+                    else:
+                        self.postprocess_task.run()
+                        self.postprocess_finished(self.postprocess_task)
+                    return
+                self.complete()
+        except Exception as e:
+            if not self.is_cancelled.is_set():
+                circuit_error = find_circuit_error(e)
+                if circuit_error is not None:
+                    self.defer(circuit_error)
+                else:
+                    self.fail(str(e))
+        finally:
+            retry_engine.bind(None)
+            if self.governor is not None:
+                self.governor.unregister(self)
+            self.release_postprocess_slot()
+            if self.is_cancelled.is_set():
+                # 사용자가 취소한 작업만 부분 다운로드 파일 삭제
+                self.update_journal(status=journal.CANCELLED)
+                self.cleanup_temp_files()
+                self.record_outcome("cancelled")
+
+    def record_outcome(self, outcome, error=None):
+        """이번 실행의 결과와 지표를 기록합니다 (한 실행에 한 번만 반영됨)."""
+        final_size = None
+        if outcome == "finished" and self.full_path:
+            try:
+                final_size = os.path.getsize(self.full_path)
+            except OSError:
+                pass
+        self.metrics.finish(outcome, self.retries, self.backoff_seconds, final_size, error)
+
+    def complete(self):
+        if self.full_path:
+            filename_reserver.commit(self.full_path)
+            self.record_in_library()
+        self.update_journal(status=journal.FINISHED)
+        self.record_outcome("finished")
+        self.on_finished()
+
+    def fail(self, message):
+        # 실패한 작업의 중간 파일은 남겨 두므로 이름도 반납하지 않음 (같은 제목의 다른 영상이 받지 않도록)
+        if self.full_path:
+            filename_reserver.retain(self.full_path)
+        self.update_journal(status=journal.FAILED, error=message)
+        self.record_outcome("failed", message)
+        self.on_error(message)
+
+    def defer(self, circuit_error):
+        """서버가 요청을 제한해 차단기가 열린 경우. 실패로 처리하지 않고 이름 예약과 중간 파일을 그대로 둔 채
+        멈추며, 다시 실행하면 같은 경로에서 이어받습니다."""
+        self.deferred_host = circuit_error.host
+        if self.full_path:
+            self.output_file = self.full_path
+        self.update_journal(status=journal.QUEUED)
+        self.record_outcome("deferred", str(circuit_error))
+        self.on_deferred(circuit_error.host, circuit_error.retry_at)
+
+    def postprocess_finished(self, task):
+        """후처리 풀 스레드에서 병합/변환이 끝나거나 취소되면 호출됩니다."""
+        self.merging = False
+        if task.wall_time is not None:
+            self.metrics.merge_finished(task.wall_time)
+        if task.cancelled or self.is_cancelled.is_set():
+            self.update_journal(status=journal.CANCELLED)
+            self.cleanup_temp_files()
+            self.record_outcome("cancelled")
+            return
+        if task.error:
+            self.fail(task.error)  # 받은 스트림은 남겨 두어 다시 시도하면 병합만 다시 함
+            return
+        if self.audio_target:
+            write_tags(task.output, self.info or {})
+        try:
+            os.replace(task.output, self.full_path)
+        except OSError as e:
+            self.fail(str(e))
+            return
+        remove_files(self.stream_files)
+        self.on_progress(100, "Complete")
+        self.complete()
+
+    def skip(self, existing):
+        self.full_path = existing['path']
+        self.update_journal(status=journal.FINISHED)
+        self.record_outcome("skipped")
+        self.on_skipped(existing['path'])
+
+    def download(self):
+        """영상을 받습니다. 라이브러리에 이미 있으면 받지 않고 그 기록을 반환합니다."""
+        yt_dlp = load_yt_dlp()
+
+        info = self.resolve_info()
+        if self.format.get('format_selector'):
+            # 재생목록 항목: 다운로드 직전에 실제 포맷을 고름
+            self.select_format(info)
+        existing = self.find_in_library()
+        if existing is not None:
+            return existing
+        if not self.video_title:
+            self.video_title = info.get('title') or "Unknown Title"
+
+        ext = self.output_extension()
+        if self.output_file:
+            # 이전에 중단된 작업: 같은 경로를 써야 .part/.fNNN 파일을 이어받을 수 있음
+            full_path = self.output_file
+        else:
+            # 빈 자리표시 파일로 이름을 예약 (yt-dlp가 overwrites 옵션으로 이 파일을 대체함)
+            full_path = filename_reserver.reserve(self.output_path, output_base_name(self.video_title, self.format),
+                                                  ext)
+        self.full_path = full_path
+        self.update_journal(output_path=full_path, status=journal.RUNNING)
+
+        ydl_opts = {
+            'format': self.format_spec(),
+            'outtmpl': full_path,
+            'progress_hooks': [self.progress_hook],
+            'merge_output_format': self.format.get('ext', 'mp4'),
+            'retries': retry_engine.policy.max_retries,
+            'fragment_retries': retry_engine.policy.max_retries,
+            'skip_unavailable_fragments': True,  # 사용 불가능한 프래그먼트 건너뛰기
+            # 스레드는 최대 수로 만들고 실제 동시 수는 fragment_gate가 받는 도중에 조절
+            'concurrent_fragment_downloads': MAX_CONCURRENCY,
+            # 재시도마다 공유 정책의 백오프만큼 기다리며 재시도 수를 셈
+            'retry_sleep_functions': {
+                'http': retry_engine.sleep_function(self.count_retry),
+                'extractor': retry_engine.sleep_function(self.count_retry),
+                'fragment': retry_engine.sleep_function(self.count_fragment_retry),
+            },
+            'keepvideo': False,  # 병합 후 원본 파일 삭제
+            'overwrites': True,  # 기존 파일 덮어쓰기
+            'postprocessor_hooks': [self.postprocessor_hook],
+            'ffmpeg_location': self.ffmpeg_path  # ffmpeg 경로 추가
+        }
+        ydl_opts.update(self.ydl_options)
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            self.ydl = ydl
+            ydl.urlopen = self.fragment_gate.wrap(ydl.urlopen)
+            self.total_bytes = self.estimate_total_bytes(info)
+            if not self.is_cancelled.is_set():
+                self.metrics.transfer_started()
+                try:
+                    self.download_with(ydl, ydl_opts, info)
+                except yt_dlp.utils.DownloadError as e:
+                    # 서명된 URL이 그 사이 만료된 경우에만 한 번 재추출
+                    if self.is_cancelled.is_set() or not self.is_expired_url_error(e):
+                        raise
+                    info = self.resolve_info(force_refresh=True)
+                    self.download_with(ydl, ydl_opts, info)
+
+    def download_with(self, ydl, ydl_opts, info):
+        """고른 포맷에 맞는 방법으로 받습니다.
+
+        오디오 작업은 오디오 스트림만 받아 변환합니다. 그 밖에는 구간 나눠 받기, 스트리밍 병합,
+        스트림별로 받은 뒤 후처리 풀에서 병합하기를 차례로 시도하고, 어느 것도 맞지 않으면 yt-dlp가 받은 뒤 바로 병합합니다.
+        """
+        if self.audio_target:
+            self.download_audio(ydl, ydl_opts, info)
+            return
+        if self.segments > 1 or self.stream_merge or self.postprocess_pool is not None:
+            selected = ydl.process_ie_result(copy.deepcopy(info), download=False)
+            if (self.download_segmented(ydl, selected) or self.download_streaming(selected)
+                    or self.download_streams(ydl_opts, info, selected)):
+                return
+        ydl.process_ie_result(info, download=True)
+
+    def download_segmented(self, ydl, selected, path=None):
+        """고른 포맷이 HTTP 단일 파일이면 여러 연결로 나눠 받습니다."""
+        if self.segments < 2 or not is_segmentable(selected):
+            return False
+        download = SegmentedDownload(ydl, selected, path or self.full_path, self.segments, self.progress_hook,
+                                     self.is_cancelled.is_set, self.count_retry)
+        self.temp_files.update((download.part_path, download.state_path))
+        self.segmented_download = download
+        return download.run()
+
+    def download_streaming(self, selected):
+        """비디오+오디오를 따로 받아야 하는 포맷이면 받는 동시에 ffmpeg로 합칩니다."""
+        if not self.stream_merge or not self.ffmpeg_path or not is_streamable(selected):
+            return False
+        if self.governor is not None and (self.governor.total_rate or self.governor.per_job_rate):
+            return False  # ffmpeg가 직접 받으므로 속도 제한을 지킬 수 없음
+        if not all(retry_engine.is_closed(fmt['url']) for fmt in selected['requested_formats']):
+            return False  # 서버 제한 중인 호스트: ffmpeg는 차단기와 백오프를 거치지 않음
+        mux = StreamingMux(self.ffmpeg_path, selected, self.full_path, self.format.get('ext', 'mp4'),
+                           self.progress_hook)
+        self.temp_files.add(mux.part_path)
+        self.streaming_mux = mux
+        if self.is_cancelled.is_set():
+            mux.stop()
+        mux.run()
+        return True
+
+    def download_streams(self, ydl_opts, info, selected):
+        """비디오/오디오를 따로 받고, 병합 작업을 만들어 둡니다. 병합은 run()이 후처리 풀에 넣습니다."""
+        formats = selected.get('requested_formats') or []
+        if self.postprocess_pool is None or not self.ffmpeg_path or len(formats) < 2:
+            return False
+        streams = [(self.stream_path(fmt), fmt.get('vcodec'), fmt.get('acodec')) for fmt in formats]
+        output = merge_temp_path(self.full_path)
+        ext = self.format.get('ext', 'mp4')
+        # 받기 전에 명령을 만들어, 필요한 인코더가 없으면 받지 않고 바로 알림
+        capabilities = cached_capabilities(self.ffmpeg_path)
+        command = merge_command(self.ffmpeg_path, streams, output, ext, capabilities)
+        fallback_command = None
+        if uses_hardware_encoder(FALLBACK_ENCODERS.get(ext, {}), capabilities):
+            fallback_command = merge_command(self.ffmpeg_path, streams, output, ext, capabilities, hardware=False)
+        for fmt, (path, _, _) in zip(formats, streams):
+            self.download_stream(ydl_opts, info, fmt, path)
+            if self.is_cancelled.is_set():
+                return True
+        self.stream_files = [path for path, _, _ in streams]
+        self.temp_files.add(output)
+        self.postprocess_task = PostProcessTask(self.job_id, "merge", command, output, MERGE_PRIORITY,
+                                                self.postprocess_finished, fallback_command)
+        return True
+
+    def stream_path(self, fmt):
+        base_path = os.path.splitext(self.full_path)[0]
+        path = f"{base_path}.f{fmt['format_id']}.{fmt['ext']}"
+        self.temp_files.add(path)
+        return path
+
+    def download_stream(self, ydl_opts, info, fmt, path):
+        """포맷 하나만 path로 받습니다. 이미 다 받은 파일은 다시 받지 않습니다 (후처리 전에 중단된 작업을 이어받는 경우)."""
+        yt_dlp = load_yt_dlp()
+
+        stream_opts = dict(ydl_opts, format=fmt['format_id'], outtmpl=path, overwrites=False, fixup='never')
+        self.fragment_gate.set_limit(fragment_tuner.concurrency(tuning_key(fmt)))
+        with yt_dlp.YoutubeDL(stream_opts) as ydl:
+            self.ydl = ydl
+            ydl.urlopen = self.fragment_gate.wrap(ydl.urlopen)
+            ydl.process_ie_result(copy.deepcopy(info), download=True)
+
+    def download_audio(self, ydl, ydl_opts, info):
+        """오디오 스트림 하나만 받고, 대상 코덱/비트레이트로 리먹스 또는 변환하는 작업을 만들어 둡니다.
+
+        변환은 run()이 후처리 풀에 넣으며, 끝나면 postprocess_finished에서 태그를 씁니다.
+        """
+        if not self.ffmpeg_path:
+            raise Exception("오디오 변환에는 ffmpeg가 필요합니다.")
+        selected = ydl.process_ie_result(copy.deepcopy(info), download=False)
+        if selected.get('requested_formats') or selected.get('vcodec') not in (None, 'none'):
+            raise Exception("오디오만 있는 포맷이 아닙니다.")
+        source = self.stream_path(selected)
+        output = merge_temp_path(self.full_path)
+        # 받기 전에 명령을 만들어, 변환할 인코더가 없으면 받지 않고 바로 알림
+        kind, command, priority = audio_command(self.ffmpeg_path, source, output, selected.get('acodec'),
+                                                self.audio_target, self.audio_bitrate, selected.get('abr'),
+                                                cached_capabilities(self.ffmpeg_path))
+        if not os.path.exists(source) and not self.download_segmented(ydl, selected, source):
+            self.download_stream(ydl_opts, info, selected, source)
+        if self.is_cancelled.is_set():
+            return
+        self.stream_files = [source]
+        self.temp_files.add(output)
+        self.postprocess_task = PostProcessTask(self.job_id, kind, command, output, priority,
+                                                self.postprocess_finished)
+
+    @property
+    def audio_target(self):
+        """오디오만 받아 변환할 대상 (audio.AUDIO_TARGETS의 키). 영상 작업이면 None입니다."""
+        return self.format.get('audio_target')
+
+    @property
+    def audio_bitrate(self):
+        return self.format.get('audio_bitrate') or DEFAULT_BITRATE
+
+    def output_extension(self):
+        if self.audio_target:
+            return target_extension(self.audio_target, self.format.get('acodec'), self.format.get('ext'))
+        return self.format.get('ext', 'mp4')
+
+    def connections(self):
+        """지금 이 작업이 동시에 쓰는 연결 수. 조각/구간 다운로드가 아니면 0입니다."""
+        segments = self.segmented_download.segment_count if self.segmented_download is not None else 0
+        return segments or self.fragment_concurrency
+
+    def format_spec(self):
+        if self.format.get('format_selector') or self.audio_target:
+            return self.format['format_id']  # select_format에서 고른 정확한 포맷, 또는 오디오 스트림만
+        return self.format.get('format_id', 'bestvideo')+'+bestaudio/best'
+
+    def select_format(self, info):
+        yt_dlp = load_yt_dlp()
+
+        with yt_dlp.YoutubeDL({'quiet': True, 'ffmpeg_location': self.ffmpeg_path}) as ydl:
+            chosen = select_format(ydl, info, self.format['format_selector'])
+        if chosen is None:
+            raise Exception("요청한 화질에 맞는 포맷이 없습니다.")
+        self.format = dict(describe_format(chosen), format_selector=self.format['format_selector'],
+                           audio_target=self.format.get('audio_target'),
+                           audio_bitrate=self.format.get('audio_bitrate'))
+        self.is_merged_format = check_if_merged_format(self.format)
+
+    def library_key(self):
+        return video_key(self.info, self.url)
+
+    def find_in_library(self):
+        if self.library is None:
+            return None
+        key = self.library_key()
+        if key is None:
+            return None
+        try:
+            # 포맷 선택식 작업은 포맷을 모르는 가져온 파일도 같은 영상으로 봄 (오디오 변환 작업은 제외)
+            any_format = bool(self.format.get('format_selector')) and not self.audio_target
+            return self.library.lookup(key, format_key(self.format), any_format=any_format)
+        except Exception as e:
+            print(f"Error reading library index: {e}")
+            return None
+
+    def record_in_library(self):
+        if self.library is None or not os.path.exists(self.full_path):
+            return
+        key = self.library_key()
+        if key is None:
+            return
+        try:
+            size = os.path.getsize(self.full_path)
+            format_id = format_key(self.format) if self.audio_target else self.format['format_id']
+            self.library.add(key, format_id, self.full_path, self.format.get('format_selector'),
+                             size, quick_hash(self.full_path, size))
+        except Exception as e:
+            print(f"Error writing library index: {e}")
+
+    def update_journal(self, status=None, output_path=None, error=None):
+        if self.journal is None or self.journal_id is None:
+            return
+        try:
+            if output_path is not None:
+                self.journal.set_output_path(self.journal_id, output_path)
+            if status is not None:
+                self.journal.set_status(self.journal_id, status, error)
+        except Exception as e:
+            print(f"Error writing job journal: {e}")
+
+    def resolve_info(self, force_refresh=False):
+        """다운로드에 사용할 info dict를 반환합니다. URL이 만료된 경우에만 다시 추출합니다."""
+        info = None if force_refresh else self.info
+        if info is not None:
+            expiry = get_info_expiry(info)
+            if expiry is not None and expiry - EXPIRY_MARGIN <= time.time():
+                info = None
+        if info is None:
+            if self.metadata_cache is not None:
+                self.metadata_cache.invalidate(self.url)
+            started = time.monotonic()
+            info = get_video_formats(self.url, self.ffmpeg_path, self.metadata_cache, self.ydl_options,
+                                     self.is_cancelled.is_set)
+            self.metrics.extracted(time.monotonic() - started)
+        self.info = info
+        # process_ie_result가 dict를 수정하므로 사본을 넘깁니다
+        return copy.deepcopy(info)
+
+    def estimate_total_bytes(self, info):
+        total = self.format.get('filesize') or self.format.get('filesize_approx') or 0
+        if (total and not self.is_merged_format and not self.format.get('requested_formats')
+                and self.format.get('vcodec') != 'none'):
+            audio_formats = [f for f in info.get('formats') or []
+                             if f.get('vcodec') == 'none' and f.get('acodec') not in (None, 'none')]
+            if audio_formats:
+                best_audio = max(audio_formats, key=lambda f: f.get('abr') or f.get('tbr') or 0)
+                total += best_audio.get('filesize') or best_audio.get('filesize_approx') or 0
+        return total or info.get('filesize') or info.get('filesize_approx') or 0
+
+    @staticmethod
+    def is_expired_url_error(error):
+        message = str(error)
+        return 'HTTP Error 403' in message or 'HTTP Error 410' in message
+
+    def cancel(self):
+        self.is_cancelled.set()
+        if self.streaming_mux is not None:
+            self.streaming_mux.stop()
+        if self.postprocess_task is not None:
+            if self.postprocess_pool is not None:
+                self.postprocess_pool.cancel(self.postprocess_task)
+            else:
+                self.postprocess_task.cancel()
+        if self.ydl:
+            self.ydl.params['outtmpl'] = os.devnull  # 출력을 무시합니다
+
+    def progress_hook(self, d):
+        if self.is_cancelled.is_set():
+            raise Exception("Download cancelled")
+        # 조각 동시 다운로드는 yt-dlp가 만든 스레드에서 요청하므로 그 스레드에도 작업을 연결
+        retry_engine.bind(self.count_retry, self.is_cancelled.is_set)
+        for key in ('filename', 'tmpfilename'):
+            if d.get(key):
+                self.temp_files.add(d[key])
+        if d['status'] == 'downloading':
+            self.downloaded_bytes = d.get('downloaded_bytes', 0)
+            self.metrics.progress(d.get('filename'), self.downloaded_bytes)
+            if d.get('fragment_count'):
+                self.tune_fragments(d.get('filename'), self.downloaded_bytes, d.get('info_dict') or {})
+            self.throttle(d.get('filename'), self.downloaded_bytes)
+            self.speed = self.governor.throughput(self) if self.governor is not None else (d.get('speed') or 0)
+            # 현재 받고 있는 파일의 크기를 우선 사용 (비디오/오디오가 따로 받아지는 경우)
+            total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate') or self.total_bytes
+            if self.journal is not None and d.get('filename'):
+                self.journal.update_progress(self.journal_id, os.path.basename(d['filename']),
+                                             self.downloaded_bytes, int(total_bytes or 0))
+            if total_bytes > 0:
+                progress = min((self.downloaded_bytes / total_bytes) * 100, 100)
+            else:
+                progress = 0
+
+            if progress < self.max_progress and not self.is_merged_format:
+                self.is_video_download = False
+            self.max_progress = max(self.max_progress, progress)
+
+            speed = self.speed if self.governor is not None else d.get('speed', 0)
+            if speed:
+                eta = max(total_bytes - self.downloaded_bytes, 0) / speed
+            else:
+                eta = 0
+
+            self.on_progress(progress, format_time(eta))
+        elif d['status'] == 'finished' and self.fragment_file is not None and d.get('filename') == self.fragment_file:
+            self.fragment_file = None
+
+    def count_retry(self, delay):
+        self.retries += 1
+        self.backoff_seconds += delay
+        RETRIES.inc()
+        BACKOFF_SECONDS.inc(delay)
+
+    def count_fragment_retry(self, delay):
+        self.fragment_retries += 1
+        self.count_retry(delay)
+
+    def retry_summary(self):
+        """재시도가 있었으면 '재시도 N회, 대기 X초', 없으면 빈 문자열."""
+        if not self.retries:
+            return ""
+        return f"재시도 {self.retries}회, 대기 {self.backoff_seconds:.0f}초"
+
+    def tune_fragments(self, file_name, downloaded_bytes, info):
+        """조각 다운로드 중 TUNE_INTERVAL마다 처리량과 재시도 수를 알리고, 새 동시 수를 바로 적용합니다."""
+        with self.tune_lock:
+            now = time.monotonic()
+            if file_name != self.fragment_file:
+                # 조각 파일 하나를 받기 시작함: 이 호스트/스트림 종류에서 익힌 동시 수로 시작
+                self.fragment_file = file_name
+                self.tuning_key = tuning_key(info)
+                self.fragment_gate.set_limit(fragment_tuner.concurrency(self.tuning_key))
+                self.fragment_concurrency = self.fragment_gate.limit
+                self.fragment_retries = 0
+                self.tune_started, self.tune_bytes = now, downloaded_bytes
+                return
+            elapsed = now - self.tune_started
+            if elapsed < TUNE_INTERVAL:
+                return
+            self.fragment_throughput = (downloaded_bytes - self.tune_bytes) / elapsed
+            self.fragment_concurrency = fragment_tuner.report(
+                self.tuning_key, self.fragment_gate.limit, self.fragment_throughput, self.fragment_retries)
+            self.fragment_gate.set_limit(self.fragment_concurrency)
+            self.fragment_retries = 0
+            self.tune_started, self.tune_bytes = now, downloaded_bytes
+
+    def throttle(self, file_name, downloaded_bytes):
+        """새로 받은 바이트만큼 대역폭 제한기에서 토큰을 씁니다. 한도를 넘으면 여기서 기다립니다."""
+        if self.governor is None:
+            return
+        if file_name != self.counted_file:
+            # 새 파일(또는 이어받기 시작): 처음 본 값은 기준으로만 사용
+            self.counted_file = file_name
+            self.counted_bytes = downloaded_bytes
+            return
+        delta = downloaded_bytes - self.counted_bytes
+        self.counted_bytes = downloaded_bytes
+        self.governor.consume(self, delta, self.is_cancelled)
+
+    def postprocessor_hook(self, d):
+        is_ffmpeg_stage = d.get('postprocessor', '').startswith('FFmpeg')
+        if d['status'] == 'started':
+            self.speed = 0
+            info = d.get('info_dict') or {}
+            self.temp_files.update(info.get('__files_to_merge') or [])
+            if info.get('filepath'):
+                self.temp_files.add(merge_temp_path(info['filepath']))
+            self.merging = True
+            if is_ffmpeg_stage:
+                self.metrics.merge_started()
+            self.on_progress(99, "Merging...")
+            if is_ffmpeg_stage and self.postprocess_slot is not None and not self.holding_postprocess_slot:
+                # 후처리 슬롯이 빌 때까지 대기
+                self.postprocess_slot.acquire()
+                self.holding_postprocess_slot = True
+        elif d['status'] == 'finished':
+            if is_ffmpeg_stage:
+                self.release_postprocess_slot()
+                self.metrics.merge_finished()
+            self.merging = False
+            self.on_progress(100, "Complete")
+
+    def cleanup_temp_files(self):
+        """취소된 작업이 만든 중간 파일을 지웁니다. 추적한 파일만 지우므로 디렉터리 크기와 무관합니다."""
+        paths = set(self.temp_files)
+        if self.full_path:
+            paths.add(self.full_path)
+        remove_files(path for temp_file in paths for path in temp_file_variants(temp_file))
+        if self.full_path or self.output_file:
+            filename_reserver.release(self.full_path or self.output_file)
+        if self.journal is not None and self.journal_id is not None:
+            try:
+                self.journal.mark_cleaned(self.journal_id)
+            except Exception as e:
+                print(f"Error writing job journal: {e}")
+
+    def release_postprocess_slot(self):
+        if self.holding_postprocess_slot:
+            self.holding_postprocess_slot = False
+            self.postprocess_slot.release()
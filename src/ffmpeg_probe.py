@@ -0,0 +1,164 @@
+import json
+import os
+import subprocess
+import threading
+
+from app_paths import get_cache_directory
+
+PROBE_TIMEOUT = 5  # 명령 하나당 제한 시간 (초)
+
+
+def _run(ffmpeg_path, *args):
+    result = subprocess.run([ffmpeg_path, "-hide_banner", *args], capture_output=True, text=True,
+                            timeout=PROBE_TIMEOUT)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"exit code {result.returncode}")
+    return result.stdout
+
+
+def _table_lines(output, separator):
+    """'--' 또는 '------' 구분선 아래의 목록 줄만 돌려줍니다."""
+    lines = output.splitlines()
+    for index, line in enumerate(lines):
+        if line.strip() == separator:
+            return [l for l in lines[index + 1:] if l.strip()]
+    return []
+
+
+def parse_muxers(output):
+    muxers = set()
+    for line in _table_lines(output, "--"):
+        parts = line.split(None, 2)
+        if len(parts) >= 2 and "E" in parts[0]:
+            muxers.update(parts[1].split(","))
+    return sorted(muxers)
+
+
+def parse_encoders(output):
+    encoders = {"video": [], "audio": [], "subtitle": []}
+    kinds = {"V": "video", "A": "audio", "S": "subtitle"}
+    for line in _table_lines(output, "------"):
+        parts = line.split(None, 2)
+        if len(parts) >= 2 and parts[0][:1] in kinds:
+            encoders[kinds[parts[0][0]]].append(parts[1])
+    return encoders
+
+
+def parse_hwaccels(output):
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    return [line for line in lines if not line.endswith(":")]
+
+
+def probe_ffmpeg(ffmpeg_path):
+    """ffmpeg를 실행해 버전과 지원하는 먹서/인코더/하드웨어 가속 목록을 조사합니다."""
+    result = {"path": ffmpeg_path, "ok": False, "version": None, "muxers": [],
+              "encoders": {"video": [], "audio": [], "subtitle": []}, "hwaccels": [], "error": None}
+    try:
+        version_output = _run(ffmpeg_path, "-version")
+        result["version"] = version_output.splitlines()[0] if version_output else ""
+        result["ok"] = True
+        # 세부 목록은 없어도 다운로드는 가능하므로 실패해도 무시
+        for key, args, parse in (("muxers", ("-muxers",), parse_muxers),
+                                 ("encoders", ("-encoders",), parse_encoders),
+                                 ("hwaccels", ("-hwaccels",), parse_hwaccels)):
+            try:
+                result[key] = parse(_run(ffmpeg_path, *args))
+            except Exception as e:
+                print(f"Error probing ffmpeg {args[0]}: {e}")
+    except subprocess.TimeoutExpired:
+        result["error"] = "timeout"
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+class FFmpegProbe:
+    """ffmpeg 조사 결과를 실행 파일의 경로, 크기, 수정 시각을 키로 캐시합니다.
+
+    cached()는 파일 상태만 확인하므로 GUI 스레드에서 호출해도 됩니다.
+    실제 조사(probe)는 백그라운드 스레드에서 실행해야 합니다.
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or os.path.join(get_cache_directory(), "ffmpeg_probe.json")
+        self.lock = threading.Lock()
+        self.results = self._load()  # 키 -> 조사 결과
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Error reading ffmpeg probe cache: {e}")
+            return {}
+
+    def _save(self):
+        # 성공한 결과만 저장 (시간 초과 같은 일시적인 실패는 다음 실행에서 다시 조사)
+        results = {key: value for key, value in self.results.items() if value["ok"]}
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(results, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"Error writing ffmpeg probe cache: {e}")
+
+    @staticmethod
+    def key(ffmpeg_path):
+        try:
+            stat = os.stat(ffmpeg_path)
+        except OSError:
+            return None
+        return f"{os.path.abspath(ffmpeg_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def cached(self, ffmpeg_path):
+        """현재 실행 파일에 대한 조사 결과가 있으면 반환합니다. 프로세스를 실행하지 않습니다."""
+        key = self.key(ffmpeg_path)
+        if key is None:
+            return None
+        with self.lock:
+            return self.results.get(key)
+
+    def probe(self, ffmpeg_path):
+        """캐시된 결과가 없으면 조사합니다. 시간이 걸릴 수 있으므로 백그라운드에서 호출하세요."""
+        result = self.cached(ffmpeg_path)
+        if result is not None:
+            return result
+        key = self.key(ffmpeg_path)
+        result = probe_ffmpeg(ffmpeg_path)
+        if key is None:
+            result["error"] = "not found"
+            return result
+        if result["error"] == "timeout":
+            return result  # 일시적인 실패는 캐시하지 않음
+        with self.lock:
+            # 같은 경로의 이전 버전 결과는 버림
+            prefix = key.rsplit("|", 2)[0] + "|"
+            for old_key in [k for k in self.results if k.startswith(prefix)]:
+                del self.results[old_key]
+            self.results[key] = result
+            self._save()
+        return result
+
+
+_shared_probe = None
+_shared_lock = threading.Lock()
+
+
+def shared_probe():
+    """프로세스 전체가 함께 쓰는 FFmpegProbe. 처음 부를 때 캐시 파일을 읽습니다."""
+    global _shared_probe
+    with _shared_lock:
+        if _shared_probe is None:
+            _shared_probe = FFmpegProbe()
+        return _shared_probe
+
+
+def cached_capabilities(ffmpeg_path):
+    """ffmpeg_path의 캐시된 조사 결과 (없거나 조사 전이면 None). 프로세스를 실행하지 않습니다."""
+    if not ffmpeg_path:
+        return None
+    result = shared_probe().cached(ffmpeg_path)
+    return result if result is not None and result["ok"] else None
@@ -0,0 +1,104 @@
+import heapq
+import os
+import threading
+
+
+class FilenameReserver:
+    """동시에 실행되는 작업들이 같은 출력 파일 이름을 고르지 않도록 이름을 예약합니다.
+
+    디렉터리마다 처음 한 번만 파일 목록을 읽어 메모리 색인을 만들고, 이후에는 색인과
+    (기본 이름, 확장자)별 다음 번호만 보고 이름을 정합니다. 예약은 빈 자리표시 파일을
+    O_EXCL로 만들어 다른 프로세스와도 겹치지 않게 합니다.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.directories = {}  # directory -> 파일 이름 집합
+        self.next_suffix = {}  # (directory, base_name, ext) -> 다음에 시도할 번호
+        self.free_suffixes = {}  # (directory, base_name, ext) -> 반납된 번호 (최소 힙)
+        self.reserved = {}  # path -> (key, suffix)
+
+    def _names(self, directory):
+        names = self.directories.get(directory)
+        if names is None:
+            try:
+                with os.scandir(directory) as entries:
+                    names = {os.path.normcase(entry.name) for entry in entries}
+            except OSError:
+                names = set()
+            self.directories[directory] = names
+        return names
+
+    @staticmethod
+    def _file_name(base_name, ext, suffix):
+        return f"{base_name}.{ext}" if suffix == 0 else f"{base_name}_{suffix}.{ext}"
+
+    def reserve(self, directory, base_name, ext):
+        """겹치지 않는 파일 이름을 예약하고 전체 경로를 반환합니다. (base.ext, base_1.ext, ...)"""
+        directory = os.path.abspath(directory)
+        key = (directory, base_name, ext)
+        with self.lock:
+            names = self._names(directory)
+            free = self.free_suffixes.get(key)
+            while True:
+                if free:
+                    suffix = heapq.heappop(free)  # 취소/실패로 반납된 이름을 먼저 재사용
+                else:
+                    suffix = self.next_suffix.get(key, 0)
+                    self.next_suffix[key] = suffix + 1
+                file_name = self._file_name(base_name, ext, suffix)
+                if os.path.normcase(file_name) in names:
+                    continue
+                path = os.path.join(directory, file_name)
+                try:
+                    os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                except FileExistsError:
+                    names.add(os.path.normcase(file_name))  # 색인 이후 다른 곳에서 만든 파일
+                    continue
+                names.add(os.path.normcase(file_name))
+                self.reserved[path] = (key, suffix)
+                return path
+
+    def claim(self, path):
+        """이어받는 작업처럼 이미 정해진 경로를 다른 작업이 고르지 않게 표시합니다."""
+        directory, file_name = os.path.split(os.path.abspath(path))
+        with self.lock:
+            self._names(directory).add(os.path.normcase(file_name))
+
+    def commit(self, path):
+        """다운로드가 끝난 이름. 파일이 남아 있으므로 색인에서 빼지 않습니다."""
+        with self.lock:
+            self.reserved.pop(os.path.abspath(path), None)
+
+    def retain(self, path):
+        """실패한 작업의 이름. 중간 파일(.part, .fNNN)이 남아 있으므로 번호를 반납하지 않고 계속 사용 중으로 둡니다.
+
+        반납하면 같은 제목의 다른 영상이 이 이름을 받아 남은 중간 파일을 이어받거나 병합하게 됩니다.
+        비어 있는 자리표시 파일만 지우며, 중간 파일은 다음 시작 때 작업 기록으로 정리됩니다.
+        """
+        path = os.path.abspath(path)
+        with self.lock:
+            self.reserved.pop(path, None)
+            try:
+                if os.path.getsize(path) == 0:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def release(self, path):
+        """취소/실패한 작업의 이름을 반납합니다. 비어 있는 자리표시 파일은 지웁니다."""
+        path = os.path.abspath(path)
+        with self.lock:
+            reservation = self.reserved.pop(path, None)
+            try:
+                if os.path.getsize(path) == 0:
+                    os.remove(path)
+            except OSError:
+                pass
+            if os.path.exists(path):
+                return  # 내용이 있는 파일은 그대로 둠
+            directory, file_name = os.path.split(path)
+            self._names(directory).discard(os.path.normcase(file_name))
+            if reservation is not None:
+                key, suffix = reservation
+                heapq.heappush(self.free_suffixes.setdefault(key, []), suffix)
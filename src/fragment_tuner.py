@@ -0,0 +1,161 @@
+import threading
+import time
+
+from retry_policy import host_key
+
+INITIAL_CONCURRENCY = 2  # 처음에는 작게 시작
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 16
+IMPROVEMENT_RATIO = 0.1  # 처리량이 이보다 많이 바뀌어야 늘리거나 줄임
+TUNE_INTERVAL = 2.0  # 받는 도중 처리량을 재서 동시 수를 바꾸는 간격 (초)
+GATE_POLL_SECONDS = 0.25  # 자리를 기다리는 동안 취소를 확인하는 간격
+STALE_HOLD_SECONDS = 15.0  # 이 시간 동안 읽지 않은 자리는 (끝까지 읽지 않고 버린 응답) 반납된 것으로 봄
+
+_local = threading.local()
+
+
+class _HostState:
+    def __init__(self):
+        self.concurrency = INITIAL_CONCURRENCY
+        self.throughput = 0.0  # 마지막으로 잰 처리량 (bytes/s)
+
+
+def tuning_key(info):
+    """동시 수를 익히는 단위: (미디어 호스트, 스트림 종류). 비디오와 오디오, 속도가 다른 서버를 따로 봅니다."""
+    url = info.get('fragment_base_url') or info.get('url') or ''
+    has_video = info.get('vcodec') not in (None, 'none')
+    has_audio = info.get('acodec') not in (None, 'none')
+    kind = 'av' if has_video and has_audio else 'video' if has_video else 'audio' if has_audio else 'unknown'
+    return host_key(url) if url else (info.get('extractor_key') or 'generic').lower(), kind
+
+
+def ungated_thread():
+    """이 스레드가 보내는 요청은 FragmentGate를 거치지 않게 합니다 (작업 스레드, 구간 다운로드 스레드)."""
+    _local.ungated = True
+
+
+class FragmentTuner:
+    """DASH/HLS 조각 동시 다운로드 수를 (호스트, 스트림 종류)별로 정합니다.
+
+    받는 동안 TUNE_INTERVAL마다 그때 쓴 동시 수와 처리량을 report()로 알려 주면,
+    처리량이 계속 좋아지는 동안은 하나씩 늘리고, 조각 재시도(서버 제한, 429 등)가 있었으면 절반으로 줄입니다.
+    yt-dlp의 조각 스레드 수는 파일을 시작할 때 정해지므로, 실제 동시 수는 FragmentGate로 바로 바꿉니다.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def concurrency(self, key):
+        with self.lock:
+            return self.hosts.setdefault(key, _HostState()).concurrency
+
+    def report(self, key, concurrency, throughput, errors=0):
+        """concurrency로 받은 파일의 처리량과 오류 수를 반영하고 다음에 쓸 동시 수를 반환합니다."""
+        with self.lock:
+            state = self.hosts.setdefault(key, _HostState())
+            if errors:
+                state.concurrency = max(MIN_CONCURRENCY, concurrency // 2)
+            elif throughput > state.throughput * (1 + IMPROVEMENT_RATIO):
+                state.concurrency = min(MAX_CONCURRENCY, concurrency + 1)
+            elif throughput < state.throughput * (1 - IMPROVEMENT_RATIO):
+                state.concurrency = max(MIN_CONCURRENCY, concurrency - 1)
+            else:
+                state.concurrency = concurrency
+            state.throughput = throughput
+            return state.concurrency
+
+
+class FragmentGate:
+    """조각 요청을 동시에 limit개까지만 보내게 하는 자리 제한. limit은 받는 도중에도 바꿀 수 있습니다.
+
+    yt-dlp의 조각 스레드는 MAX_CONCURRENCY개로 시작하고, 각 스레드는 요청(urlopen) 전에 자리를 얻어
+    응답을 끝까지 읽으면 반납합니다. 한 스레드는 자리 하나를 다음 요청(재시도, 다음 조각)에도 계속 씁니다.
+    """
+
+    def __init__(self, limit=INITIAL_CONCURRENCY, is_cancelled=None):
+        self.limit = limit
+        self.is_cancelled = is_cancelled
+        self.condition = threading.Condition()
+        self.holders = {}  # 스레드 -> 마지막으로 읽은 시각
+
+    def set_limit(self, limit):
+        with self.condition:
+            self.limit = max(MIN_CONCURRENCY, limit)
+            self.condition.notify_all()
+
+    def active(self):
+        with self.condition:
+            self._prune(time.monotonic())
+            return len(self.holders)
+
+    def _prune(self, now):
+        for thread, last_at in list(self.holders.items()):
+            if not thread.is_alive() or now - last_at > STALE_HOLD_SECONDS:
+                del self.holders[thread]
+
+    def acquire(self):
+        if getattr(_local, 'ungated', False):
+            return
+        thread = threading.current_thread()
+        with self.condition:
+            while thread not in self.holders:
+                now = time.monotonic()
+                self._prune(now)
+                if len(self.holders) < self.limit:
+                    self.holders[thread] = now
+                    return
+                if self.is_cancelled is not None and self.is_cancelled():
+                    raise Exception("Download cancelled")
+                self.condition.wait(GATE_POLL_SECONDS)
+            self.holders[thread] = time.monotonic()
+
+    def touch(self):
+        thread = threading.current_thread()
+        with self.condition:
+            if thread in self.holders:
+                self.holders[thread] = time.monotonic()
+
+    def release(self):
+        with self.condition:
+            if self.holders.pop(threading.current_thread(), None) is not None:
+                self.condition.notify()
+
+    def wrap(self, urlopen):
+        """YoutubeDL.urlopen을 감싸 요청마다 자리를 얻고, 응답을 끝까지 읽거나 닫으면 반납합니다."""
+        def gated_urlopen(request):
+            self.acquire()
+            try:
+                response = urlopen(request)
+            except BaseException:
+                self.release()
+                raise
+            if not getattr(_local, 'ungated', False):
+                self._release_at_end(response)
+            return response
+        return gated_urlopen
+
+    def _release_at_end(self, response):
+        read, close = response.read, response.close
+        # yt-dlp는 Content-Length만큼 읽으면 빈 응답을 더 읽지도, 닫지도 않고 끝냄
+        try:
+            remaining = [int(response.headers.get('Content-Length'))]
+        except (TypeError, ValueError):
+            remaining = [None]
+
+        def gated_read(amt=None, *args, **kwargs):
+            data = read(amt, *args, **kwargs)
+            if remaining[0] is not None:
+                remaining[0] -= len(data)
+            if amt is None or not data or (remaining[0] is not None and remaining[0] <= 0):
+                self.release()
+            else:
+                self.touch()
+            return data
+
+        def gated_close():
+            self.release()
+            close()
+
+        response.read = gated_read
+        response.close = gated_close
@@ -0,0 +1,211 @@
+"""프로세스 전체가 함께 쓰는 HTTP 연결 풀.
+
+썸네일(requests)과 yt-dlp의 추출/미디어 요청이 호스트마다 keep-alive 연결을 함께 씁니다.
+같은 호스트에 다시 요청할 때 TCP/TLS 핸드셰이크를 건너뛰므로, 여러 영상을 받을수록 절약이 큽니다.
+requests/urllib3(http_transport)는 처음 연결할 때 import하므로 GUI 시작 시간을 늘리지 않습니다.
+"""
+import threading
+
+from retry_policy import retry_engine, CircuitOpenError, WaitCancelled, THROTTLE_RETRIES
+
+DEFAULT_POOL_SIZE = 8  # 호스트마다 유지하는 keep-alive 연결 수
+# 호스트 끝부분 -> 유지할 연결 수 (나눠 받기/조각 동시 다운로드가 한 호스트에 연결을 많이 엶)
+HOST_POOL_SIZES = {
+    'googlevideo.com': 16,
+    'ytimg.com': 8,
+}
+MAX_HOSTS = 64  # 연결을 유지하는 호스트 수 (넘으면 가장 오래 안 쓴 호스트의 연결을 닫음)
+
+
+class PoolStats:
+    """호스트별 요청 수, 기존 연결로 보낸 요청 수, 새 연결(핸드셰이크) 수와 핸드셰이크에 걸린 시간."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hosts = {}  # 호스트 -> {'requests', 'reused', 'connections', 'handshake_seconds'}
+
+    def _host(self, host):
+        return self.hosts.setdefault(host, {'requests': 0, 'reused': 0, 'connections': 0, 'handshake_seconds': 0.0})
+
+    def request(self, host, reused=False):
+        """요청 하나를 기록합니다. reused는 이미 열려 있던 keep-alive 연결로 보냈는지입니다
+        (연결에 실패한 요청은 새 연결도 재사용도 아님)."""
+        with self.lock:
+            stats = self._host(host)
+            stats['requests'] += 1
+            if reused:
+                stats['reused'] += 1
+
+    def connected(self, host, seconds):
+        with self.lock:
+            stats = self._host(host)
+            stats['connections'] += 1
+            stats['handshake_seconds'] += seconds
+
+    def snapshot(self):
+        """전체 합계와 호스트별 값. reuse_ratio는 기존 연결로 보낸 요청의 비율입니다."""
+        with self.lock:
+            hosts = {host: summarize(dict(stats)) for host, stats in self.hosts.items()}
+        total = {'requests': 0, 'reused': 0, 'connections': 0, 'handshake_seconds': 0.0}
+        for stats in hosts.values():
+            for key in total:
+                total[key] += stats[key]
+        return dict(summarize(total), hosts=hosts)
+
+
+def summarize(stats):
+    requests_count, connections = stats['requests'], stats['connections']
+    stats['reuse_ratio'] = stats['reused'] / requests_count if requests_count else 0.0
+    stats['average_handshake'] = stats['handshake_seconds'] / connections if connections else 0.0
+    return stats
+
+
+pool_stats = PoolStats()
+
+
+class ConnectionPools:
+    """호스트별 keep-alive 연결 풀. 풀 크기는 configure()로 바꿀 수 있으며 그 뒤 새로 만드는 풀에 적용됩니다."""
+
+    def __init__(self, default_size=DEFAULT_POOL_SIZE, host_sizes=None, max_hosts=MAX_HOSTS):
+        self.default_size = default_size
+        self.host_sizes = dict(HOST_POOL_SIZES if host_sizes is None else host_sizes)
+        self.max_hosts = max_hosts
+        self.lock = threading.RLock()  # session()이 어댑터를 만들며 manager()를 부름
+        self._manager = None
+        self._session = None
+
+    def configure(self, default_size=None, host_sizes=None):
+        with self.lock:
+            if default_size is not None:
+                self.default_size = max(1, default_size)
+            if host_sizes is not None:
+                self.host_sizes.update(host_sizes)
+
+    def pool_size(self, host):
+        host = (host or '').lower()
+        for suffix, size in self.host_sizes.items():
+            if host == suffix or host.endswith('.' + suffix):
+                return max(size, self.default_size)
+        return self.default_size
+
+    def manager(self):
+        with self.lock:
+            if self._manager is None:
+                from http_transport import HostPoolManager, make_ssl_context
+
+                self._manager = HostPoolManager(self, num_pools=self.max_hosts, maxsize=self.default_size,
+                                                ssl_context=make_ssl_context())
+            return self._manager
+
+    def adapter(self, **kwargs):
+        from http_transport import SharedPoolAdapter
+
+        return SharedPoolAdapter(self, **kwargs)
+
+    def session(self):
+        """썸네일 등 yt-dlp 밖의 요청에 쓰는 공유 requests 세션."""
+        with self.lock:
+            if self._session is None:
+                import requests
+
+                session = requests.Session()
+                adapter = self.adapter()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def stats(self):
+        return pool_stats.snapshot()
+
+
+shared_pools = ConnectionPools()
+
+_install_lock = threading.Lock()
+_installed = False
+
+
+def install_yt_dlp_handler():
+    """yt-dlp가 http(s) 요청을 공유 풀로 보내도록 요청 핸들러를 등록합니다. 여러 번 불러도 됩니다.
+
+    YoutubeDL은 처음 요청할 때 등록된 핸들러 중에서 고르므로, YoutubeDL을 만들기 전에 불러야 합니다.
+    프록시, 인증서 옵션, source_address처럼 기본과 다른 설정이면 yt-dlp의 원래 세션을 씁니다.
+    모든 요청은 retry_engine의 호스트별 차단기를 거치며, 429를 받은 요청은 백오프 후 THROTTLE_RETRIES번까지 다시 보냅니다.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        from requests.models import CaseInsensitiveDict
+        from urllib3.util.retry import Retry
+        from yt_dlp.networking.common import register_rh, register_preference
+        from yt_dlp.networking._requests import RequestsRH, RequestsSession
+        from yt_dlp.networking.exceptions import HTTPError, RequestError
+
+        class CircuitOpenRequestError(RequestError):
+            pass  # RequestError여야 yt-dlp가 다른 핸들러로 다시 보내지 않음 (원인은 __cause__의 CircuitOpenError)
+
+        class CancelledRequestError(RequestError):
+            pass  # 백오프나 시험 요청을 기다리는 사이 작업이 취소됨
+
+        class SharedPoolRH(RequestsRH):
+            RH_NAME = 'requests-shared-pool'
+
+            def _send(self, request):
+                attempt = 0
+                while True:
+                    try:
+                        retry_engine.before_request(request.url)
+                    except CircuitOpenError as e:
+                        raise CircuitOpenRequestError(str(e), cause=e) from e
+                    except WaitCancelled as e:
+                        raise CancelledRequestError(str(e), cause=e) from e
+                    status = retry_after = None
+                    try:
+                        response = super()._send(request)
+                        status = response.status
+                        return response
+                    except HTTPError as e:
+                        status = e.status
+                        retry_after = e.response.headers.get('Retry-After')
+                        if status != 429 or attempt >= THROTTLE_RETRIES:
+                            raise
+                        e.response.close()
+                    finally:
+                        retry_engine.after_request(request.url, status, retry_after)
+                    attempt += 1
+                    # 그 사이 차단기가 열리면 다음 before_request에서 멈춤
+                    delay = retry_engine.throttle_delay(
+                        attempt, int(retry_after) if retry_after and retry_after.isdigit() else None)
+                    try:
+                        retry_engine.wait(delay)  # bind()한 작업이 취소되면 바로 멈춤
+                    except WaitCancelled as e:
+                        raise CancelledRequestError(str(e), cause=e) from e
+
+            def _create_instance(self, cookiejar, legacy_ssl_support=None):
+                if (legacy_ssl_support or self.legacy_ssl_support or not self.verify or self._client_cert
+                        or self.source_address or self.prefer_system_certs or self.proxies):
+                    return super()._create_instance(cookiejar, legacy_ssl_support)
+                # RequestsRH와 같은 세션이지만 어댑터만 공유 풀을 씀
+                session = RequestsSession()
+                session.adapters.clear()
+                adapter = shared_pools.adapter(max_retries=Retry(False))
+                session.headers = CaseInsensitiveDict({'Connection': 'keep-alive'})
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.cookies = cookiejar
+                session.trust_env = False
+                return session
+
+        register_rh(SharedPoolRH)
+        # RequestsRH의 선호도(100)에 더해지므로 기본 requests 핸들러보다 먼저 고름
+        register_preference(SharedPoolRH)(lambda handler, request: 50)
+        _installed = True
+
+
+def load_yt_dlp():
+    """공유 풀 핸들러를 등록한 뒤 yt_dlp 모듈을 반환합니다. 네트워크를 쓰는 YoutubeDL을 만들 때 씁니다."""
+    import yt_dlp
+
+    install_yt_dlp_handler()
+    return yt_dlp
@@ -0,0 +1,101 @@
+"""공유 연결 풀(http_pool)의 실제 전송 계층: 호스트별 크기의 urllib3 풀과 이를 쓰는 requests 어댑터.
+
+연결/요청 수와 핸드셰이크 시간을 http_pool.pool_stats에 기록합니다.
+"""
+import ssl
+import time
+
+from requests.adapters import HTTPAdapter
+from requests.utils import select_proxy
+from urllib3 import PoolManager
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from http_pool import pool_stats
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        pool_stats.connected(self.host, time.perf_counter() - started)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()  # TLS 핸드셰이크까지 포함
+        pool_stats.connected(self.host, time.perf_counter() - started)
+
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+    def _make_request(self, conn, *args, **kwargs):
+        pool_stats.request(self.host, reused=not conn.is_closed)  # 닫힌 연결이면 이 요청에서 새로 연결함
+        return super()._make_request(conn, *args, **kwargs)
+
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+    def _make_request(self, conn, *args, **kwargs):
+        pool_stats.request(self.host, reused=not conn.is_closed)  # 닫힌 연결이면 이 요청에서 새로 연결함
+        return super()._make_request(conn, *args, **kwargs)
+
+
+class HostPoolManager(PoolManager):
+    """호스트마다 정해진 크기의 연결 풀을 만드는 PoolManager."""
+
+    def __init__(self, pools, **kwargs):
+        super().__init__(**kwargs)
+        self.pools_config = pools
+        self.pool_classes_by_scheme = {'http': CountingHTTPConnectionPool, 'https': CountingHTTPSConnectionPool}
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        request_context = dict(request_context if request_context is not None else self.connection_pool_kw)
+        request_context['maxsize'] = self.pools_config.pool_size(host)
+        return super()._new_pool(scheme, host, port, request_context)
+
+
+class SharedPoolAdapter(HTTPAdapter):
+    """공유 PoolManager로 요청을 보내는 requests 어댑터. 세션을 닫아도 공유 연결은 닫지 않습니다.
+
+    인증서 검증은 공유 SSLContext가 맡습니다. 프록시 연결은 어댑터마다 따로 둡니다.
+    """
+
+    def __init__(self, pools, **kwargs):
+        self.pools = pools
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        self.poolmanager = self.pools.manager()
+
+    def cert_verify(self, conn, url, verify, cert):
+        pass
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        if select_proxy(request.url, proxies):
+            return super().get_connection_with_tls_context(request, verify, proxies, cert)
+        return self.poolmanager.connection_from_url(request.url)
+
+    def close(self):
+        for proxy in self.proxy_manager.values():
+            proxy.clear()
+
+
+def make_ssl_context():
+    """yt-dlp의 기본 설정(인증서 검증, certifi, ALPN http/1.1)과 같은 SSLContext."""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = True
+    context.verify_mode = ssl.CERT_REQUIRED
+    try:
+        context.set_alpn_protocols(['http/1.1'])
+    except NotImplementedError:
+        pass
+    try:
+        import certifi
+        context.load_verify_locations(cafile=certifi.where())
+    except ImportError:
+        context.load_default_certs()
+    return context
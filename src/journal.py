@@ -0,0 +1,144 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app_paths import get_app_data_directory
+
+QUEUED = "queued"
+PAUSED = "paused"
+RUNNING = "running"
+FINISHED = "finished"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# 앱이 비정상 종료되었을 때 다시 이어받아야 하는 상태
+RESUMABLE_STATUSES = (QUEUED, PAUSED, RUNNING)
+
+PROGRESS_WRITE_INTERVAL = 1.0  # 진행률 기록 최소 간격 (초)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    title TEXT,
+    format_json TEXT NOT NULL,
+    thumbnail_url TEXT,
+    output_dir TEXT NOT NULL,
+    output_path TEXT,
+    status TEXT NOT NULL,
+    downloaded_bytes INTEGER NOT NULL DEFAULT 0,
+    total_bytes INTEGER NOT NULL DEFAULT 0,
+    files_json TEXT NOT NULL DEFAULT '{}',
+    error TEXT,
+    cleaned INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+"""
+
+
+class JobJournal:
+    """다운로드 작업을 SQLite(WAL)에 기록해 비정상 종료 후에도 대기열을 복구할 수 있게 합니다.
+
+    작업마다 선택한 포맷, 출력 경로, 그리고 중간 파일별 받은 바이트 수를 남깁니다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_app_data_directory(), "jobs.sqlite3")
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+        self._migrate()
+        self.last_progress_write = {}  # job id -> monotonic time
+        self.files = {}  # job id -> {file name: [downloaded, total]}
+
+    def _migrate(self):
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(jobs)")}
+        if "cleaned" not in columns:
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN cleaned INTEGER NOT NULL DEFAULT 0")
+
+    def _execute(self, sql, params=()):
+        with self.lock:
+            return self.connection.execute(sql, params)
+
+    def add_job(self, url, title, format, output_dir, thumbnail_url=None, status=QUEUED):
+        now = time.time()
+        cursor = self._execute(
+            "INSERT INTO jobs (url, title, format_json, thumbnail_url, output_dir, status, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, title, json.dumps(format), thumbnail_url, output_dir, status, now, now))
+        return cursor.lastrowid
+
+    def set_status(self, job_id, status, error=None):
+        self._execute("UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                      (status, error, time.time(), job_id))
+        if status not in RESUMABLE_STATUSES:
+            self.last_progress_write.pop(job_id, None)
+            self.files.pop(job_id, None)
+
+    def set_output_path(self, job_id, output_path):
+        self._execute("UPDATE jobs SET output_path = ?, updated_at = ? WHERE id = ?",
+                      (output_path, time.time(), job_id))
+
+    def update_progress(self, job_id, file_name, downloaded_bytes, total_bytes, force=False):
+        """중간 파일별 받은 바이트 수를 기록합니다. 쓰기는 작업당 초당 한 번으로 제한됩니다."""
+        files = self.files.setdefault(job_id, {})
+        files[file_name] = [downloaded_bytes, total_bytes]
+        now = time.monotonic()
+        if not force and now - self.last_progress_write.get(job_id, 0) < PROGRESS_WRITE_INTERVAL:
+            return
+        self.last_progress_write[job_id] = now
+        downloaded = sum(d for d, _ in files.values())
+        total = sum(t for _, t in files.values())
+        self._execute("UPDATE jobs SET downloaded_bytes = ?, total_bytes = ?, files_json = ?, updated_at = ? "
+                      "WHERE id = ?", (downloaded, total, json.dumps(files), time.time(), job_id))
+
+    def resumable_jobs(self):
+        """대기 중이거나 실행 중에 중단된 작업들을 등록 순서대로 반환합니다."""
+        placeholders = ", ".join("?" for _ in RESUMABLE_STATUSES)
+        rows = self._execute(
+            f"SELECT id, url, title, format_json, thumbnail_url, output_dir, output_path, status, "
+            f"downloaded_bytes, total_bytes, files_json FROM jobs WHERE status IN ({placeholders}) ORDER BY id",
+            RESUMABLE_STATUSES).fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(zip(("id", "url", "title", "format", "thumbnail_url", "output_dir", "output_path",
+                            "status", "downloaded_bytes", "total_bytes", "files"), row))
+            job["format"] = json.loads(job["format"])
+            job["files"] = json.loads(job["files"] or "{}")
+            self.files[job["id"]] = job["files"]
+            jobs.append(job)
+        return jobs
+
+    def mark_cleaned(self, job_id):
+        """취소/실패한 작업의 중간 파일을 모두 지웠음을 기록합니다."""
+        self._execute("UPDATE jobs SET cleaned = 1, files_json = '{}', updated_at = ? WHERE id = ?",
+                      (time.time(), job_id))
+
+    def pending_cleanup(self):
+        """취소되었거나 실패했지만 중간 파일 정리가 끝나지 않은 작업들을 반환합니다.
+
+        실패한 작업은 같은 실행 안에서 다시 받으면 이어받도록 중간 파일을 남기므로, 다음 시작 때 정리합니다.
+        같은 경로를 나중의 작업이 쓰고 있으면 그 작업의 파일이므로 건너뜁니다 (표시만 정리됨으로 바꿈).
+        """
+        rows = self._execute(
+            "SELECT id, status, output_path, files_json, EXISTS (SELECT 1 FROM jobs AS later "
+            "WHERE later.output_path = jobs.output_path AND later.id > jobs.id) FROM jobs "
+            "WHERE status IN (?, ?) AND cleaned = 0 AND output_path IS NOT NULL", (CANCELLED, FAILED)).fetchall()
+        jobs = []
+        for job_id, status, output_path, files_json, reused in rows:
+            if reused:
+                self.mark_cleaned(job_id)
+                continue
+            jobs.append({"id": job_id, "status": status, "output_path": output_path,
+                         "files": json.loads(files_json or "{}")})
+        return jobs
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
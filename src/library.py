@@ -0,0 +1,202 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from app_paths import get_app_data_directory
+from metadata_cache import normalize_video_key
+
+QUICK_HASH_CHUNK = 1024 * 1024  # 빠른 해시에 읽는 앞/뒤 구간 크기
+
+# 가져오기 대상 확장자
+MEDIA_EXTENSIONS = {".mp4", ".webm", ".mkv", ".mov", ".m4a", ".mp3", ".opus", ".ogg", ".flac", ".wav", ".aac"}
+
+IMPORT_SIZE_TOLERANCE = 0.5  # 가져온 파일을 포맷에 맞출 때 허용하는 크기 차이 (병합 파일은 오디오만큼 큼)
+
+_ID_IN_BRACKETS_PATTERN = re.compile(r"\[([0-9A-Za-z_-]{11})\]")  # yt-dlp 기본 파일 이름: "제목 [id].ext"
+_URL_PATTERN = re.compile(r"https?://\S+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_key TEXT NOT NULL,
+    format_id TEXT,
+    format_selector TEXT,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    hash TEXT,
+    added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_video ON files (video_key, format_id);
+"""
+
+
+def video_key(info=None, url=None):
+    """추출기와 영상 ID로 라이브러리 키를 만듭니다. info가 없으면 URL에서 ID를 찾습니다."""
+    if info and info.get('extractor_key') and info.get('id'):
+        return f"{info['extractor_key'].lower()}:{info['id']}"
+    if url:
+        key = normalize_video_key(url)
+        if not key.startswith("url:"):
+            return key
+    return None
+
+
+def quick_hash(path, size=None):
+    """파일 크기와 앞/뒤 1 MiB로 만든 해시. 큰 파일도 전체를 읽지 않습니다."""
+    size = os.path.getsize(path) if size is None else size
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(QUICK_HASH_CHUNK))
+        if size > QUICK_HASH_CHUNK * 2:
+            f.seek(-QUICK_HASH_CHUNK, os.SEEK_END)
+            digest.update(f.read(QUICK_HASH_CHUNK))
+    return digest.hexdigest()
+
+
+def key_from_tags(path):
+    """mutagen으로 태그를 읽어 원본 영상 URL이 들어 있으면 키를 반환합니다."""
+    try:
+        import mutagen
+    except ImportError:
+        return None
+    try:
+        media = mutagen.File(path)
+    except Exception:
+        return None
+    if media is None or not media.tags:
+        return None
+    for _, value in media.tags.items():
+        values = value if isinstance(value, list) else [value]
+        for item in values:
+            for url in _URL_PATTERN.findall(str(item)):
+                key = video_key(url=url)
+                if key:
+                    return key
+    return None
+
+
+def match_imported(records, candidates, tolerance=IMPORT_SIZE_TOLERANCE):
+    """포맷을 모르는 가져온 파일을 확장자가 같고 크기가 가장 가까운 후보 포맷에 맞춥니다.
+
+    candidates는 (키, 확장자, 크기) 목록입니다. ({키: 기록}, 맞추지 못한 기록 목록)을 반환합니다.
+    """
+    matched = {}
+    unmatched = []
+    for record in records:
+        ext = os.path.splitext(record["path"])[1].lstrip(".").lower()
+        best = None
+        for key, candidate_ext, size in candidates:
+            if not size or (candidate_ext or "").lower() != ext:
+                continue
+            difference = abs(record["size"] - size) / size
+            if difference <= tolerance and (best is None or difference < best[0]):
+                best = (difference, key)
+        if best is None:
+            unmatched.append(record)
+        else:
+            matched.setdefault(best[1], record)
+    return matched, unmatched
+
+
+class LibraryIndex:
+    """이미 받은 파일을 (영상 키, 포맷)으로 기록하는 SQLite 색인입니다."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_app_data_directory(), "library.sqlite3")
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def _execute(self, sql, params=()):
+        with self.lock:
+            return self.connection.execute(sql, params)
+
+    def add(self, video_key, format_id, path, format_selector=None, size=None, hash=None):
+        path = os.path.abspath(path)
+        size = os.path.getsize(path) if size is None else size
+        self._execute(
+            "INSERT INTO files (video_key, format_id, format_selector, path, size, hash, added_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET video_key = excluded.video_key, format_id = excluded.format_id, "
+            "format_selector = excluded.format_selector, size = excluded.size, hash = excluded.hash, "
+            "added_at = excluded.added_at",
+            (video_key, format_id, format_selector, path, size, hash, time.time()))
+
+    def _existing(self, rows):
+        """파일이 지워졌거나 크기가 바뀐 기록은 버리고 남은 것만 반환합니다."""
+        existing = []
+        for row in rows:
+            record = dict(zip(("video_key", "format_id", "format_selector", "path", "size"), row))
+            try:
+                if os.path.getsize(record["path"]) == record["size"]:
+                    existing.append(record)
+                    continue
+            except OSError:
+                pass
+            self._execute("DELETE FROM files WHERE path = ?", (record["path"],))
+        return existing
+
+    def lookup(self, video_key, format_id, any_format=False):
+        """해당 영상/포맷(또는 같은 포맷 선택식으로 받은) 파일이 있으면 기록을 반환합니다.
+
+        any_format이면 포맷을 모르는 가져온 파일도 같은 영상으로 봅니다.
+        """
+        rows = self._execute(
+            "SELECT video_key, format_id, format_selector, path, size FROM files "
+            "WHERE video_key = ? AND (format_id = ? OR format_selector = ? OR (? AND format_id IS NULL))",
+            (video_key, format_id, format_id, any_format)).fetchall()
+        existing = self._existing(rows)
+        return existing[0] if existing else None
+
+    def formats(self, video_key):
+        """영상의 받은 파일들을 format_id별로 반환합니다. 포맷을 모르는 가져온 파일은 imported로 따로 봅니다."""
+        rows = self._execute(
+            "SELECT video_key, format_id, format_selector, path, size FROM files "
+            "WHERE video_key = ? AND format_id IS NOT NULL",
+            (video_key,)).fetchall()
+        return {record["format_id"]: record for record in self._existing(rows)}
+
+    def imported(self, video_key):
+        """포맷을 모르고 가져온 파일들의 기록 목록."""
+        rows = self._execute(
+            "SELECT video_key, format_id, format_selector, path, size FROM files "
+            "WHERE video_key = ? AND format_id IS NULL",
+            (video_key,)).fetchall()
+        return self._existing(rows)
+
+    def import_directory(self, directory, is_cancelled=None):
+        """폴더의 미디어 파일을 색인에 넣습니다. 파일 이름의 [id] 또는 태그의 URL로 영상을 찾습니다.
+
+        포맷은 알 수 없으므로 format_id 없이 기록합니다. 가져온 파일 수를 반환합니다.
+        """
+        known = {row[0] for row in self._execute("SELECT path FROM files").fetchall()}
+        imported = 0
+        for root, _, file_names in os.walk(directory):
+            for file_name in file_names:
+                if is_cancelled is not None and is_cancelled():
+                    return imported
+                if os.path.splitext(file_name)[1].lower() not in MEDIA_EXTENSIONS:
+                    continue
+                path = os.path.abspath(os.path.join(root, file_name))
+                if path in known:
+                    continue
+                match = _ID_IN_BRACKETS_PATTERN.search(file_name)
+                key = f"youtube:{match.group(1)}" if match else key_from_tags(path)
+                if key is None:
+                    continue
+                try:
+                    size = os.path.getsize(path)
+                    self.add(key, None, path, size=size, hash=quick_hash(path, size))
+                    imported += 1
+                except OSError as e:
+                    print(f"Error importing {path}: {e}")
+        return imported
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
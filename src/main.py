@@ -1,213 +1,225 @@
+from startup import startup_timer  # 시작 시간 측정 기준점이므로 가장 먼저 import
 import sys
 import os
 from pathlib import Path
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QLineEdit, QPushButton, QTabWidget, QFileDialog, 
                              QTableWidget, QTableWidgetItem, QHeaderView, QProgressBar, QGridLayout,
-                             QMessageBox, QStackedWidget, QDialogButtonBox, QSizePolicy)
-from PyQt6.QtCore import Qt, QThread, QRunnable, QThreadPool, pyqtSignal, pyqtSlot, QObject, QSize, QUrl
+                             QMessageBox, QStackedWidget, QDialogButtonBox, QSizePolicy, QSpinBox, QMenu, QTableView, QComboBox,
+                             QDoubleSpinBox, QCheckBox, QDialog, QPlainTextEdit)
+from PyQt6.QtCore import (Qt, QThread, QRunnable, QThreadPool, pyqtSignal, pyqtSlot, QObject, QSize, QUrl, QTimer,
+                          QSortFilterProxyModel)
 from PyQt6.QtGui import QPalette, QColor, QPixmap, QIcon, QMovie, QImage, QFont, QDesktopServices
-import yt_dlp
 import shutil
-import requests
 from io import BytesIO
 import threading
 import re
-import subprocess
-
-def get_video_formats(url, ffmpeg_path):
-    ydl_opts = {
-        'ffmpeg_location': ffmpeg_path
-    }
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        # Extract video information without downloading
-        info_dict = ydl.extract_info(url, download=False)
-        return info_dict
-
-class SearchWorker(QRunnable):
-    def __init__(self, url, ffmpeg_path):
+import time
+from urllib.parse import urlparse
+from metadata_cache import MetadataCache, normalize_video_key
+from thumbnails import ThumbnailService
+from scheduler import DownloadScheduler, QUEUED, PAUSED
+from progress import ProgressTable
+import journal
+from journal import JobJournal
+from playlist import is_playlist_url, iter_playlist, QUALITY_PRESETS, AUDIO_PRESET
+from ffmpeg_probe import shared_probe
+from library import LibraryIndex, video_key, match_imported
+from bandwidth import BandwidthGovernor
+from segmented import MAX_SEGMENTS
+from postprocess import PostProcessPool
+from audio import (AUDIO_TARGETS, AUDIO_BITRATES, DEFAULT_BITRATE, audio_formats, format_key, is_lossy_target,
+                   unavailable_targets, target_extension, ORIGINAL)
+from downloader import (DownloadJob, check_if_merged_format, download_key, format_time, cleanup_leftover_files,
+                        warm_up)
+from search import SearchCoordinator
+from http_pool import pool_stats
+from metrics import event_log, MetricsServer
+from batch import BatchLookup, parse_urls, choose_formats
+from playlist_view import PlaylistModel
+from batch_view import BatchModel, SORT_ROLE, READY, QUEUED as BATCH_QUEUED, LOOKING as BATCH_LOOKING
+from download_list import (DownloadListModel, JobRecord, ThumbnailDelegate, ProgressDelegate, StatusDelegate,
+                           THUMBNAIL_COLUMN, PROGRESS_COLUMN, STATUS_COLUMN, format_speed)
+
+startup_timer.mark("imports")
+
+PROGRESS_UPDATE_INTERVAL_MS = 100  # 진행률 화면 갱신 주기 (10 Hz)
+PREFETCH_DELAY_MS = 300  # 링크 입력이 멈추고 미리 추출을 시작하기까지의 시간
+
+VIDEO_THUMBNAIL_SIZE = (0, 120)  # 검색 결과 썸네일 (높이 120)
+LIST_THUMBNAIL_SIZE = (70, 50)  # 다운로드 목록 썸네일
+
+class SearchSignals(QObject):
+    """SearchCoordinator의 콜백(추출 스레드)을 GUI 스레드로 넘깁니다."""
+    result = pyqtSignal(int, object)  # 세대 ID, info dict
+    error = pyqtSignal(int, str)  # 세대 ID, 오류 메시지
+
+class BatchSignals(QObject):
+    """BatchLookup의 콜백(추출 스레드)을 GUI 스레드로 넘깁니다. 첫 인자는 결과를 보낸 BatchLookup입니다."""
+    result = pyqtSignal(object, int, object, object, object)  # lookup, 순번, info, 고른 포맷, 적용한 선택식
+    error = pyqtSignal(object, int, str)  # lookup, 순번, 오류 메시지
+
+class WorkerSignals(QObject):
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+class FormatChoiceSignals(QObject):
+    result = pyqtSignal(object, object, object, object, bool)  # 행, info, 고른 포맷 (모두 목록), 선택식, 대기열에 넣을지
+    error = pyqtSignal(str)
+
+class FormatChoiceWorker(QRunnable):
+    """일괄 다운로드 목록의 포맷을 새 정책으로 다시 고릅니다. 행마다 YoutubeDL을 쓰므로 GUI 스레드에서 하지 않습니다."""
+    def __init__(self, rows, infos, selector, ffmpeg_path, enqueue=False):
         super().__init__()
-        self.url = url
+        self.rows = rows
+        self.infos = infos
+        self.selector = selector
         self.ffmpeg_path = ffmpeg_path
-        self.signals = WorkerSignals()
+        self.enqueue = enqueue
+        self.signals = FormatChoiceSignals()
 
     def run(self):
         try:
-            video_formats = get_video_formats(self.url, self.ffmpeg_path)
-            self.signals.result.emit(video_formats)
+            chosen = choose_formats(self.infos, self.selector, self.ffmpeg_path)
         except Exception as e:
             self.signals.error.emit(str(e))
+            return
+        self.signals.result.emit(self.rows, self.infos, chosen, self.selector, self.enqueue)
 
-class WorkerSignals(QObject):
-    result = pyqtSignal(object)
+class WarmUpWorker(QRunnable):
+    """창이 뜬 뒤 yt_dlp를 미리 import해서 첫 검색이 import를 기다리지 않게 합니다."""
+    def __init__(self):
+        super().__init__()
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            warm_up()
+        except Exception as e:
+            if sys.is_finalizing():
+                return  # 종료 중 import 실패
+            event_log.error("warm_up_failed", error=str(e))
+            try:
+                self.signals.error.emit(str(e))
+            except RuntimeError:
+                pass  # 불러오는 사이 창이 닫힘
+            return
+        try:
+            self.signals.result.emit(None)
+        except RuntimeError:
+            pass  # 불러오는 사이 창이 닫힘
+
+class FFmpegProbeWorker(QRunnable):
+    """ffmpeg 조사를 백그라운드에서 실행합니다."""
+    def __init__(self, ffmpeg_probe, ffmpeg_path):
+        super().__init__()
+        self.ffmpeg_probe = ffmpeg_probe
+        self.ffmpeg_path = ffmpeg_path
+        self.signals = WorkerSignals()
+
+    def run(self):
+        self.signals.result.emit(self.ffmpeg_probe.probe(self.ffmpeg_path))
+
+class PlaylistWorkerSignals(QObject):
+    info = pyqtSignal(object)  # 재생목록 정보
+    entries = pyqtSignal(object)  # 새로 발견된 항목 목록
+    finished = pyqtSignal(int)  # 전체 항목 수
     error = pyqtSignal(str)
 
-class DownloadWorkerSignals(QObject):
-    progress = pyqtSignal(int, float, str, bool, bool)  # row, progress percentage, remaining time, is_merged_format, is_video
-    finished = pyqtSignal(int)  # row
-    error = pyqtSignal(int, str)  # row, error message
+class PlaylistWorker(QRunnable):
+    """재생목록/채널을 평면 추출로 펼쳐 항목을 조금씩 묶어서 보냅니다."""
+    BATCH_INTERVAL = 0.2  # 초
 
-class DownloadWorker(QRunnable):
-    def __init__(self, row, url, format, output_path, video_title, ffmpeg_path):
+    def __init__(self, url, ffmpeg_path):
         super().__init__()
-        self.row = row
         self.url = url
-        self.format = format
-        self.output_path = output_path
-        self.video_title = video_title
         self.ffmpeg_path = ffmpeg_path
-        self.signals = DownloadWorkerSignals()
+        self.signals = PlaylistWorkerSignals()
         self.is_cancelled = threading.Event()
-        self.ydl = None
-        self.full_path = None
-        self.total_bytes = 0
-        self.downloaded_bytes = 0
-        self.merging = False
-        self.is_merged_format = self.check_if_merged_format(format)
-        self.is_video_download = True
-        self.max_progress = 0
 
-    def check_if_merged_format(self, format):
-        return 'acodec' in format and format['acodec'] != 'none' and \
-               'vcodec' in format and format['vcodec'] != 'none'
-
-    @staticmethod
-    def generate_unique_filename(base_name, ext, output_path):
-            file_name = f"{base_name}.{ext}"
-            counter = 1
-            while os.path.exists(os.path.join(output_path, file_name)):
-                file_name = f"{base_name}_{counter}.{ext}"
-                counter += 1
-            return file_name
+    def cancel(self):
+        self.is_cancelled.set()
 
     def run(self):
-        safe_title = self.video_title.replace(' ', '_')
-        resolution = self.format.get('height', None)
-        ext = self.format.get('ext', 'mp4')
-        if resolution is None:
-            resolution = "Unknown_resolution"
-        else:
-            resolution = f"{resolution}p"
-        base_name = f"{safe_title}_{resolution}"
-        file_name = self.generate_unique_filename(base_name, ext, self.output_path)
-        full_path = os.path.join(self.output_path, file_name)
-        self.full_path = full_path
-
-        # 기존 파일 삭제
-        if os.path.exists(self.full_path):
-            try:
-                os.remove(self.full_path)
-                print(f"Deleted existing file: {self.full_path}")
-            except Exception as e:
-                print(f"Error deleting existing file: {e}")
-
-        ydl_opts = {
-            'format': self.format.get('format_id', 'bestvideo')+'+bestaudio/best',
-            'outtmpl': full_path,
-            'progress_hooks': [self.progress_hook],
-            'merge_output_format': ext,
-            'retries': 10,  # 재시도 횟수 증가
-            'fragment_retries': 10,  # 프래그먼트 다운로드 재시도 횟수
-            'skip_unavailable_fragments': True,  # 사용 불가능한 프래그먼트 건너뛰기
-            'keepvideo': False,  # 병합 후 원본 파일 삭제
-            'overwrites': True,  # 기존 파일 덮어쓰기
-            'postprocessor_hooks': [self.postprocessor_hook],
-            'ffmpeg_location': self.ffmpeg_path  # ffmpeg 경로 추가
-        }
-
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                self.ydl = ydl
-                info = ydl.extract_info(self.url, download=False)
-                self.total_bytes = info.get('filesize') or info.get('filesize_approx', 0)
-                if not self.is_cancelled.is_set():
-                    ydl.download([self.url])
+            entries = iter_playlist(self.url, self.ffmpeg_path, self.is_cancelled.is_set)
+            self.signals.info.emit(next(entries))
+            batch = []
+            count = 0
+            last_emit = time.monotonic()
+            for entry in entries:
+                batch.append(entry)
+                count += 1
+                # 첫 항목은 바로, 이후는 일정 간격으로 묶어서 보냄
+                if count == 1 or time.monotonic() - last_emit >= self.BATCH_INTERVAL:
+                    self.signals.entries.emit(batch)
+                    batch = []
+                    last_emit = time.monotonic()
+            if batch:
+                self.signals.entries.emit(batch)
             if not self.is_cancelled.is_set():
-                self.signals.finished.emit(self.row)
+                self.signals.finished.emit(count)
         except Exception as e:
             if not self.is_cancelled.is_set():
-                self.signals.error.emit(self.row, str(e))
-        finally:
-            # 다운로드 완료 또는 취소 후 부분 다운로드 파일 삭제
-            self.cleanup_temp_files()
+                self.signals.error.emit(str(e))
 
-    def cancel(self):
-        self.is_cancelled.set()
-        if self.ydl:
-            self.ydl.params['outtmpl'] = os.devnull  # 출력을 무시합니다
-
-    def progress_hook(self, d):
-        if self.is_cancelled.is_set():
-            raise Exception("Download cancelled")
-        if d['status'] == 'downloading':
-            self.downloaded_bytes = d.get('downloaded_bytes', 0)
-            if self.total_bytes > 0:
-                progress = (self.downloaded_bytes / self.total_bytes) * 100
-            else:
-                progress = 0
+class DownloadWorkerSignals(QObject):
+    started = pyqtSignal(int)  # row
+    progress = pyqtSignal(int, float, str, bool, bool, float, int)  # row, progress percentage, remaining time, is_merged_format, is_video, speed, connections
+    finished = pyqtSignal(int)  # row
+    error = pyqtSignal(int, str)  # row, error message
+    skipped = pyqtSignal(int, str)  # row, 이미 있는 파일 경로
+    deferred = pyqtSignal(int, str, float)  # row, 요청을 제한한 호스트, 다시 시도할 시각
+
+class DownloadWorker(DownloadJob):
+    """다운로드 엔진의 작업을 GUI에 연결합니다. 진행률은 공유 테이블에, 나머지는 시그널로 알립니다."""
+
+    def __init__(self, row, url, format, output_path, video_title, ffmpeg_path, metadata_cache=None, info=None,
+                 postprocess_slot=None, progress_table=None, journal=None, journal_id=None, output_file=None,
+                 library=None, governor=None, segments=1, stream_merge=False, postprocess_pool=None):
+        super().__init__(row, url, format, output_path, video_title, ffmpeg_path, metadata_cache, info,
+                         postprocess_slot, journal, journal_id, output_file, library=library, governor=governor,
+                         segments=segments, stream_merge=stream_merge, postprocess_pool=postprocess_pool)
+        self.row = row
+        self.progress_table = progress_table  # 있으면 시그널 대신 공유 테이블에 기록
+        self.signals = DownloadWorkerSignals()
 
-            if progress < self.max_progress and not self.is_merged_format:
-                self.is_video_download = False
-            self.max_progress = max(self.max_progress, progress)
+    def on_started(self):
+        self.signals.started.emit(self.row)
 
-            speed = d.get('speed', 0)
-            if speed:
-                eta = (self.total_bytes - self.downloaded_bytes) / speed
-            else:
-                eta = 0
-
-            print(f"Emitting progress: {progress:.2f}%, Is Merged Format: {self.is_merged_format}, Is Video: {self.is_video_download}")
-            self.signals.progress.emit(self.row, progress, self.format_time(eta), self.is_merged_format, self.is_video_download)
-
-    def postprocessor_hook(self, d):
-        if d['status'] == 'started':
-            self.merging = True
-            self.signals.progress.emit(self.row, 99, "Merging...", self.is_merged_format, self.is_video_download)
-        elif d['status'] == 'finished':
-            self.merging = False
-            self.signals.progress.emit(self.row, 100, "Complete", self.is_merged_format, self.is_video_download)
-
-    @staticmethod
-    def format_time(seconds):
-        m, s = divmod(seconds, 60)
-        h, m = divmod(m, 60)
-        return f"{h:02.0f}:{m:02.0f}:{s:02.0f}"
-
-    def cleanup_temp_files(self):
-        if self.full_path:
-            base_path, extension = os.path.splitext(self.full_path)
-            base_name = os.path.basename(base_path)
-            dir_path = os.path.dirname(self.full_path)
-
-            # Pattern to match temporary files
-            pattern = rf"{re.escape(base_name)}\.f\d+{re.escape(extension)}"
-
-            for file_name in os.listdir(dir_path):
-                if re.match(pattern, file_name):
-                    file_path = os.path.join(dir_path, file_name)
-                    try:
-                        os.remove(file_path)
-                    except Exception as e:
-                        print(f"Error deleting temporary file {file_path}: {e}")
-
-            # Pattern to match temporary files
-            pattern = rf"{re.escape(base_name)}\.f\d+{re.escape(extension)}\.part"
-
-            for file_name in os.listdir(dir_path):
-                if re.match(pattern, file_name):
-                    file_path = os.path.join(dir_path, file_name)
-                    try:
-                        os.remove(file_path)
-                    except Exception as e:
-                        print(f"Error deleting temporary file {file_path}: {e}")
-
-            # Check for and delete .part file
-            part_file = f"{self.full_path}.part"
-            if os.path.exists(part_file):
-                try:
-                    os.remove(part_file)
-                except Exception as e:
-                    print(f"Error deleting partial file {part_file}: {e}")
+    def on_progress(self, progress, time_left):
+        if self.progress_table is not None:
+            self.progress_table.update(self.row, progress, time_left, self.is_merged_format, self.is_video_download,
+                                       self.speed, self.connections())
+        else:
+            self.signals.progress.emit(self.row, progress, time_left, self.is_merged_format, self.is_video_download,
+                                       float(self.speed), self.connections())
+
+    def on_finished(self):
+        self.signals.finished.emit(self.row)
+
+    def on_error(self, message):
+        self.signals.error.emit(self.row, message)
+
+    def on_skipped(self, path):
+        self.signals.skipped.emit(self.row, path)
+
+    def on_deferred(self, host, retry_at):
+        self.signals.deferred.emit(self.row, host, retry_at)
+
+class LibraryImportWorker(QRunnable):
+    """폴더의 기존 파일들을 라이브러리 색인에 가져옵니다."""
+    def __init__(self, library, directory):
+        super().__init__()
+        self.library = library
+        self.directory = directory
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            self.signals.result.emit(self.library.import_directory(self.directory))
+        except Exception as e:
+            self.signals.error.emit(str(e))
 
 class SelectAllLineEdit(QLineEdit):
     def mousePressEvent(self, event):
@@ -246,20 +258,72 @@ class YouTubeDownloader(QMainWindow):
         input_layout.addWidget(self.dest_input, 1, 1)
         input_layout.addWidget(browse_button, 1, 2)
 
+        concurrency_label = QLabel("동시 다운로드:")
+        concurrency_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        self.concurrency_input = QSpinBox()
+        self.concurrency_input.setRange(1, 16)
+        self.concurrency_input.setValue(3)
+        input_layout.addWidget(concurrency_label, 2, 0)
+        input_layout.addWidget(self.concurrency_input, 2, 1, Qt.AlignmentFlag.AlignLeft)
+
+        self.library_import_button = QPushButton("라이브러리 가져오기")
+        self.library_import_button.setToolTip("이미 받은 파일이 있는 폴더를 등록해 같은 영상/포맷을 다시 받지 않게 합니다")
+        self.library_import_button.clicked.connect(self.import_library)
+        input_layout.addWidget(self.library_import_button, 2, 2)
+
+        # 대역폭 제한 (0 = 무제한, 실행 중에도 바로 적용)
+        rate_label = QLabel("속도 제한:")
+        rate_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        rate_layout = QHBoxLayout()
+        self.total_rate_input = self.create_rate_input("전체 ")
+        self.per_job_rate_input = self.create_rate_input("작업당 ")
+        rate_layout.addWidget(self.total_rate_input)
+        rate_layout.addWidget(self.per_job_rate_input)
+        # 진행형(단일 파일) 포맷을 몇 개의 연결로 나눠 받을지 (1 = 나누지 않음)
+        segments_label = QLabel("연결 수:")
+        self.segments_input = QSpinBox()
+        self.segments_input.setRange(1, MAX_SEGMENTS)
+        self.segments_input.setValue(4)
+        self.segments_input.setToolTip("비디오+오디오가 합쳐진 단일 파일 포맷을 여러 연결로 나눠 받습니다")
+        rate_layout.addWidget(segments_label)
+        rate_layout.addWidget(self.segments_input)
+        self.stream_merge_checkbox = QCheckBox("스트리밍 병합")
+        self.stream_merge_checkbox.setToolTip("비디오와 오디오를 받으면서 바로 합칩니다. 중간 파일과 병합 대기 시간이 없습니다.\n"
+                                              "(ffmpeg가 직접 받으므로 속도 제한이 켜져 있으면 사용하지 않습니다)")
+        rate_layout.addWidget(self.stream_merge_checkbox)
+        rate_layout.addStretch()
+        input_layout.addWidget(rate_label, 3, 0)
+        input_layout.addLayout(rate_layout, 3, 1)
+
         self.main_layout.addLayout(input_layout)
 
         # 검색 버튼
         self.search_button = QPushButton("검색")
         self.search_button.clicked.connect(self.search_video)
         self.url_input.returnPressed.connect(self.search_video)
-        self.main_layout.addWidget(self.search_button)
+        # 링크를 붙여 넣으면 Enter를 누르기 전에 미리 추출 (입력 중에는 멈출 때까지 기다림)
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(PREFETCH_DELAY_MS)
+        self.prefetch_timer.timeout.connect(self.prefetch_video)
+        self.url_input.textChanged.connect(lambda _: self.prefetch_timer.start())
+        # 여러 링크를 한꺼번에 검색 (붙여 넣기 또는 텍스트 파일)
+        self.batch_button = QPushButton("여러 링크...")
+        self.batch_button.setToolTip("링크를 여러 줄 붙여 넣거나 텍스트 파일에서 불러와 한꺼번에 검색합니다.\n"
+                                     "텍스트 파일을 창에 끌어다 놓아도 됩니다.")
+        self.batch_button.clicked.connect(self.open_batch_dialog)
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.search_button, 1)
+        search_layout.addWidget(self.batch_button)
+        self.main_layout.addLayout(search_layout)
+        self.setAcceptDrops(True)
 
         # 탭 위젯
         self.tab_widget = QTabWidget()
         self.video_tab = QWidget()
-        # self.audio_tab = QWidget() # Feature for version 2.1
+        self.audio_tab = QWidget()
         self.tab_widget.addTab(self.video_tab, "동영상")
-        # self.tab_widget.addTab(self.audio_tab, "오디오") # Feature for version 2.1
+        self.tab_widget.addTab(self.audio_tab, "오디오")
 
         # 비디오 탭 내용
         video_layout = QVBoxLayout(self.video_tab)
@@ -314,6 +378,13 @@ class YouTubeDownloader(QMainWindow):
         self.duration_label.setContentsMargins(0, 0, 0, 0)
         self.duration_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom)
         video_text_layout.addWidget(self.duration_label)
+
+        # 포맷을 알 수 없는 가져온 파일이 있으면 영상 단위로 표시
+        self.library_label = QLabel()
+        self.library_label.setStyleSheet("color: #1565C0;")
+        self.library_label.setContentsMargins(0, 0, 0, 0)
+        self.library_label.hide()
+        video_text_layout.addWidget(self.library_label)
         
         # 수직 레이아웃을 메인 레이아웃에 추가
         self.video_info_layout.addLayout(video_text_layout, 1)  # 1 stretch factor
@@ -357,6 +428,9 @@ class YouTubeDownloader(QMainWindow):
         # 스택 위젯에 컨텐츠 추가
         self.video_stack.addWidget(self.video_content_widget)
 
+        # 오디오 탭 내용
+        self.setup_audio_tab()
+
         # 로딩 위젯 생성
         self.loading_widget = QLabel()
         self.loading_widget.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -369,16 +443,85 @@ class YouTubeDownloader(QMainWindow):
             print(f"Error: Could not load the GIF file at {gif_path}")
         self.video_stack.addWidget(self.loading_widget)
 
-        # 스레드풀 초기화
+        # 재생목록/채널 위젯
+        self.setup_playlist_widget()
+        self.video_stack.addWidget(self.playlist_widget)
+        self.playlist_worker = None
+        self.playlist_auto_enqueue = False
+
+        # 여러 링크 검색 위젯
+        self.setup_batch_widget()
+        self.video_stack.addWidget(self.batch_widget)
+        self.batch_lookup = None
+        self.batch_auto_enqueue = False
+        self.batch_signals = BatchSignals()
+        self.batch_signals.result.connect(self.batch_result)
+        self.batch_signals.error.connect(self.batch_error)
+
+        # 스레드풀 초기화 (검색용)
         self.threadpool = QThreadPool()
 
+        # 다운로드 스케줄러 (네트워크 작업 수 제한 + 후처리 슬롯)
+        self.scheduler = DownloadScheduler(max_downloads=self.concurrency_input.value())
+        self.concurrency_input.valueChanged.connect(self.scheduler.set_max_downloads)
+
         self.ffmpeg_path = self.get_ffmpeg_path()
 
+        # ffmpeg 상태 조사 (결과는 실행 파일 기준으로 캐시, 없으면 백그라운드에서 조사)
+        self.ffmpeg_probe = shared_probe()  # 다운로드 작업도 같은 조사 결과로 인코더를 고름
+        self.ffmpeg_capabilities = None
+        self.ffmpeg_probe_running = False
+        self.apply_ffmpeg_capabilities(self.ffmpeg_probe.cached(self.ffmpeg_path))
+        if self.ffmpeg_capabilities is None:
+            self.start_ffmpeg_probe()
+
+        # 작업 저널 (비정상 종료 후 대기열 복구)
+        self.journal = JobJournal()
+
+        # 이미 받은 파일 색인 (영상 키 + 포맷)
+        self.library = LibraryIndex()
+
+        # 모든 다운로드가 함께 쓰는 대역폭 제한기
+        self.bandwidth_governor = BandwidthGovernor()
+        # 끝난 다운로드의 병합을 CPU 코어 수만큼만 동시에 실행하는 후처리 풀
+        self.postprocess_pool = PostProcessPool()
+        self.metrics_server = None
+        if os.environ.get("YTD_METRICS_PORT"):
+            # 127.0.0.1에서 Prometheus 형식 지표를 내줌 (작업별 기록은 앱 데이터 폴더의 events.jsonl)
+            try:
+                self.metrics_server = MetricsServer(int(os.environ["YTD_METRICS_PORT"]))
+                self.metrics_server.start()
+            except (OSError, ValueError) as e:
+                print(f"Error starting metrics server: {e}")
+                self.metrics_server = None
+        self.total_rate_input.valueChanged.connect(
+            lambda value: self.bandwidth_governor.set_total_rate(int(value * 1024 * 1024)))
+        self.per_job_rate_input.valueChanged.connect(
+            lambda value: self.bandwidth_governor.set_per_job_rate(int(value * 1024 * 1024)))
+
+        # 메타데이터 캐시 (메모리 LRU + 디스크)
+        self.metadata_cache = MetadataCache()
+
+        # 검색 조율 (같은 영상 검색은 추출 하나를 공유, 새 검색이 시작되면 이전 추출은 취소)
+        self.search_coordinator = SearchCoordinator(self.ffmpeg_path, self.metadata_cache)
+        self.search_signals = SearchSignals()
+        self.search_signals.result.connect(self.search_result)
+        self.search_signals.error.connect(self.search_failed)
+
+        # 썸네일 서비스 (백그라운드 다운로드 + 캐시)
+        self.thumbnail_service = ThumbnailService(parent=self)
+
         self.download_workers = {}
         self.worker_count = 0
 
+        # 진행률 집계: 워커는 테이블에 기록하고, 타이머가 바뀐 행만 화면에 반영
+        self.progress_table = ProgressTable()
+        self.progress_timer = QTimer(self)
+        self.progress_timer.timeout.connect(self.apply_progress_updates)
+        self.progress_timer.start(PROGRESS_UPDATE_INTERVAL_MS)
+
         self.video_title = ""
-        self.downloading_items = set()  # (video_title, format_id) 튜플을 저
+        self.downloading_items = set()  # download_key()로 만든 (영상 ID 또는 URL, 포맷 키) 튜플
 
         # 새로운 레이아웃 생성
         content_layout = QVBoxLayout()
@@ -389,6 +532,36 @@ class YouTubeDownloader(QMainWindow):
 
         self.apply_widget_styles()
 
+        # 상태 표시줄 (대기열 정보)
+        self.queue_status_label = QLabel()
+        self.statusBar().addPermanentWidget(self.queue_status_label)
+        self.queue_status_timer = QTimer(self)
+        self.queue_status_timer.timeout.connect(self.update_queue_status)
+        self.queue_status_timer.start(1000)
+
+        self.restore_jobs()
+        self.update_queue_status()
+
+        # 정리가 끝나지 않은 취소/실패 작업이 있으면 그 디렉터리만 한 번 훑어서 정리
+        pending_cleanup = self.journal.pending_cleanup()
+        if pending_cleanup:
+            threading.Thread(target=self.cleanup_leftover_files, args=(pending_cleanup,), daemon=True).start()
+
+        startup_timer.mark("window")
+        self.warm_up_started = False
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.warm_up_started:
+            # 첫 화면을 그린 뒤에 무거운 모듈을 백그라운드에서 불러옴
+            self.warm_up_started = True
+            startup_timer.mark("first_paint")
+            worker = WarmUpWorker()
+            worker.signals.result.connect(lambda _: startup_timer.mark("search_ready"))
+            # 미리 불러오기에 실패해도 검색할 때 다시 불러오므로 단계는 기록함 (실패는 event_log에 남음)
+            worker.signals.error.connect(lambda _: startup_timer.mark("search_ready"))
+            self.threadpool.start(worker)
+
     def apply_global_style(self):
         self.setStyleSheet("""
             QMainWindow {
@@ -453,7 +626,7 @@ class YouTubeDownloader(QMainWindow):
         """)
 
     def apply_widget_styles(self):
-        # 비디오 테이블 스타일
+        # 비디오/오디오 테이블 스타일
         self.video_table.setStyleSheet("""
             QTableWidget {
                 border: 1px solid #CCCCCC;
@@ -471,14 +644,17 @@ class YouTubeDownloader(QMainWindow):
                 border-bottom: 1px solid #CCCCCC;
             }
         """)
+        self.audio_table.setStyleSheet(self.video_table.styleSheet())
 
         # 다운로드 목록 테이블 스타일
         self.download_list.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #CCCCCC;
                 background-color: white;
+                color: #333333;
+                gridline-color: #E0E0E0;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
                 border-right: 1px solid #CCCCCC;
             }
@@ -489,15 +665,6 @@ class YouTubeDownloader(QMainWindow):
                 border-right: 1px solid #CCCCCC;
                 border-bottom: 1px solid #CCCCCC;
             }
-            QProgressBar {
-                border: 1px solid #CCCCCC;
-                border-radius: 5px;
-                text-align: center;
-                background-color: #F0F0F0;
-            }
-            QProgressBar::chunk {
-                background-color: #4CAF50;
-            }
             QTableCornerButton::section {
                 background-color: #E0E0E0;
                 border: none;
@@ -521,6 +688,38 @@ class YouTubeDownloader(QMainWindow):
         if folder:
             self.dest_input.setText(folder)
 
+    def create_rate_input(self, prefix):
+        rate_input = QDoubleSpinBox()
+        rate_input.setRange(0, 1000)
+        rate_input.setDecimals(1)
+        rate_input.setSingleStep(0.5)
+        rate_input.setPrefix(prefix)
+        rate_input.setSuffix(" MB/s")
+        rate_input.setSpecialValueText(f"{prefix}무제한")
+        return rate_input
+
+    def import_library(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Library Folder", self.dest_input.text())
+        if not folder:
+            return
+        self.library_import_button.setEnabled(False)
+        self.statusBar().showMessage("라이브러리를 가져오는 중...")
+        worker = LibraryImportWorker(self.library, folder)
+        worker.signals.result.connect(self.library_import_finished)
+        worker.signals.error.connect(self.library_import_error)
+        self.threadpool.start(worker)
+
+    def library_import_finished(self, count):
+        self.library_import_button.setEnabled(True)
+        self.statusBar().showMessage(f"라이브러리에 {count}개 파일을 추가했습니다.", 5000)
+        if getattr(self, 'video_info', None):
+            self.refresh_download_buttons()
+
+    def library_import_error(self, error_msg):
+        self.library_import_button.setEnabled(True)
+        self.statusBar().clearMessage()
+        self.show_error_message("라이브러리 오류", error_msg)
+
     def search_video(self):
         # 다운로드 경로 검증
         dest_path = self.dest_input.text()
@@ -534,6 +733,22 @@ class YouTubeDownloader(QMainWindow):
             self.show_error_message("입력 오류", "YouTube 비디오 URL을 입력해주세요.")
             return
 
+        # 이전 재생목록/여러 링크 검색 중단
+        self.stop_playlist()
+        self.stop_batch()
+
+        urls = parse_urls(video_url)
+        if len(urls) > 1:
+            self.prefetch_timer.stop()
+            self.search_coordinator.cancel()
+            self.start_batch(urls)
+            return
+
+        if is_playlist_url(video_url):
+            self.search_coordinator.cancel()
+            self.search_playlist(video_url)
+            return
+
         # UI 업데이트
         self.search_button.setEnabled(False)
         self.video_stack.setCurrentWidget(self.loading_widget)
@@ -542,27 +757,484 @@ class YouTubeDownloader(QMainWindow):
         # 검색 시작 시 비디오 정보 초기화
         self.clear_video_info()
 
-        # 워커 생성 및 실행
-        worker = SearchWorker(video_url, self.ffmpeg_path)
-        worker.signals.result.connect(self.search_complete)
-        worker.signals.error.connect(self.search_error)
+        # 같은 영상을 이미 추출 중이면 합류하고, 다른 영상의 추출은 취소
+        self.prefetch_timer.stop()
+        self.search_coordinator.search(video_url, self.search_signals.result.emit, self.search_signals.error.emit)
+
+    def prefetch_video(self):
+        url = self.url_input.text().strip()
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.netloc or is_playlist_url(url) or len(url.split()) > 1:
+            return
+        self.search_coordinator.prefetch(url)
+
+    def search_result(self, generation, info):
+        # 시그널이 큐에 있는 사이 새 검색이 시작되었으면 버림
+        if self.search_coordinator.is_current(generation):
+            self.search_complete(info)
+
+    def search_failed(self, generation, error_msg):
+        if self.search_coordinator.is_current(generation):
+            self.search_error(error_msg)
+
+    def setup_playlist_widget(self):
+        self.playlist_widget = QWidget()
+        playlist_layout = QVBoxLayout(self.playlist_widget)
+        playlist_layout.setContentsMargins(10, 10, 10, 10)
+
+        header_layout = QHBoxLayout()
+        self.playlist_title_label = QLabel()
+        font = self.playlist_title_label.font()
+        font.setPointSize(font.pointSize() + 4)
+        font.setBold(True)
+        self.playlist_title_label.setFont(font)
+        header_layout.addWidget(self.playlist_title_label, 1)
+
+        self.playlist_quality_combo = QComboBox()
+        for label, format_selector in QUALITY_PRESETS + [AUDIO_PRESET]:
+            self.playlist_quality_combo.addItem(label, format_selector)
+        header_layout.addWidget(self.playlist_quality_combo)
+
+        self.playlist_download_button = QPushButton("전체 다운로드")
+        self.playlist_download_button.clicked.connect(self.enqueue_playlist)
+        header_layout.addWidget(self.playlist_download_button)
+        playlist_layout.addLayout(header_layout)
+
+        self.playlist_status_label = QLabel()
+        self.playlist_status_label.setStyleSheet("color: gray;")
+        playlist_layout.addWidget(self.playlist_status_label)
+
+        self.playlist_model = PlaylistModel(self)
+        self.playlist_table = QTableView()
+        self.playlist_table.setModel(self.playlist_model)
+        self.playlist_table.setSelectionMode(QTableView.SelectionMode.NoSelection)
+        self.playlist_table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.playlist_table.verticalHeader().setVisible(False)
+        self.playlist_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        header = self.playlist_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.playlist_table.setColumnWidth(0, 60)
+        self.playlist_table.setColumnWidth(2, 200)
+        self.playlist_table.setColumnWidth(3, 80)
+        self.playlist_table.setColumnWidth(4, 120)
+        self.playlist_table.setStyleSheet("""
+            QTableView {
+                border: 1px solid #CCCCCC;
+                background-color: white;
+                color: #333333;
+                gridline-color: #E0E0E0;
+            }
+            QHeaderView::section {
+                background-color: #E0E0E0;
+                padding: 5px;
+                border: none;
+                border-right: 1px solid #CCCCCC;
+                border-bottom: 1px solid #CCCCCC;
+            }
+        """)
+        playlist_layout.addWidget(self.playlist_table)
+
+    def setup_audio_tab(self):
+        audio_layout = QVBoxLayout(self.audio_tab)
+        audio_layout.setContentsMargins(10, 10, 10, 10)
+
+        # 변환 설정 (원본 유지 시 리먹스만, 그 밖에는 후처리 풀에서 변환)
+        options_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("변환:"))
+        self.audio_target_combo = QComboBox()
+        for target, spec in AUDIO_TARGETS.items():
+            self.audio_target_combo.addItem(spec['label'], target)
+        options_layout.addWidget(self.audio_target_combo)
+        options_layout.addWidget(QLabel("비트레이트:"))
+        self.audio_bitrate_combo = QComboBox()
+        for bitrate in AUDIO_BITRATES:
+            self.audio_bitrate_combo.addItem(f"{bitrate} kbps", bitrate)
+        self.audio_bitrate_combo.setCurrentIndex(AUDIO_BITRATES.index(DEFAULT_BITRATE))
+        options_layout.addWidget(self.audio_bitrate_combo)
+        options_layout.addStretch(1)
+        audio_layout.addLayout(options_layout)
+        self.audio_target_combo.currentIndexChanged.connect(self.audio_target_changed)
+        self.audio_bitrate_combo.currentIndexChanged.connect(lambda _: self.refresh_download_buttons())
+        self.audio_target_changed()
+
+        # 오디오 포맷 테이블
+        self.audio_table = QTableWidget()
+        self.audio_table_formats = []
+        self.audio_table.setColumnCount(4)
+        self.audio_table.setHorizontalHeaderLabels(["음질", "코덱", "파일 크기", "다운로드"])
+        self.audio_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.audio_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.audio_table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
+        self.audio_table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.audio_table.verticalHeader().setVisible(False)
+        audio_layout.addWidget(self.audio_table)
+
+    def audio_target_changed(self):
+        # 무손실/원본 유지에는 비트레이트가 없음
+        self.audio_bitrate_combo.setEnabled(is_lossy_target(self.audio_target_combo.currentData()))
+        if hasattr(self, 'audio_table'):
+            self.refresh_download_buttons()
+
+    def audio_settings(self):
+        """오디오 탭에서 고른 변환 대상과 비트레이트를 포맷 dict에 넣을 값으로 반환합니다."""
+        return {'audio_target': self.audio_target_combo.currentData(),
+                'audio_bitrate': self.audio_bitrate_combo.currentData()}
+
+    def search_playlist(self, url):
+        self.clear_video_info()
+        self.playlist_model.clear()
+        self.playlist_auto_enqueue = False
+        self.playlist_download_button.setEnabled(True)
+        self.playlist_quality_combo.setEnabled(True)
+        self.playlist_title_label.setText(url)
+        self.playlist_status_label.setText("재생목록을 불러오는 중...")
+        self.video_stack.setCurrentWidget(self.playlist_widget)
+
+        worker = PlaylistWorker(url, self.ffmpeg_path)
+        worker.signals.info.connect(lambda info, w=worker: self.playlist_info_received(w, info))
+        worker.signals.entries.connect(lambda entries, w=worker: self.playlist_entries_received(w, entries))
+        worker.signals.finished.connect(lambda count, w=worker: self.playlist_finished(w, count))
+        worker.signals.error.connect(lambda error, w=worker: self.playlist_error(w, error))
+        self.playlist_worker = worker
+        self.threadpool.start(worker)
+
+    def stop_playlist(self):
+        if self.playlist_worker is not None:
+            self.playlist_worker.cancel()
+            self.playlist_worker = None
+        self.playlist_auto_enqueue = False
+
+    def playlist_info_received(self, worker, info):
+        if worker is not self.playlist_worker:
+            return  # 이미 취소된 재생목록
+        title = info.get('title') or ''
+        if info.get('channel'):
+            title = f"{title} - {info['channel']}"
+        self.playlist_title_label.setText(title)
+        self.playlist_total = info.get('count')
+
+    def playlist_entries_received(self, worker, entries):
+        if worker is not self.playlist_worker:
+            return
+        first_row = self.playlist_model.rowCount()
+        self.playlist_model.append_entries(entries)
+        total = f" / {self.playlist_total}" if getattr(self, 'playlist_total', None) else ""
+        self.playlist_status_label.setText(f"불러오는 중... {self.playlist_model.rowCount()}{total}개")
+        if self.playlist_auto_enqueue:
+            # 전체 다운로드를 누른 뒤 발견된 항목은 바로 대기열에 추가
+            for row in range(first_row, self.playlist_model.rowCount()):
+                self.enqueue_playlist_entry(row)
+
+    def playlist_finished(self, worker, count):
+        if worker is not self.playlist_worker:
+            return
+        self.playlist_worker = None
+        self.playlist_status_label.setText(f"{count}개 항목")
+
+    def playlist_error(self, worker, error_msg):
+        if worker is not self.playlist_worker:
+            return
+        self.playlist_worker = None
+        self.playlist_status_label.setText(f"재생목록을 불러오지 못했습니다: {error_msg}")
+
+    def enqueue_playlist(self):
+        dest_path = self.dest_input.text()
+        if not os.path.exists(dest_path) or not os.access(dest_path, os.W_OK):
+            self.show_error_message("경로 오류", "유효하지 않거나 접근할 수 없는 다운로드 경로입니다.")
+            return
+        if not self.validate_ffmpeg():
+            return
+        self.playlist_auto_enqueue = self.playlist_worker is not None
+        self.playlist_download_button.setEnabled(False)
+        self.playlist_quality_combo.setEnabled(False)
+        for row in self.playlist_model.unqueued_rows():
+            self.enqueue_playlist_entry(row)
+
+    def enqueue_playlist_entry(self, row):
+        """재생목록 항목을 대기열에 넣습니다. 포맷은 다운로드 직전에 고릅니다."""
+        entry = self.playlist_model.entries[row]
+        format_selector = self.playlist_quality_combo.currentData()
+        format = {
+            'format_id': format_selector,
+            'format_selector': format_selector,
+            'format_note': self.playlist_quality_combo.currentText(),
+            'ext': 'mp4',
+        }
+        if format_selector == AUDIO_PRESET[1]:
+            format.update(self.audio_settings())
+        output_dir = self.dest_input.text()
+        title = entry['title']
+        self.downloading_items.add(download_key(entry['url'], format))
+
+        record = JobRecord(
+            title=title,
+            resolution=format['format_note'],
+            size_text="N/A",
+            thumbnail_url=entry['thumbnail'],
+            is_merged_format=False,
+        )
+        download_row = self.download_model.add_job(record)
+        journal_id = self.journal.add_job(entry['url'], title, format, output_dir, entry['thumbnail'])
+        self.start_download_worker(download_row, entry['url'], format, output_dir, title, None, journal_id)
+        self.playlist_model.mark_queued(row)
+
+    def setup_batch_widget(self):
+        self.batch_widget = QWidget()
+        batch_layout = QVBoxLayout(self.batch_widget)
+        batch_layout.setContentsMargins(10, 10, 10, 10)
+
+        header_layout = QHBoxLayout()
+        self.batch_status_label = QLabel()
+        header_layout.addWidget(self.batch_status_label, 1)
+
+        # 포맷 정책: 링크마다 이 선택식으로 포맷을 고름 (바꾸면 이미 찾은 항목도 다시 고름)
+        header_layout.addWidget(QLabel("포맷:"))
+        self.batch_quality_combo = QComboBox()
+        for label, format_selector in QUALITY_PRESETS + [AUDIO_PRESET]:
+            self.batch_quality_combo.addItem(label, format_selector)
+        self.batch_quality_combo.currentIndexChanged.connect(lambda _: self.batch_policy_changed())
+        header_layout.addWidget(self.batch_quality_combo)
+
+        self.batch_download_button = QPushButton("전체 다운로드")
+        self.batch_download_button.clicked.connect(self.enqueue_batch)
+        header_layout.addWidget(self.batch_download_button)
+        batch_layout.addLayout(header_layout)
+
+        self.batch_model = BatchModel(self)
+        self.batch_proxy = QSortFilterProxyModel(self)
+        self.batch_proxy.setSourceModel(self.batch_model)
+        self.batch_proxy.setSortRole(SORT_ROLE)
+        self.batch_table = QTableView()
+        self.batch_table.setModel(self.batch_proxy)
+        self.batch_table.setSortingEnabled(True)
+        self.batch_table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+        self.batch_table.setSelectionMode(QTableView.SelectionMode.NoSelection)
+        self.batch_table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.batch_table.verticalHeader().setVisible(False)
+        self.batch_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        header = self.batch_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.batch_table.setColumnWidth(0, 40)
+        self.batch_table.setColumnWidth(2, 160)
+        self.batch_table.setColumnWidth(3, 70)
+        self.batch_table.setColumnWidth(4, 100)
+        self.batch_table.setColumnWidth(5, 90)
+        self.batch_table.setColumnWidth(6, 120)
+        self.batch_table.setStyleSheet(self.playlist_table.styleSheet())
+        batch_layout.addWidget(self.batch_table)
+
+    def open_batch_dialog(self):
+        dialog = QDialog(self)
+        dialog.setWindowTitle("여러 링크 검색")
+        dialog.resize(600, 400)
+        layout = QVBoxLayout(dialog)
+        layout.addWidget(QLabel("한 줄에 링크 하나씩 붙여 넣으세요. '#'으로 시작하는 줄은 무시합니다."))
+        text_edit = QPlainTextEdit()
+        text_edit.setPlainText(self.url_input.text())
+        layout.addWidget(text_edit)
+
+        def load_file():
+            path, _ = QFileDialog.getOpenFileName(dialog, "링크 파일 선택", "", "텍스트 파일 (*.txt *.csv);;모든 파일 (*)")
+            if path:
+                text = self.read_url_file(path)
+                if text is not None:
+                    text_edit.appendPlainText(text)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        file_button = buttons.addButton("파일에서 불러오기", QDialogButtonBox.ButtonRole.ActionRole)
+        file_button.clicked.connect(load_file)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout.addWidget(buttons)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.search_urls_text(text_edit.toPlainText())
+
+    def read_url_file(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return f.read()
+        except OSError as e:
+            self.show_error_message("파일 오류", f"파일을 읽을 수 없습니다: {e}")
+            return None
+
+    def search_urls_text(self, text):
+        """붙여 넣은 글이나 파일 내용에서 링크를 찾아 검색합니다. 링크가 하나면 보통 검색과 같습니다."""
+        urls = parse_urls(text)
+        if not urls:
+            self.show_error_message("입력 오류", "링크를 찾지 못했습니다.")
+            return
+        self.url_input.setText(urls[0] if len(urls) == 1 else " ".join(urls))
+        self.search_video()
+
+    def dragEnterEvent(self, event):
+        mime = event.mimeData()
+        if mime.hasUrls() or mime.hasText():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        mime = event.mimeData()
+        if mime.hasUrls() and all(url.isLocalFile() for url in mime.urls()):
+            texts = [self.read_url_file(url.toLocalFile()) for url in mime.urls()]
+            text = "\n".join(t for t in texts if t)
+        else:
+            text = mime.text()
+        event.acceptProposedAction()
+        self.search_urls_text(text)
+
+    def start_batch(self, urls):
+        self.clear_video_info()
+        self.tab_widget.setCurrentWidget(self.video_tab)
+        self.batch_model.set_urls(urls)
+        self.batch_auto_enqueue = False
+        self.batch_download_button.setEnabled(True)
+        self.batch_quality_combo.setEnabled(True)
+        self.video_stack.setCurrentWidget(self.batch_widget)
+
+        lookup = BatchLookup(urls, self.ffmpeg_path, self.metadata_cache, self.batch_quality_combo.currentData())
+        self.batch_lookup = lookup
+        self.update_batch_status()
+        lookup.start(lambda index, info, chosen, selector: self.batch_signals.result.emit(lookup, index, info,
+                                                                                          chosen, selector),
+                     lambda index, error: self.batch_signals.error.emit(lookup, index, error))
+
+    def stop_batch(self):
+        if self.batch_lookup is not None:
+            self.batch_lookup.cancel()
+            self.batch_lookup = None
+        self.batch_auto_enqueue = False
+
+    def batch_result(self, lookup, index, info, chosen, selector):
+        if lookup is not self.batch_lookup:
+            return  # 이미 취소된 검색
+        current = self.batch_quality_combo.currentData()
+        self.batch_model.set_info(index, info, chosen)
+        if selector != current:
+            # 추출하는 사이 정책이 바뀜: 새 정책으로 다시 고른 뒤 대기열에 넣음
+            self.choose_batch_formats([index], current, enqueue=self.batch_auto_enqueue)
+        elif self.batch_auto_enqueue and chosen is not None:
+            self.enqueue_batch_entry(index)
+        self.update_batch_status()
+
+    def batch_error(self, lookup, index, error_msg):
+        if lookup is not self.batch_lookup:
+            return
+        self.batch_model.set_error(index, error_msg)
+        self.update_batch_status()
+
+    def update_batch_status(self):
+        counts = self.batch_model.counts()
+        total = self.batch_model.rowCount()
+        looking = counts.get(BATCH_LOOKING, 0)
+        parts = [f"확인 중 {total - looking}/{total}" if looking else f"{total}개 링크"]
+        parts += [f"{status} {count}" for status, count in counts.items() if status != BATCH_LOOKING]
+        self.batch_status_label.setText(" · ".join(parts))
+        if not looking and self.batch_lookup is not None:
+            self.batch_lookup = None
+            self.batch_auto_enqueue = False
+
+    def batch_policy_changed(self):
+        selector = self.batch_quality_combo.currentData()
+        if self.batch_lookup is not None:
+            self.batch_lookup.format_selector = selector
+        rows = [row for row, item in enumerate(self.batch_model.rows)
+                if item['info'] is not None and item['status'] != BATCH_QUEUED]
+        if rows:
+            self.choose_batch_formats(rows, selector)
+
+    def choose_batch_formats(self, rows, selector, enqueue=False):
+        worker = FormatChoiceWorker(rows, [self.batch_model.rows[row]['info'] for row in rows], selector,
+                                    self.ffmpeg_path, enqueue)
+        worker.signals.result.connect(self.batch_formats_chosen)
+        worker.signals.error.connect(lambda error_msg: print(f"Error choosing batch formats: {error_msg}"))
         self.threadpool.start(worker)
 
+    def batch_formats_chosen(self, rows, infos, chosen, selector, enqueue):
+        if selector != self.batch_quality_combo.currentData():
+            return  # 그 사이 정책이 다시 바뀜 (새 작업이 결과를 보냄)
+        for row, info, format in zip(rows, infos, chosen):
+            # 목록을 새로 채웠으면 같은 행이라도 다른 영상
+            if row >= len(self.batch_model.rows) or self.batch_model.rows[row]['info'] is not info:
+                continue
+            self.batch_model.set_format(row, format)
+            if enqueue and format is not None and self.batch_model.rows[row]['status'] == READY:
+                self.enqueue_batch_entry(row)
+        self.update_batch_status()
+
+    def enqueue_batch(self):
+        dest_path = self.dest_input.text()
+        if not os.path.exists(dest_path) or not os.access(dest_path, os.W_OK):
+            self.show_error_message("경로 오류", "유효하지 않거나 접근할 수 없는 다운로드 경로입니다.")
+            return
+        if not self.validate_ffmpeg():
+            return
+        self.batch_auto_enqueue = self.batch_lookup is not None
+        self.batch_download_button.setEnabled(False)
+        self.batch_quality_combo.setEnabled(False)
+        for row in self.batch_model.rows_with_status(READY):
+            self.enqueue_batch_entry(row)
+
+    def enqueue_batch_entry(self, row):
+        """찾은 정보와 함께 대기열에 넣어 다시 추출하지 않습니다. 같은 영상/포맷이 이미 받는 중이면 건너뜁니다."""
+        item = self.batch_model.rows[row]
+        format_selector = self.batch_quality_combo.currentData()
+        format = {
+            'format_id': format_selector,
+            'format_selector': format_selector,
+            'format_note': self.batch_quality_combo.currentText(),
+            'ext': 'mp4',
+        }
+        if format_selector == AUDIO_PRESET[1]:
+            format.update(self.audio_settings())
+        title = item['title']
+        download_item = download_key(item['url'], format)
+        if download_item in self.downloading_items:
+            self.batch_model.mark_queued(row)
+            return
+        self.downloading_items.add(download_item)
+
+        size = item['format'].get('filesize')
+        output_dir = self.dest_input.text()
+        record = JobRecord(
+            title=title,
+            resolution=format['format_note'],
+            size_text=self.format_size(size) if size else "N/A",
+            thumbnail_url=item['thumbnail'],
+            is_merged_format=False,
+        )
+        download_row = self.download_model.add_job(record)
+        journal_id = self.journal.add_job(item['url'], title, format, output_dir, item['thumbnail'])
+        self.start_download_worker(download_row, item['url'], format, output_dir, title, item['info'], journal_id)
+        self.batch_model.mark_queued(row)
+
     def clear_video_info(self):
         """비디오 정보를 초기화하고 숨깁니다."""
+        self.video_info = None
         self.thumbnail_label.clear()
         self.title_label.clear()
         self.channel_label.clear()
         self.duration_label.clear()
+        self.library_label.hide()
         self.video_info_widget.hide()
         self.video_table.setRowCount(0)
+        self.audio_table.setRowCount(0)
 
     def search_complete(self, info):
         self.loading_movie.stop()
         self.video_stack.setCurrentWidget(self.video_content_widget)
         self.search_button.setEnabled(True)
+        self.video_info = info  # 다운로드 시 재추출 없이 사용
+        self.update_cache_stats()
         self.populate_video_info(info)
         self.populate_video_table(info)
+        self.populate_audio_table(info)
+
+    def update_cache_stats(self):
+        stats = self.metadata_cache.stats()
+        searches = self.search_coordinator.stats()
+        self.search_button.setToolTip(f"메타데이터 캐시 적중: {stats['hits']} / 미스: {stats['misses']}\n"
+                                      f"추출 공유: {searches['shared']} / 취소: {searches['cancelled']}")
 
     def search_error(self, error_msg):
         self.loading_movie.stop()
@@ -624,21 +1296,14 @@ class YouTubeDownloader(QMainWindow):
         self.video_title = title  # 클래스 속성으로 저장
         self.title_label.setText(f"제: {title}")
 
+        self.thumbnail_url = thumbnail_url
+        self.thumbnail_label.hide()
         if thumbnail_url:
-            response = requests.get(thumbnail_url)
-            if response.status_code == 200:
-                image = QImage()
-                image.loadFromData(response.content)
-                pixmap = QPixmap.fromImage(image)
-                scaled_pixmap = pixmap.scaledToHeight(120, Qt.TransformationMode.SmoothTransformation)
-                self.thumbnail_label.setPixmap(scaled_pixmap)
-                self.thumbnail_label.setFixedSize(scaled_pixmap.size())
-                self.thumbnail_label.setCursor(Qt.CursorShape.PointingHandCursor)
-                self.thumbnail_label.show()
-            else:
-                self.thumbnail_label.hide()
-        else:
-            self.thumbnail_label.hide()
+            self.thumbnail_service.request(
+                thumbnail_url, VIDEO_THUMBNAIL_SIZE,
+                lambda pixmap, url=thumbnail_url: self.set_video_thumbnail(url, pixmap))
+            # 다운로드 목록용 크기도 같은 원본으로 미리 만들어 둡니다
+            self.thumbnail_service.prefetch(thumbnail_url, [LIST_THUMBNAIL_SIZE])
 
         if title:
             self.title_label.setText(f'<a href="{self.video_url}" style="color: black; text-decoration: none;">{title}</a>')
@@ -667,6 +1332,17 @@ class YouTubeDownloader(QMainWindow):
         else:
             self.video_info_widget.hide()
 
+    def set_video_thumbnail(self, url, pixmap):
+        if url != self.thumbnail_url:
+            return  # 그 사이 다른 영상을 검색한 경우
+        if pixmap is None:
+            self.thumbnail_label.hide()
+            return
+        self.thumbnail_label.setPixmap(pixmap)
+        self.thumbnail_label.setFixedSize(pixmap.size())
+        self.thumbnail_label.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.thumbnail_label.show()
+
     def format_duration(self, seconds):
         """초를 HH:MM:SS 형식으로 변환합니다."""
         hours, remainder = divmod(seconds, 3600)
@@ -680,23 +1356,8 @@ class YouTubeDownloader(QMainWindow):
         self.video_table.setRowCount(0)
         self.video_title = info.get('title', 'Unknown Title')
         self.thumbnail_url = info.get('thumbnail')  # 썸네일 URL 저장
-        
-        # 모든 포맷을 해상도별로 그룹화
-        formats_by_resolution_format = {}
-        for format in info['formats']:
-            height = format.get('height')
-            ext = format.get('ext', 'Unknown')
-            if height is not None and ext != 'mhtml':
-                key = (ext, height)
-                if key not in formats_by_resolution_format:
-                    formats_by_resolution_format[key] = []
-                formats_by_resolution_format[key].append(format)
-        
-        # 각 해상도 및 포맷별로 최고 품질(파일 크기가 가장 큰) 포맷 선택
-        sorted_formats = sorted(formats_by_resolution_format.items(), key=lambda x: (x[0][0] != 'mp4', x[0][0], -x[0][1]))
-        for (ext, height), formats in sorted_formats:
-            best_format = max(formats, key=lambda f: f.get('filesize', 0) or 0)
-            
+        library_formats = self.library_formats(info)
+        for (ext, height), best_format in self.video_rows(info):
             row_position = self.video_table.rowCount()
             self.video_table.insertRow(row_position)
             
@@ -718,26 +1379,7 @@ class YouTubeDownloader(QMainWindow):
             download_btn = QPushButton("다운로드")
             format_id = best_format['format_id']
             download_btn.clicked.connect(lambda _, f=best_format: self.download_video(f))
-            
-            # 이미 다운로드 중인 아이템이면 버튼 비활성화
-            if (self.video_title, format_id) in self.downloading_items:
-                download_btn.setEnabled(False)
-                download_btn.setText("다운로드 중")
-                download_btn.setStyleSheet("""
-                    background-color: #CCCCCC; 
-                    color: #666666;
-                    border-radius: 4px;
-                    padding: 5px 10px;
-                    margin: 2px;
-                """)
-            else:
-                download_btn.setStyleSheet("""
-                    background-color: #4CAF50; 
-                    color: white;
-                    border-radius: 4px;
-                    padding: 5px 10px;
-                    margin: 2px;
-                """)
+            self.set_download_button_state(download_btn, format_id, library_formats)
             
             download_btn.setProperty('format_id', format_id)
             self.video_table.setCellWidget(row_position, 3, download_btn)
@@ -746,6 +1388,47 @@ class YouTubeDownloader(QMainWindow):
         for i in range(self.video_table.rowCount()):
             self.video_table.setRowHeight(i, 40)
 
+    def populate_audio_table(self, info):
+        """오디오만 있는 포맷을 나열합니다. 다운로드하면 비디오 없이 오디오 스트림만 받습니다."""
+        self.audio_table.setRowCount(0)
+        self.audio_table_formats = audio_formats(info)  # 행 순서대로
+        library_formats = self.library_formats(info)
+        for format in self.audio_table_formats:
+            row_position = self.audio_table.rowCount()
+            self.audio_table.insertRow(row_position)
+
+            # 음질
+            bitrate = format.get('abr') or format.get('tbr')
+            quality = f"{bitrate:.0f} kbps" if bitrate else format.get('format_note') or 'Unknown'
+            self.audio_table.setItem(row_position, 0, QTableWidgetItem(quality))
+
+            # 코덱
+            codec = (format.get('acodec') or 'Unknown').split('.')[0]
+            self.audio_table.setItem(row_position, 1, QTableWidgetItem(f"{codec} ({format.get('ext', 'Unknown')})"))
+
+            # 파일 크기
+            filesize = format.get('filesize') or format.get('filesize_approx')
+            self.audio_table.setItem(row_position, 2,
+                                     QTableWidgetItem(self.format_size(filesize) if filesize else 'Unknown'))
+
+            # 다운로드 버튼 (키에 변환 설정이 들어가므로 설정이 바뀌면 refresh_download_buttons에서 다시 계산)
+            download_btn = QPushButton("다운로드")
+            download_btn.clicked.connect(lambda _, f=format: self.download_audio(f))
+            key = format_key(dict(format, **self.audio_settings()))
+            self.set_download_button_state(download_btn, key, library_formats)
+            download_btn.setProperty('format_id', key)
+            self.audio_table.setCellWidget(row_position, 3, download_btn)
+
+        for i in range(self.audio_table.rowCount()):
+            self.audio_table.setRowHeight(i, 40)
+
+    def download_audio(self, format):
+        settings = self.audio_settings()
+        spec = AUDIO_TARGETS[settings['audio_target']]
+        note = spec['label'] if not is_lossy_target(settings['audio_target']) \
+            else f"{spec['label']} {settings['audio_bitrate']}k"
+        self.download_video(dict(format, format_note=f"오디오 {note}", **settings))
+
     def format_size(self, size_bytes):
         # 바이트를 적한 단위로 변환
         if size_bytes < 1024:
@@ -757,32 +1440,125 @@ class YouTubeDownloader(QMainWindow):
         else:
             return f"{size_bytes/(1024*1024*1024):.2f} GB"
 
+    def video_rows(self, info):
+        """비디오 표의 행: (확장자, 높이)별로 최고 품질(파일 크기가 가장 큰) 포맷."""
+        formats_by_resolution_format = {}
+        for format in info['formats']:
+            height = format.get('height')
+            ext = format.get('ext', 'Unknown')
+            if height is not None and ext != 'mhtml':
+                formats_by_resolution_format.setdefault((ext, height), []).append(format)
+        sorted_formats = sorted(formats_by_resolution_format.items(), key=lambda x: (x[0][0] != 'mp4', x[0][0], -x[0][1]))
+        return [(key, max(formats, key=lambda f: f.get('filesize', 0) or 0)) for key, formats in sorted_formats]
+
+    def library_candidates(self, info):
+        """가져온 파일을 맞춰 볼 표의 포맷들 (키, 확장자, 크기)."""
+        candidates = []
+        for (ext, _), format in self.video_rows(info):
+            candidates.append((format['format_id'], ext, format.get('filesize') or format.get('filesize_approx')))
+        settings = self.audio_settings()
+        target = settings['audio_target'] or ORIGINAL
+        for format in audio_formats(info):
+            ext = target_extension(target, format.get('acodec'), format.get('ext'))
+            # 변환하면 크기가 달라지므로 원본을 유지할 때만 크기로 맞춤
+            size = format.get('filesize') or format.get('filesize_approx') if target == ORIGINAL else None
+            candidates.append((format_key(dict(format, **settings)), ext, size))
+        return candidates
+
+    def library_state(self, info):
+        """현재 영상에서 이미 받아 둔 포맷들 (format_id -> 기록)과 어느 포맷인지 모르는 가져온 파일 목록."""
+        key = video_key(info)
+        if key is None:
+            return {}, []
+        try:
+            formats = self.library.formats(key)
+            imported = self.library.imported(key)
+        except Exception as e:
+            print(f"Error reading library index: {e}")
+            return {}, []
+        matched, unmatched = match_imported(imported, self.library_candidates(info))
+        for format_id, record in matched.items():
+            formats.setdefault(format_id, record)
+        return formats, unmatched
+
+    def library_formats(self, info):
+        formats, unmatched = self.library_state(info)
+        self.update_library_label(unmatched)
+        return formats
+
+    def update_library_label(self, unmatched):
+        if unmatched:
+            self.library_label.setText("이미 라이브러리에 있음")
+            self.library_label.setToolTip("\n".join(record['path'] for record in unmatched))
+            self.library_label.show()
+        else:
+            self.library_label.hide()
+
+    def set_download_button_state(self, download_btn, format_id, library_formats):
+        if (normalize_video_key(self.current_video_url()), format_id) in self.downloading_items:
+            # 이미 다운로드 중인 아이템이면 버튼 비활성화
+            download_btn.setEnabled(False)
+            download_btn.setText("다운로드 중")
+            download_btn.setToolTip("")
+            download_btn.setStyleSheet("""
+                background-color: #CCCCCC; 
+                color: #666666;
+                border-radius: 4px;
+                padding: 5px 10px;
+                margin: 2px;
+            """)
+        elif format_id in library_formats:
+            # 이미 받아 둔 포맷
+            download_btn.setEnabled(False)
+            download_btn.setText("받은 파일 있음")
+            download_btn.setToolTip(library_formats[format_id]['path'])
+            download_btn.setStyleSheet("""
+                background-color: #BBDEFB; 
+                color: #1565C0;
+                border-radius: 4px;
+                padding: 5px 10px;
+                margin: 2px;
+            """)
+        else:
+            download_btn.setEnabled(True)
+            download_btn.setText("다운로드")
+            download_btn.setToolTip("")
+            download_btn.setStyleSheet("""
+                background-color: #4CAF50; 
+                color: white;
+                border-radius: 4px;
+                padding: 5px 10px;
+                margin: 2px;
+            """)
+
+    def download_buttons(self):
+        """비디오/오디오 탭의 (다운로드 버튼, 오디오 포맷 또는 None)을 차례로 반환합니다."""
+        for table in (self.video_table, self.audio_table):
+            for row in range(table.rowCount()):
+                download_btn = table.cellWidget(row, 3)
+                if isinstance(download_btn, QPushButton):
+                    yield download_btn, self.audio_table_formats[row] if table is self.audio_table else None
+
     def update_download_button(self, format_id):
-        for row in range(self.video_table.rowCount()):
-            download_btn = self.video_table.cellWidget(row, 3)
-            if isinstance(download_btn, QPushButton) and download_btn.property('format_id') == format_id:
-                if (self.video_title, format_id) in self.downloading_items:
-                    download_btn.setEnabled(False)
-                    download_btn.setText("다운로드 중")
-                    download_btn.setStyleSheet("""
-                        background-color: #CCCCCC; 
-                        color: #666666;
-                        border-radius: 4px;
-                        padding: 5px 10px;
-                        margin: 2px;
-                    """)
-                else:
-                    download_btn.setEnabled(True)
-                    download_btn.setText("다운로드")
-                    download_btn.setStyleSheet("""
-                        background-color: #4CAF50; 
-                        color: white;
-                        border-radius: 4px;
-                        padding: 5px 10px;
-                        margin: 2px;
-                    """)
+        library_formats = self.library_formats(getattr(self, 'video_info', None))
+        for download_btn, _ in self.download_buttons():
+            if download_btn.property('format_id') == format_id:
+                self.set_download_button_state(download_btn, format_id, library_formats)
                 break
 
+    def refresh_download_buttons(self):
+        library_formats = self.library_formats(getattr(self, 'video_info', None))
+        settings = self.audio_settings()
+        for download_btn, audio_format in self.download_buttons():
+            if audio_format is not None:
+                # 오디오 버튼의 키는 지금 고른 변환 설정에 따라 달라짐
+                download_btn.setProperty('format_id', format_key(dict(audio_format, **settings)))
+            self.set_download_button_state(download_btn, download_btn.property('format_id'), library_formats)
+
+    def current_video_url(self):
+        """지금 정보를 띄운 영상의 페이지 URL. 정보를 받기 전이면 입력창의 URL."""
+        return getattr(self, 'video_url', '') or self.url_input.text()
+
     def download_video(self, format):
         if not self.validate_ffmpeg():
             return
@@ -790,300 +1566,293 @@ class YouTubeDownloader(QMainWindow):
         if not hasattr(self, 'video_title') or not self.video_title:
             self.video_title = "Unknown Title"
         
-        format_id = format['format_id']
-        download_item = (self.video_title, format_id)
+        video_page_url = self.current_video_url()
+        download_item = download_key(video_page_url, format)
         if download_item in self.downloading_items:
             return  # 이미 다운로드 중인 아이템이면 무시
         
         self.downloading_items.add(download_item)
-        self.update_download_button(format_id)  # 버튼 상태 업데이트
-        
-        row = self.download_list.rowCount()
-        self.download_list.insertRow(row)
+        self.update_download_button(download_item[1])  # 버튼 상태 업데이트
         
-        self.add_download_item(row, format)
+        row = self.add_download_item(format)
         
-        worker = DownloadWorker(row, self.url_input.text(), format, 
-                                self.dest_input.text(), self.video_title, self.ffmpeg_path)
+        output_dir = self.dest_input.text()
+        journal_id = self.journal.add_job(video_page_url, self.video_title, format, output_dir,
+                                          getattr(self, 'thumbnail_url', None))
+        self.start_download_worker(row, video_page_url, format, output_dir, self.video_title,
+                                   getattr(self, 'video_info', None), journal_id)
+
+    def start_download_worker(self, row, url, format, output_dir, video_title, info, journal_id,
+                              output_file=None, paused=False):
+        download_item = download_key(url, format)
+        worker = DownloadWorker(row, url, format, 
+                                output_dir, video_title, self.ffmpeg_path,
+                                self.metadata_cache, info,
+                                self.scheduler.postprocess_slot, self.progress_table,
+                                self.journal, journal_id, output_file, self.library, self.bandwidth_governor,
+                                self.segments_input.value(), self.stream_merge_checkbox.isChecked(),
+                                self.postprocess_pool)
+        worker.signals.started.connect(self.download_started)
         worker.signals.progress.connect(self.update_download_progress)
         worker.signals.finished.connect(lambda r: self.download_finished(r, download_item))
         worker.signals.error.connect(lambda r, e: self.download_error(r, e, download_item))
+        worker.signals.skipped.connect(lambda r, path: self.download_skipped(r, path, download_item))
+        worker.signals.deferred.connect(self.download_deferred)
         
         self.download_workers[row] = worker
-        self.threadpool.start(worker)
+        self.scheduler.submit(row, worker, paused=paused)
+        self.update_queue_status()
+
+    def restore_jobs(self):
+        """지난 실행에서 끝나지 않은 작업들을 대기열에 다시 넣습니다. 중간 파일은 이어받습니다."""
+        for job in self.journal.resumable_jobs():
+            format = job['format']
+            title = job['title'] or "Unknown Title"
+            download_item = download_key(job['url'], format)
+            if download_item in self.downloading_items:
+                continue
+            self.downloading_items.add(download_item)
+
+            size = format.get('filesize') or format.get('filesize_approx')
+            record = JobRecord(
+                title=title,
+                resolution=format.get('format_note', 'N/A'),
+                size_text=self.format_size(size) if size else "N/A",
+                thumbnail_url=job['thumbnail_url'],
+                is_merged_format=self.check_if_merged_format(format),
+            )
+            if job['total_bytes']:
+                record.progress = min(job['downloaded_bytes'] / job['total_bytes'] * 100, 100)
+            paused = job['status'] == journal.PAUSED
+            record.status_text = "일시정지" if paused else "대기 중"
+            row = self.download_model.add_job(record)
+
+            if not paused:
+                self.journal.set_status(job['id'], journal.QUEUED)
+            self.start_download_worker(row, job['url'], format, job['output_dir'], title, None,
+                                       job['id'], job['output_path'], paused)
+
+    def cleanup_leftover_files(self, jobs):
+        cleanup_leftover_files(jobs)
+        for job in jobs:
+            self.journal.mark_cleaned(job['id'])
+
+    def add_download_item(self, format):
+        size = format.get('filesize') or format.get('filesize_approx')
+        record = JobRecord(
+            title=self.video_title,
+            resolution=format.get('format_note', 'N/A'),
+            size_text=self.format_size(size) if size else "N/A",
+            thumbnail_url=getattr(self, 'thumbnail_url', None),
+            is_merged_format=self.check_if_merged_format(format),
+        )
+        row = self.download_model.add_job(record)
+        self.download_list.scrollToBottom()
+        return row
 
-    def add_download_item(self, row, format):
-        # 썸네일
-        thumb_label = QLabel()
-        if hasattr(self, 'thumbnail_url') and self.thumbnail_url:
-            try:
-                response = requests.get(self.thumbnail_url)
-                if response.status_code == 200:
-                    pixmap = QPixmap()
-                    pixmap.loadFromData(response.content)
-                    thumb_label.setPixmap(pixmap.scaled(70, 50, Qt.AspectRatioMode.KeepAspectRatio))
-                else:
-                    self.set_default_thumbnail(thumb_label)
-            except Exception as e:
-                print(f"Error loading thumbnail: {e}")
-                self.set_default_thumbnail(thumb_label)
-        else:
-            self.set_default_thumbnail(thumb_label)
-        
-        thumb_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.download_list.setCellWidget(row, 0, thumb_label)
+    def apply_progress_updates(self, rows=None):
+        for row, record in self.progress_table.drain(rows).items():
+            self.update_download_progress(row, *record)
 
-        # 비디오 이름
-        self.download_list.setItem(row, 1, QTableWidgetItem(self.video_title))
+    def update_download_progress(self, row, progress, time_left, is_merged_format, is_video, speed=0, connections=0):
+        self.download_model.update_progress(row, progress, time_left, is_merged_format, is_video, speed, connections)
 
-        # 해상도
-        self.download_list.setItem(row, 2, QTableWidgetItem(format.get('format_note', 'N/A')))
+    def download_started(self, row):
+        self.set_row_status(row, None)
+        self.download_model.set_status_tooltip(row, None)  # 서버 제한으로 멈췄다 다시 시작한 경우
+        self.update_queue_status()
 
-        # 파일 크기
-        size = format.get('filesize') or format.get('filesize_approx')
-        size_str = self.format_size(size) if size else "N/A"
-        self.download_list.setItem(row, 3, QTableWidgetItem(size_str))
-
-        # Progress bar
-        progress_bar = QProgressBar()
-        progress_bar.setValue(0)
-        progress_bar.setTextVisible(False)
-        progress_widget = QWidget()
-        progress_layout = QVBoxLayout(progress_widget)
-        progress_layout.addWidget(progress_bar)
-        progress_layout.setContentsMargins(5, 0, 5, 0)
-        self.download_list.setCellWidget(row, 4, progress_widget)
-
-        # Set initial color based on whether it's a merged format
-        is_merged_format = self.check_if_merged_format(format)
-        self.set_progress_bar_color(progress_bar, is_merged_format, True)
-
-        # 남은 시간
-        self.download_list.setItem(row, 5, QTableWidgetItem(""))
-
-        # 상태 (취소 버튼)
-        status_widget = QWidget()
-        status_layout = QVBoxLayout(status_widget)
-        status_layout.setContentsMargins(2, 2, 2, 2)
-        status_layout.setSpacing(2)
-        
-        status_label = QLabel("대기 중")
-        status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        status_label.hide()  # 초기에는 숨김
-        
-        cancel_button = QPushButton("취소")
-        cancel_button.setStyleSheet("""
-            QPushButton {
-                background-color: #FF4136;
-                color: white;
-                border: none;
-                padding: 5px;
-                border-radius: 3px;
-                font-size: 12px;
-            }
-            QPushButton:hover {
-                background-color: #FF7166;
-            }
-        """)
-        cancel_button.clicked.connect(lambda: self.cancel_download(row))
-        cancel_button.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        
-        status_layout.addWidget(status_label)
-        status_layout.addWidget(cancel_button)
-        
-        self.download_list.setCellWidget(row, 6, status_widget)
+    def set_row_status(self, row, text, cancellable=True):
+        """상태 칸의 문구를 바꿉니다. text가 None이면 문구를 숨깁니다."""
+        self.download_model.set_status(row, text, cancellable)
 
-        self.download_list.setRowHeight(row, 50)
-        self.download_list.scrollToBottom()
+    def show_download_list_menu(self, pos):
+        row = self.download_list.indexAt(pos).row()
+        state = self.scheduler.state(row)
+        if state not in (QUEUED, PAUSED):
+            return
 
-    def set_default_thumbnail(self, label):
-        default_pixmap = QPixmap(70, 50)
-        default_pixmap.fill(Qt.GlobalColor.lightGray)
-        label.setPixmap(default_pixmap)
-
-    def set_progress_bar_color(self, progress_bar, is_merged_format, is_video):
-        if is_merged_format:
-            color = "#4CAF50"  # Green color for merged format
-            print("Setting progress bar color to Green (Merged Format)")
-        elif is_video:
-            color = "#2196F3"  # Blue color for video download
-            print("Setting progress bar color to Blue (Video Download)")
-        else:
-            color = "#4CAF50"  # Green color for audio download
-            print("Setting progress bar color to Green (Audio Download)")
-        
-        progress_bar.setStyleSheet(f"""
-            QProgressBar {{
-                border: 1px solid #CCCCCC;
-                border-radius: 5px;
-                text-align: center;
-                background-color: #F0F0F0;
-            }}
-            QProgressBar::chunk {{
-                background-color: {color};
-                border-radius: 4px;
-            }}
-        """)
-        progress_bar.repaint()
+        menu = QMenu(self)
+        move_up_action = menu.addAction("위로 이동")
+        move_down_action = menu.addAction("아래로 이동")
+        menu.addSeparator()
+        pause_action = menu.addAction("일시정지") if state == QUEUED else None
+        resume_action = menu.addAction("재개") if state == PAUSED else None
+        action = menu.exec(self.download_list.viewport().mapToGlobal(pos))
 
-    def update_download_progress(self, row, progress, time_left, is_merged_format, is_video):
-        try:
-            progress_widget = self.download_list.cellWidget(row, 4)
-            if progress_widget:
-                progress_bar = progress_widget.findChild(QProgressBar)
-                if progress_bar:
-                    progress_bar.setValue(int(progress))
-                    self.set_progress_bar_color(progress_bar, is_merged_format, is_video)
-                    print(f"Updated progress bar. Value: {int(progress)}, Is Merged Format: {is_merged_format}, Is Video: {is_video}")
-            
-            time_item = self.download_list.item(row, 5)
-            if time_item:
-                time_item.setText(time_left)
-            
-            # Update status
-            status_widget = self.download_list.cellWidget(row, 6)
-            if status_widget:
-                status_label = status_widget.findChild(QLabel)
-                cancel_button = status_widget.findChild(QPushButton)
-                if status_label:
-                    if time_left == "Merging...":
-                        status_label.setText("병합중")
-                        status_label.show()
-                        if cancel_button:
-                            cancel_button.hide()
-                    elif time_left == "Complete":
-                        status_label.setText("완료됨")
-                        status_label.show()
-                        if cancel_button:
-                            cancel_button.hide()
-                    else:
-                        status_label.hide()
-                        if cancel_button:
-                            cancel_button.show()
-        except Exception as e:
-            print(f"Error in update_download_progress: {e}")
+        if action is None:
+            return
+        if action == move_up_action:
+            self.scheduler.move_up(row)
+        elif action == move_down_action:
+            self.scheduler.move_down(row)
+        elif action == pause_action and self.scheduler.pause(row):
+            self.set_row_status(row, "일시정지")
+            self.update_job_journal_status(row, journal.PAUSED)
+        elif action == resume_action and self.scheduler.resume(row):
+            self.set_row_status(row, "대기 중")
+            self.update_job_journal_status(row, journal.QUEUED)
+        self.update_queue_status()
+
+    def update_job_journal_status(self, row, status):
+        worker = self.download_workers.get(row)
+        if worker is not None:
+            worker.update_journal(status=status)
+
+    def update_queue_status(self):
+        stats = self.scheduler.stats()
+        text = (f"진행 중: {stats['running']}/{stats['max_downloads']}  |  "
+                f"대기 중: {stats['queued']}")
+        if stats['paused']:
+            text += f" (일시정지 {stats['paused']})"
+        if stats['waiting']:
+            text += f"  |  서버 제한 대기: {stats['waiting']}"
+        text += (f"  |  평균 대기: {format_time(stats['average_wait'])}"
+                 f"  |  최장 대기: {format_time(stats['oldest_wait'])}")
+        total_speed = self.bandwidth_governor.total_throughput()
+        if total_speed:
+            text += f"  |  전체 속도: {format_speed(total_speed)}"
+        postprocess = self.postprocess_pool.stats()
+        if postprocess['running'] or postprocess['queued']:
+            text += f"  |  병합: {postprocess['running']}/{postprocess['max_workers']} (대기 {postprocess['queued']})"
+        self.queue_status_label.setText(text)
+        connections = pool_stats.snapshot()
+        if connections['requests']:
+            self.queue_status_label.setToolTip(
+                f"HTTP 요청: {connections['requests']} / 새 연결: {connections['connections']}\n"
+                f"연결 재사용: {connections['reuse_ratio']:.0%} / "
+                f"평균 핸드셰이크: {connections['average_handshake'] * 1000:.0f} ms")
 
     def download_finished(self, row, download_item):
-        status_widget = self.download_list.cellWidget(row, 6)
-        if status_widget:
-            status_label = status_widget.findChild(QLabel)
-            cancel_button = status_widget.findChild(QPushButton)
-            if status_label:
-                status_label.setText("다운로드 완료")
-                status_label.show()
-            if cancel_button:
-                cancel_button.hide()
+        # 아직 반영되지 않은 진행률을 먼저 적용
+        self.apply_progress_updates([row])
+        self.progress_table.remove(row)
+        self.download_model.set_speed(row, 0)
+        self.set_row_status(row, "다운로드 완료", cancellable=False)
+        worker = self.download_workers[row]
+        task = worker.postprocess_task
+        notes = [worker.retry_summary()]
+        if task is not None:
+            notes.append(f"병합 대기 {task.wait_time:.1f}초, {task.summary()}")
+        tooltip = "\n".join(note for note in notes if note)
+        if tooltip:
+            self.download_model.set_status_tooltip(row, tooltip)
+        del self.download_workers[row]
+        self.downloading_items.discard(download_item)
+        self.update_download_button(download_item[1])
+
+    def download_skipped(self, row, path, download_item):
+        self.progress_table.remove(row)
+        self.download_model.update_progress(row, 100, "", False, True)
+        self.set_row_status(row, "이미 받은 파일", cancellable=False)
         del self.download_workers[row]
-        self.downloading_items.remove(download_item)
+        self.downloading_items.discard(download_item)
         self.update_download_button(download_item[1])
 
+    def download_deferred(self, row, host, retry_at):
+        """서버가 요청을 제한해 작업이 멈춤. 스케줄러가 차단기가 닫히면 다시 시작합니다."""
+        self.apply_progress_updates([row])
+        self.progress_table.remove(row)
+        self.download_model.set_speed(row, 0)
+        self.set_row_status(row, "서버 제한 대기")
+        self.download_model.set_status_tooltip(
+            row, f"{host} 서버가 요청을 제한해 {time.strftime('%H:%M:%S', time.localtime(retry_at))} 이후 다시 시도합니다")
+        self.update_queue_status()
+
     def download_error(self, row, error_msg, download_item):
-        status_widget = self.download_list.cellWidget(row, 6)
-        if status_widget:
-            status_label = status_widget.findChild(QLabel)
-            cancel_button = status_widget.findChild(QPushButton)
-            if status_label:
-                status_label.setText("오류 발생")
-                status_label.show()
-            if cancel_button:
-                cancel_button.hide()
+        self.apply_progress_updates([row])
+        self.progress_table.remove(row)
+        self.download_model.set_speed(row, 0)
+        self.set_row_status(row, "오류 발생", cancellable=False)
+        retry_summary = self.download_workers[row].retry_summary()
+        if retry_summary:
+            self.download_model.set_status_tooltip(row, retry_summary)
         self.show_error_message("다운로드 오류", error_msg)
         del self.download_workers[row]
-        self.downloading_items.remove(download_item)
+        self.downloading_items.discard(download_item)
         self.update_download_button(download_item[1])
 
     def cancel_download(self, row):
         if row in self.download_workers:
             worker = self.download_workers[row]
             worker.cancel()
+            if self.scheduler.cancel(row):  # 아직 대기 중이면 큐에서 제거
+                worker.update_journal(status=journal.CANCELLED)
+                worker.cleanup_temp_files()  # 이어받기 대기 중이던 작업의 중간 파일
+            self.progress_table.remove(row)
             
             # 다운로드 중이던 파일 삭제
-            if hasattr(worker, 'full_path') and os.path.exists(worker.full_path):
+            if worker.full_path and os.path.exists(worker.full_path):
                 try:
                     os.remove(worker.full_path)
-                    print(f"Deleted file: {worker.full_path}")
+                    event_log.info("deleted", path=worker.full_path)
                 except Exception as e:
                     print(f"Error deleting file: {e}")
 
             # 부분 다운로드 파일 삭제
-            partial_path = worker.full_path + '.part'
-            if os.path.exists(partial_path):
+            partial_path = (worker.full_path or '') + '.part'
+            if worker.full_path and os.path.exists(partial_path):
                 try:
                     os.remove(partial_path)
-                    print(f"Deleted partial file: {partial_path}")
+                    event_log.info("deleted", path=partial_path)
                 except Exception as e:
                     print(f"Error deleting partial file: {e}")
 
-            status_widget = self.download_list.cellWidget(row, 6)
-            if status_widget:
-                status_label = status_widget.findChild(QLabel)
-                cancel_button = status_widget.findChild(QPushButton)
-                if status_label:
-                    status_label.setText("취소됨")
-                    status_label.show()
-                if cancel_button:
-                    cancel_button.hide()
+            self.set_row_status(row, "취소됨", cancellable=False)
             del self.download_workers[row]
-            for item in self.downloading_items:
-                if item[1] == worker.format['format_id']:
-                    self.downloading_items.remove(item)
-                    self.update_download_button(item[1])
-                    break
-
-            # 프로그레스 바를 0으로 리셋
-            progress_widget = self.download_list.cellWidget(row, 4)
-            if progress_widget:
-                progress_bar = progress_widget.findChild(QProgressBar)
-                if progress_bar:
-                    progress_bar.setValue(0)
-            
-            # 남은 시간을 초기화
-            time_item = self.download_list.item(row, 5)
-            if time_item:
-                time_item.setText("")
+            download_item = download_key(worker.url, worker.format)
+            self.downloading_items.discard(download_item)
+            self.update_download_button(download_item[1])
+
+            # 프로그레스 바와 남은 시간을 초기화
+            self.download_model.reset_progress(row)
 
     def setup_download_list(self):
-        self.download_list = QTableWidget()
-        self.download_list.setColumnCount(7)
-        self.download_list.setHorizontalHeaderLabels(["썸네일", "비디오 이름", "해상도", "파일 크기", "진행률", "남은 시간", "상태"])
+        self.download_model = DownloadListModel(self.thumbnail_service, LIST_THUMBNAIL_SIZE, self)
+        self.download_list = QTableView()
+        self.download_list.setModel(self.download_model)
+
+        # 썸네일, 진행률, 상태(취소 버튼)는 행마다 위젯을 만들지 않고 델리게이트로 그립니다
+        self.thumbnail_delegate = ThumbnailDelegate(self.download_list)
+        self.progress_delegate = ProgressDelegate(self.download_list)
+        self.status_delegate = StatusDelegate(self.download_list)
+        self.status_delegate.cancel_requested.connect(self.cancel_download)
+        self.download_list.setItemDelegateForColumn(THUMBNAIL_COLUMN, self.thumbnail_delegate)
+        self.download_list.setItemDelegateForColumn(PROGRESS_COLUMN, self.progress_delegate)
+        self.download_list.setItemDelegateForColumn(STATUS_COLUMN, self.status_delegate)
+        self.download_list.setMouseTracking(True)  # 취소 버튼 hover 표시
         
         # Make the table non-selectable
-        self.download_list.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
+        self.download_list.setSelectionMode(QTableView.SelectionMode.NoSelection)
         self.download_list.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-        self.download_list.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.download_list.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+
+        # 모든 행의 높이를 고정하고 행 번호 헤더를 숨겨 행마다 크기를 계산하지 않게 함
+        vertical_header = self.download_list.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(50)
+        vertical_header.setVisible(False)
+
+        # 우클릭 메뉴 (대기 중인 작업의 순서 변경, 일시정지/재개)
+        self.download_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.download_list.customContextMenuRequested.connect(self.show_download_list_menu)
 
         header = self.download_list.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Fixed)
         header.setSectionResizeMode(3, QHeaderView.ResizeMode.Fixed)
         header.setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(5, QHeaderView.ResizeMode.Fixed)
         header.setSectionResizeMode(6, QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(7, QHeaderView.ResizeMode.Fixed)
         
         self.download_list.setColumnWidth(0, 90)  # 썸네일
+        self.download_list.setColumnWidth(2, 90)  # 해상도
         self.download_list.setColumnWidth(3, 100)  # 파일 크기
         self.download_list.setColumnWidth(5, 80)  # 남은 시간
-        self.download_list.setColumnWidth(6, 100)  # 상태 (너비를 늘림)
-
-        # Apply stylesheet to make it visually consistent with the video table
-        self.download_list.setStyleSheet("""
-            QTableWidget {
-                border: 1px solid #CCCCCC;
-                background-color: white;
-            }
-            QTableWidget::item {
-                padding: 5px;
-                border-right: 1px solid #CCCCCC;
-            }
-            QHeaderView::section {
-                background-color: #E0E0E0;
-                padding: 5px;
-                border: none;
-                border-right: 1px solid #CCCCCC;
-                border-bottom: 1px solid #CCCCCC;
-            }
-        """)
+        self.download_list.setColumnWidth(6, 100)  # 속도 (동시 연결 수 포함)
+        self.download_list.setColumnWidth(7, 100)  # 상태 (너비를 늘림)
 
     def get_ffmpeg_path(self):
         # Determine the base path where the ffmpeg binary is located
@@ -1147,27 +1916,51 @@ class YouTubeDownloader(QMainWindow):
             QDesktopServices.openUrl(QUrl(self.video_url))
 
     def check_if_merged_format(self, format):
-        return 'acodec' in format and format['acodec'] != 'none' and \
-               'vcodec' in format and format['vcodec'] != 'none'
+        return check_if_merged_format(format)
+
+    def start_ffmpeg_probe(self):
+        if self.ffmpeg_probe_running or not os.path.isfile(self.ffmpeg_path):
+            return
+        self.ffmpeg_probe_running = True
+        worker = FFmpegProbeWorker(self.ffmpeg_probe, self.ffmpeg_path)
+        worker.signals.result.connect(self.ffmpeg_probe_finished)
+        self.threadpool.start(worker)
+
+    def ffmpeg_probe_finished(self, capabilities):
+        self.ffmpeg_probe_running = False
+        self.apply_ffmpeg_capabilities(capabilities)
+
+    def apply_ffmpeg_capabilities(self, capabilities):
+        """조사 결과를 저장하고, 인코더가 없어 변환할 수 없는 오디오 대상을 고르지 못하게 합니다."""
+        self.ffmpeg_capabilities = capabilities
+        unavailable = unavailable_targets(capabilities)
+        model = self.audio_target_combo.model()
+        for index in range(self.audio_target_combo.count()):
+            target = self.audio_target_combo.itemData(index)
+            item = model.item(index)
+            item.setEnabled(target not in unavailable)
+            item.setToolTip("이 ffmpeg에는 이 형식의 인코더가 없습니다" if target in unavailable else "")
+        if self.audio_target_combo.currentData() in unavailable:
+            self.audio_target_combo.setCurrentIndex(0)  # 원본 코덱 유지 (인코더가 필요 없음)
 
     def validate_ffmpeg(self):
-        ffmpeg_path = self.get_ffmpeg_path()
+        """백그라운드 조사 결과로 ffmpeg를 확인합니다. 여기서는 프로세스를 실행하지 않습니다."""
+        ffmpeg_path = self.ffmpeg_path
         if not ffmpeg_path or not os.path.isfile(ffmpeg_path):
             QMessageBox.critical(self, "Error", f"FFmpeg not found. Please check your installation: {ffmpeg_path}")
             return False
-        
-        try:
-            result = subprocess.run([ffmpeg_path, "-version"], capture_output=True, text=True, timeout=5)
-            if result.returncode != 0:
-                QMessageBox.critical(self, "Error", "FFmpeg is not working properly. Please check your installation.")
-                return False
-        except subprocess.TimeoutExpired:
-            QMessageBox.critical(self, "Error", "FFmpeg check timed out. Please try again.")
-            return False
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"An error occurred while checking FFmpeg: {str(e)}")
+
+        capabilities = self.ffmpeg_probe.cached(ffmpeg_path)
+        if capabilities is None:
+            # 아직 조사 중이거나 실행 파일이 바뀜: 다시 조사를 걸어 두고 다운로드는 진행
+            self.start_ffmpeg_probe()
+            return True
+        if capabilities is not self.ffmpeg_capabilities:
+            self.apply_ffmpeg_capabilities(capabilities)
+
+        if not capabilities['ok']:
+            QMessageBox.critical(self, "Error", "FFmpeg is not working properly. Please check your installation.")
             return False
-        
         return True
 
 class ClickableLabel(QLabel):
@@ -0,0 +1,166 @@
+import copy
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlparse
+
+from app_paths import get_cache_directory
+from disk_cache import DiskCache
+
+# YouTube 영상 ID를 뽑아내기 위한 패턴 (watch, youtu.be, shorts, embed, live)
+_YOUTUBE_ID_PATTERNS = [
+    re.compile(r"(?:youtube\.com|youtube-nocookie\.com)/(?:shorts|embed|live|v)/([0-9A-Za-z_-]{11})"),
+    re.compile(r"youtu\.be/([0-9A-Za-z_-]{11})"),
+]
+_EXPIRE_PATH_PATTERN = re.compile(r"/expire/(\d+)")
+
+DEFAULT_TTL = 6 * 60 * 60  # 만료 정보가 없는 항목의 기본 유효 시간
+EXPIRY_MARGIN = 5 * 60  # 서명된 URL 만료 직전의 항목은 사용하지 않음
+
+
+def normalize_video_key(url):
+    """URL을 캐시 키로 정규화합니다. YouTube 링크는 영상 ID로 묶입니다."""
+    url = url.strip()
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host.endswith("youtube.com") or host.endswith("youtube-nocookie.com"):
+        video_id = parse_qs(parsed.query).get("v", [None])[0]
+        if video_id and re.fullmatch(r"[0-9A-Za-z_-]{11}", video_id):
+            return f"youtube:{video_id}"
+    for pattern in _YOUTUBE_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return f"youtube:{match.group(1)}"
+    return "url:" + parsed._replace(fragment="").geturl()
+
+
+def get_url_expiry(url):
+    """서명된 스트림 URL의 만료 시각(epoch)을 반환합니다. 없으면 None."""
+    if not url:
+        return None
+    parsed = urlparse(url)
+    expire = parse_qs(parsed.query).get("expire", [None])[0]
+    if expire is None:
+        match = _EXPIRE_PATH_PATTERN.search(parsed.path)
+        expire = match.group(1) if match else None
+    try:
+        return int(expire) if expire is not None else None
+    except ValueError:
+        return None
+
+
+def get_info_expiry(info):
+    """포맷 목록 중 가장 먼저 만료되는 스트림 URL의 만료 시각을 반환합니다."""
+    expiries = [get_url_expiry(f.get("url")) for f in info.get("formats") or []]
+    expiries = [e for e in expiries if e]
+    return min(expiries) if expiries else None
+
+
+class MetadataCache:
+    """yt-dlp 메타데이터(info dict)를 메모리 LRU + 디스크 두 단계로 캐시합니다.
+
+    각 항목은 스트림 URL이 만료되기 전까지만 유효하며, 디스크 캐시는 전체 크기
+    상한을 넘으면 가장 오래 사용되지 않은 항목부터 지웁니다.
+    """
+
+    def __init__(self, cache_dir=None, max_memory_entries=64, max_disk_bytes=200 * 1024 * 1024,
+                 default_ttl=DEFAULT_TTL):
+        self.disk = DiskCache(cache_dir or get_cache_directory("metadata"), max_disk_bytes)
+        self.max_memory_entries = max_memory_entries
+        self.default_ttl = default_ttl
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()  # key -> (expires_at, info)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _disk_name(key):
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json"
+
+    def _compute_expiry(self, info):
+        now = time.time()
+        expires_at = now + self.default_ttl
+        url_expiry = get_info_expiry(info)
+        if url_expiry:
+            expires_at = min(expires_at, url_expiry - EXPIRY_MARGIN)
+        return expires_at
+
+    def get(self, url):
+        """캐시된 info dict의 사본을 반환합니다. 없거나 만료되었으면 None."""
+        key = normalize_video_key(url)
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                expires_at, info = entry
+                if expires_at > now:
+                    self.memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return copy.deepcopy(info)
+                del self.memory[key]
+
+        name = self._disk_name(key)
+        payload = None
+        data = self.disk.read(name)
+        if data is not None:
+            try:
+                payload = json.loads(data)
+            except ValueError:
+                pass
+
+        with self.lock:
+            if payload is None or payload.get("expires_at", 0) <= now:
+                self.misses += 1
+                if data is None:
+                    return None
+            else:
+                self.disk_hits += 1
+                self._remember(key, payload["expires_at"], payload["info"])
+                return copy.deepcopy(payload["info"])
+        self.disk.remove(name)
+        return None
+
+    def put(self, url, info):
+        """info dict를 저장합니다. JSON으로 직렬화 가능한(sanitize된) dict여야 합니다."""
+        key = normalize_video_key(url)
+        expires_at = self._compute_expiry(info)
+        if expires_at <= time.time():
+            return
+        info = copy.deepcopy(info)
+        with self.lock:
+            self._remember(key, expires_at, info)
+
+        try:
+            data = json.dumps({"key": key, "expires_at": expires_at, "info": info}).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            print(f"Error serializing metadata cache entry: {e}")
+            return
+        self.disk.write(self._disk_name(key), data)
+
+    def invalidate(self, url):
+        key = normalize_video_key(url)
+        with self.lock:
+            self.memory.pop(key, None)
+        self.disk.remove(self._disk_name(key))
+
+    def stats(self):
+        with self.lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "hits": self.memory_hits + self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self.memory),
+                "disk_entries": len(self.disk),
+                "disk_bytes": self.disk.usage,
+            }
+
+    def _remember(self, key, expires_at, info):
+        self.memory[key] = (expires_at, info)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
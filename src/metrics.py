@@ -0,0 +1,382 @@
+"""다운로드 엔진의 구조화된 이벤트 기록과 지표. Qt를 import하지 않습니다.
+
+- EventLog: 이벤트를 JSON 한 줄씩 파일에 씁니다. 설정한 수준보다 낮은 이벤트는 바로 버리며,
+  값을 만드는 데 비용이 드는 기록은 `if event_log.enabled(DEBUG):`로 감싸 꺼져 있으면 아무 일도 하지 않습니다.
+- MetricsRegistry: 프로세스 전체의 카운터와 히스토그램. Prometheus 텍스트 형식으로 내보냅니다.
+- JobMetrics: 작업 하나의 추출 시간, 첫 바이트까지 걸린 시간, 시간별 처리량, 병합 시간, 최종 크기.
+- MetricsServer: 127.0.0.1에서 /metrics로 Prometheus 텍스트를 내줍니다.
+"""
+import json
+import os
+import threading
+import time
+
+from app_paths import get_app_data_directory
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR, "off": OFF}
+
+LOG_FILE = "events.jsonl"
+MAX_LOG_BYTES = 5 * 1024 * 1024  # 넘으면 events.jsonl.1로 옮기고 새로 씀
+THROUGHPUT_INTERVAL = 1.0  # 처리량 표본 간격 (초)
+MAX_THROUGHPUT_SAMPLES = 120  # 넘으면 표본을 절반으로 줄이고 간격을 두 배로 늘림
+
+
+def parse_level(name, default=INFO):
+    return LEVELS.get((name or "").strip().lower(), default)
+
+
+class EventLog:
+    """JSON-lines 이벤트 기록. 파일은 처음 기록할 때 엽니다. 여러 스레드에서 호출됩니다."""
+
+    def __init__(self, path=None, level=INFO):
+        self.path = path  # None이면 앱 데이터 폴더의 events.jsonl
+        self.level = level
+        self.lock = threading.Lock()
+        self.stream = None
+
+    def configure(self, path=None, level=None):
+        with self.lock:
+            if path is not None and path != self.path:
+                self._close()
+                self.path = path
+            if level is not None:
+                self.level = level
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def log(self, level, event, **fields):
+        if level < self.level:
+            return
+        record = {"time": round(time.time(), 3), "level": level_name(level), "event": event}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self.lock:
+            try:
+                self._write(line)
+            except OSError as e:
+                print(f"Error writing event log: {e}")
+                self.level = OFF  # 쓸 수 없는 위치면 더 시도하지 않음
+
+    def debug(self, event, **fields):
+        self.log(DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.log(INFO, event, **fields)
+
+    def warning(self, event, **fields):
+        self.log(WARNING, event, **fields)
+
+    def error(self, event, **fields):
+        self.log(ERROR, event, **fields)
+
+    def _write(self, line):
+        if self.stream is None:
+            if self.path is None:
+                self.path = os.path.join(get_app_data_directory(), LOG_FILE)
+            self.stream = open(self.path, "a", encoding="utf-8")
+        self.stream.write(line)
+        self.stream.flush()
+        if self.stream.tell() > MAX_LOG_BYTES:
+            self._close()
+            os.replace(self.path, self.path + ".1")
+
+    def _close(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+
+def level_name(level):
+    for name, value in LEVELS.items():
+        if value == level:
+            return name
+    return str(level)
+
+
+class Counter:
+    def __init__(self, registry, name, help):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.values = {}  # 라벨 (키, 값) 튜플 -> 값
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{format_labels(key)} {format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, registry, name, help, buckets):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)  # 구간별 (누적이 아닌) 개수
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        with self.registry.lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+            self.count += 1
+            self.sum += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{format_value(bound)}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {format_value(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+def format_labels(key):
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in key) + "}"
+
+
+def format_value(value):
+    return str(int(value)) if float(value).is_integer() else f"{value:.6g}"
+
+
+class MetricsRegistry:
+    """카운터와 히스토그램 모음. collectors는 내보낼 때마다 부르는 함수로, Prometheus 텍스트 줄 목록을 반환합니다."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = []
+        self.collectors = []
+
+    def counter(self, name, help):
+        metric = Counter(self, name, help)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, buckets):
+        metric = Histogram(self, name, help, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        with self.lock:
+            lines = [line for metric in self.metrics for line in metric.render()]
+        for collector in self.collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+        return "\n".join(lines) + "\n"
+
+
+event_log = EventLog(level=parse_level(os.environ.get("YTD_LOG_LEVEL")))
+registry = MetricsRegistry()
+
+JOBS = registry.counter("ytd_jobs_total", "끝난 작업 수 (outcome별)")
+DOWNLOADED_BYTES = registry.counter("ytd_downloaded_bytes_total", "받은 바이트 수")
+RETRIES = registry.counter("ytd_retries_total", "재시도 수")
+BACKOFF_SECONDS = registry.counter("ytd_backoff_seconds_total", "재시도 전에 기다린 시간")
+EXTRACTION_SECONDS = registry.histogram("ytd_extraction_seconds", "영상 정보 추출 시간",
+                                        (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+TTFB_SECONDS = registry.histogram("ytd_ttfb_seconds", "받기 시작부터 첫 바이트까지 걸린 시간",
+                                  (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+MERGE_SECONDS = registry.histogram("ytd_merge_seconds", "병합/변환 시간", (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300))
+JOB_SECONDS = registry.histogram("ytd_job_seconds", "작업 시작부터 끝까지 걸린 시간",
+                                 (1, 5, 15, 30, 60, 120, 300, 600, 1800))
+THROUGHPUT = registry.histogram("ytd_job_throughput_bytes_per_second", "작업의 평균 처리량",
+                                (1e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 2.5e7, 5e7, 1e8))
+FINAL_SIZE = registry.histogram("ytd_final_size_bytes", "완성된 파일 크기",
+                                (1e6, 1e7, 5e7, 1e8, 2.5e8, 5e8, 1e9, 5e9))
+
+
+def _connection_metrics():
+    from http_pool import pool_stats
+    from retry_policy import retry_engine
+
+    stats = pool_stats.snapshot()
+    lines = ["# TYPE ytd_http_requests_total counter", f"ytd_http_requests_total {stats['requests']}",
+             "# TYPE ytd_http_connections_total counter", f"ytd_http_connections_total {stats['connections']}",
+             "# TYPE ytd_http_handshake_seconds_total counter",
+             f"ytd_http_handshake_seconds_total {format_value(stats['handshake_seconds'])}",
+             "# TYPE ytd_circuit_trips_total counter"]
+    for host, circuit in sorted(retry_engine.stats().items()):
+        lines.append(f'ytd_circuit_trips_total{{host="{host}"}} {circuit["trips"]}')
+    return lines
+
+
+registry.collectors.append(_connection_metrics)
+
+
+class JobMetrics:
+    """작업 하나의 지표. 작업 스레드(진행 훅은 구간/조각 스레드에서도)에서 호출됩니다.
+
+    start()부터 finish()까지가 한 번의 실행이며, 서버 제한으로 멈췄다 다시 실행하면 새로 잽니다.
+    """
+
+    def __init__(self, job_id, url):
+        self.job_id = job_id
+        self.url = url
+        self.lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self.finished = False
+        self.extraction_seconds = None
+        self.transfer_started_at = None
+        self.ttfb = None
+        self.file_bytes = {}  # 파일 -> 그 파일에서 받은 바이트 수
+        self.bytes = 0
+        self.samples = []  # [경과 시간(초), 그 구간의 처리량(bytes/s)]
+        self.sample_interval = THROUGHPUT_INTERVAL
+        self.last_sample = (0.0, 0)
+        self.merge_started_at = None
+        self.merge_seconds = None
+
+    def extracted(self, seconds):
+        self.extraction_seconds = seconds
+        EXTRACTION_SECONDS.observe(seconds)
+
+    def transfer_started(self):
+        if self.transfer_started_at is None:
+            self.transfer_started_at = time.monotonic()
+
+    def progress(self, file_name, downloaded_bytes):
+        """진행 훅의 파일별 누적 바이트 수를 받아 전체 바이트 수와 처리량 표본을 갱신합니다.
+
+        파일마다 처음 본 값은 기준으로만 씁니다. 이어받는 파일은 이미 받아 둔 바이트부터 알려 주기 때문입니다.
+        """
+        now = time.monotonic()
+        with self.lock:
+            start = self.transfer_started_at or self.started_at
+            if self.ttfb is None:
+                self.ttfb = now - start
+                TTFB_SECONDS.observe(self.ttfb)
+            if file_name not in self.file_bytes:
+                self.file_bytes[file_name] = downloaded_bytes
+                return
+            delta = downloaded_bytes - self.file_bytes[file_name]
+            if delta <= 0:
+                return
+            self.file_bytes[file_name] = downloaded_bytes
+            self.bytes += delta
+            elapsed = now - start
+            last_elapsed, last_bytes = self.last_sample
+            if elapsed - last_elapsed >= self.sample_interval:
+                self.samples.append([round(elapsed, 1), int((self.bytes - last_bytes) / (elapsed - last_elapsed))])
+                self.last_sample = (elapsed, self.bytes)
+                if len(self.samples) > MAX_THROUGHPUT_SAMPLES:
+                    # 오래 걸리는 작업: 이웃한 표본을 합쳐 개수를 유지
+                    self.samples = [[b[0], (a[1] + b[1]) // 2]
+                                    for a, b in zip(self.samples[::2], self.samples[1::2])]
+                    self.sample_interval *= 2
+        DOWNLOADED_BYTES.inc(delta)
+        if event_log.enabled(DEBUG):
+            event_log.debug("progress", job=self.job_id, file=os.path.basename(file_name or ""),
+                            downloaded_bytes=downloaded_bytes, total_bytes=self.bytes)
+
+    def merge_started(self):
+        self.merge_started_at = time.monotonic()
+
+    def merge_finished(self, seconds=None):
+        if seconds is None:
+            if self.merge_started_at is None:
+                return
+            seconds = time.monotonic() - self.merge_started_at
+        self.merge_started_at = None
+        self.merge_seconds = (self.merge_seconds or 0) + seconds
+        MERGE_SECONDS.observe(seconds)
+
+    def fields(self):
+        """작업 요약에 넣는 값. 재지 못한 값은 빠집니다."""
+        transfer_seconds = time.monotonic() - (self.transfer_started_at or self.started_at)
+        fields = {
+            "extraction_time": self.extraction_seconds,
+            "ttfb": self.ttfb,
+            "merge_time": self.merge_seconds,
+            "average_throughput": int(self.bytes / transfer_seconds) if self.bytes and transfer_seconds > 0 else None,
+        }
+        return {key: round(value, 3) if isinstance(value, float) else value
+                for key, value in fields.items() if value is not None}
+
+    def finish(self, outcome, retries=0, backoff=0.0, final_size=None, error=None):
+        """작업이 끝나거나 멈추면 한 번 부릅니다. 집계 지표를 갱신하고 job 이벤트를 기록합니다."""
+        with self.lock:
+            if self.finished:
+                return
+            self.finished = True
+        elapsed = time.monotonic() - self.started_at
+        fields = self.fields()
+        JOBS.inc(outcome=outcome)
+        if outcome == "finished":
+            JOB_SECONDS.observe(elapsed)
+            if fields.get("average_throughput"):
+                THROUGHPUT.observe(fields["average_throughput"])
+            if final_size:
+                FINAL_SIZE.observe(final_size)
+        level = ERROR if outcome == "failed" else INFO
+        if event_log.enabled(level):
+            event_log.log(level, "job", job=self.job_id, url=self.url, outcome=outcome, elapsed=round(elapsed, 3),
+                          downloaded_bytes=self.bytes, size=final_size, retries=retries,
+                          backoff=round(backoff, 3), throughput=self.samples, error=error, **fields)
+
+
+class MetricsServer:
+    """127.0.0.1:port의 /metrics에서 registry를 Prometheus 텍스트 형식으로 내줍니다. 데몬 스레드에서 실행됩니다."""
+
+    def __init__(self, port, host="127.0.0.1", metrics_registry=None):
+        self.port = port
+        self.host = host
+        self.registry = metrics_registry or registry
+        self.server = None
+
+    def start(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics_registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics_registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.port
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,120 @@
+import re
+from urllib.parse import parse_qs, urlparse
+
+# 재생목록/채널을 한 항목씩 받아 올 때의 yt-dlp 옵션
+FLAT_PLAYLIST_OPTIONS = {
+    'extract_flat': 'in_playlist',
+    'lazy_playlist': True,
+    'quiet': True,
+    'no_warnings': True,
+}
+
+_CHANNEL_PATH_PATTERN = re.compile(r"^/(?:@[^/]+|channel/[^/]+|c/[^/]+|user/[^/]+)(?:/(?:videos|shorts|streams|playlists))?/?$")
+
+# 재생목록 일괄 다운로드 시 고를 수 있는 화질 (라벨, 포맷 선택식)
+QUALITY_PRESETS = [
+    ("최고 화질", "bestvideo+bestaudio/best"),
+    ("1080p 이하", "bestvideo[height<=1080]+bestaudio/best[height<=1080]"),
+    ("720p 이하", "bestvideo[height<=720]+bestaudio/best[height<=720]"),
+    ("480p 이하", "bestvideo[height<=480]+bestaudio/best[height<=480]"),
+    ("mp4 1080p 이하", "bestvideo[ext=mp4][height<=1080]+bestaudio[ext=m4a]/best[ext=mp4][height<=1080]"),
+    ("mp4 720p 이하", "bestvideo[ext=mp4][height<=720]+bestaudio[ext=m4a]/best[ext=mp4][height<=720]"),
+]
+# 오디오만 받아 오디오 탭의 변환 설정으로 변환
+AUDIO_PRESET = ("오디오만", "bestaudio")
+
+
+def is_playlist_url(url):
+    """재생목록 또는 채널 링크인지 판단합니다. 단일 영상 링크(v= 포함)는 제외합니다."""
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if not (host.endswith("youtube.com") or host.endswith("youtu.be")):
+        return False
+    query = parse_qs(parsed.query)
+    if parsed.path.rstrip("/") == "/playlist" and "list" in query:
+        return True
+    if "list" in query and "v" not in query:
+        return True
+    return bool(_CHANNEL_PATH_PATTERN.match(parsed.path))
+
+
+def compact_entry(entry):
+    """평면 추출된 항목에서 목록 표시와 다운로드에 필요한 값만 남깁니다."""
+    thumbnail = entry.get('thumbnail')
+    if not thumbnail and entry.get('thumbnails'):
+        thumbnail = entry['thumbnails'][-1].get('url')
+    url = entry.get('url') or entry.get('webpage_url')
+    if entry.get('ie_key') == 'Youtube' and entry.get('id'):
+        url = f"https://www.youtube.com/watch?v={entry['id']}"
+    return {
+        'id': entry.get('id'),
+        'url': url,
+        'title': entry.get('title') or entry.get('id') or 'Unknown Title',
+        'duration': entry.get('duration'),
+        'channel': entry.get('channel') or entry.get('uploader') or '',
+        'thumbnail': thumbnail,
+    }
+
+
+def iter_playlist(url, ffmpeg_path=None, is_cancelled=None):
+    """재생목록/채널을 평면 추출로 펼칩니다.
+
+    첫 값으로 재생목록 정보(dict)를, 이후 발견되는 순서대로 항목(compact_entry)을 하나씩 내보냅니다.
+    전체 항목의 info dict를 메모리에 모으지 않습니다.
+    """
+    from http_pool import load_yt_dlp  # GUI 시작 시간을 줄이려고 처음 쓸 때 import
+
+    yt_dlp = load_yt_dlp()
+
+    ydl_opts = dict(FLAT_PLAYLIST_OPTIONS, ffmpeg_location=ffmpeg_path)
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        result = ydl.extract_info(url, download=False, process=False)
+        # 채널 홈 등은 다른 탭 URL로 넘겨줄 수 있음
+        for _ in range(3):
+            if result.get('_type') not in ('url', 'url_transparent'):
+                break
+            result = ydl.extract_info(result['url'], download=False, process=False)
+
+        yield {
+            'id': result.get('id'),
+            'title': result.get('title') or url,
+            'channel': result.get('channel') or result.get('uploader') or '',
+            'count': result.get('playlist_count'),
+        }
+
+        for entry in result.get('entries') or []:
+            if is_cancelled is not None and is_cancelled():
+                return
+            if not entry:
+                continue
+            if entry.get('_type') == 'playlist' or entry.get('ie_key') == 'YoutubeTab':
+                continue  # 하위 재생목록/탭은 펼치지 않음
+            yield compact_entry(entry)
+
+
+def select_format(ydl, info, format_spec):
+    """포맷 선택식을 info의 포맷 목록에 적용해 실제로 받을 포맷(dict)을 반환합니다."""
+    formats = info.get('formats') or []
+    selector = ydl.build_format_selector(format_spec)
+    chosen = list(selector({
+        'formats': formats,
+        'has_merged_format': any('none' not in (f.get('acodec'), f.get('vcodec')) for f in formats),
+        'incomplete_formats': (all(f.get('vcodec') == 'none' for f in formats)
+                               or all(f.get('acodec') == 'none' for f in formats)),
+    }))
+    return chosen[0] if chosen else None
+
+
+def describe_format(chosen):
+    """select_format 결과를 작업에 넘길 포맷 dict로 줄입니다. 합쳐 받는 경우 크기는 스트림들의 합입니다."""
+    requested = chosen.get('requested_formats') or []
+    return {
+        'format_id': chosen['format_id'],
+        'height': chosen.get('height'),
+        'ext': chosen.get('ext', 'mp4'),
+        'vcodec': chosen.get('vcodec'),
+        'acodec': chosen.get('acodec') if not requested else 'none',
+        'filesize': sum((f.get('filesize') or f.get('filesize_approx') or 0) for f in requested)
+                    or chosen.get('filesize') or chosen.get('filesize_approx'),
+        'requested_formats': len(requested),
+    }
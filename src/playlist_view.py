@@ -0,0 +1,77 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+COLUMNS = ["#", "제목", "채널", "길이", "상태"]
+
+
+def format_duration(seconds):
+    if not seconds:
+        return ""
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours:02}:{minutes:02}:{seconds:02}"
+    return f"{minutes:02}:{seconds:02}"
+
+
+class PlaylistModel(QAbstractTableModel):
+    """재생목록 항목 모델. 항목은 발견되는 대로 뒤에 붙습니다."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = []  # compact_entry dict 목록
+        self.queued = []  # 항목별 대기열 추가 여부
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        row = index.row()
+        entry = self.entries[row]
+        column = index.column()
+        if column == 0:
+            return str(row + 1)
+        if column == 1:
+            return entry['title']
+        if column == 2:
+            return entry['channel']
+        if column == 3:
+            return format_duration(entry['duration'])
+        if column == 4:
+            return "대기열에 추가됨" if self.queued[row] else ""
+        return None
+
+    def clear(self):
+        self.beginResetModel()
+        self.entries = []
+        self.queued = []
+        self.endResetModel()
+
+    def append_entries(self, entries):
+        if not entries:
+            return
+        first = len(self.entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        self.entries.extend(entries)
+        self.queued.extend([False] * len(entries))
+        self.endInsertRows()
+
+    def unqueued_rows(self):
+        return [row for row, queued in enumerate(self.queued) if not queued]
+
+    def mark_queued(self, row):
+        self.queued[row] = True
+        index = self.index(row, 4)
+        self.dataChanged.emit(index, index)
@@ -0,0 +1,292 @@
+import heapq
+import itertools
+import os
+import signal
+import subprocess
+import threading
+import time
+
+from metrics import event_log
+
+# 작을수록 먼저 실행 (빨리 끝나는 스트림 복사를 오래 걸리는 변환보다 먼저)
+MERGE_PRIORITY = 0
+REMUX_PRIORITY = 0
+TRANSCODE_PRIORITY = 10
+
+# 컨테이너에 다시 인코딩하지 않고 넣을 수 있는 코덱 (yt-dlp 코덱 문자열의 앞부분). 없는 컨테이너는 모두 허용.
+COPY_CODECS = {
+    'mp4': {'video': ('avc1', 'avc3', 'h264', 'hev1', 'hvc1', 'h265', 'av01', 'vp09', 'vp9'),
+            'audio': ('mp4a', 'aac', 'mp3', 'opus', 'ac-3', 'ec-3', 'flac', 'alac')},
+    'm4a': {'video': (), 'audio': ('mp4a', 'aac', 'alac', 'opus', 'flac')},
+    'webm': {'video': ('vp8', 'vp9', 'vp09', 'av01'), 'audio': ('opus', 'vorbis')},
+}
+
+# 복사할 수 없을 때 쓰는 인코더 후보 (앞쪽부터): (인코더, 필요한 하드웨어 가속, 옵션)
+# 하드웨어 인코더는 ffmpeg 조사 결과에 인코더와 그 가속 방식이 모두 있을 때만 씁니다.
+FALLBACK_ENCODERS = {
+    'mp4': {'video': [('h264_videotoolbox', 'videotoolbox', ['-b:v', '8M']),
+                      ('h264_nvenc', 'cuda', ['-preset', 'p4', '-cq', '23']),
+                      ('h264_qsv', 'qsv', ['-preset', 'veryfast', '-global_quality', '23']),
+                      ('libx264', None, ['-preset', 'veryfast', '-crf', '20']),
+                      ('libopenh264', None, ['-b:v', '8M'])],
+            'audio': [('aac', None, ['-b:a', '192k'])]},
+    'm4a': {'video': [], 'audio': [('aac', None, ['-b:a', '192k'])]},
+    'webm': {'video': [('libvpx-vp9', None, ['-row-mt', '1', '-b:v', '0', '-crf', '32']),
+                       ('libvpx', None, ['-b:v', '0', '-crf', '10'])],
+             'audio': [('libopus', None, ['-b:a', '160k']), ('libvorbis', None, ['-q:a', '5'])]},
+}
+
+
+class EncoderUnavailable(Exception):
+    """ffmpeg에 필요한 인코더가 없는 경우."""
+
+
+def pick_encoder(candidates, kind, capabilities=None, hardware=True):
+    """candidates 중 쓸 수 있는 첫 인코더의 (이름, 옵션)을 반환합니다. 없으면 None입니다.
+
+    capabilities는 ffmpeg_probe의 조사 결과이며, 아직 조사 전이면(None) 하드웨어가 아닌 첫 후보를 고릅니다.
+    """
+    encoders = (capabilities or {}).get('encoders', {}).get(kind)
+    if not encoders:
+        software = [(name, args) for name, hwaccel, args in candidates if hwaccel is None]
+        return software[0] if software else None
+    hwaccels = set((capabilities or {}).get('hwaccels') or [])
+    for name, hwaccel, args in candidates:
+        if name in encoders and (hwaccel is None or (hardware and hwaccel in hwaccels)):
+            return name, args
+    return None
+
+
+def uses_hardware_encoder(candidates_by_kind, capabilities):
+    """이 조사 결과로 고르면 하드웨어 인코더가 골라지는지 확인합니다."""
+    return any(pick_encoder(candidates, kind, capabilities) != pick_encoder(candidates, kind, capabilities, False)
+               for kind, candidates in candidates_by_kind.items())
+
+
+def output_format(ext):
+    """확장자에 맞는 ffmpeg -f 이름 (m4a -> ipod 등)."""
+    from yt_dlp.postprocessor.ffmpeg import EXT_TO_OUT_FORMATS  # 시작 시간을 줄이려고 처음 쓸 때 import
+    return EXT_TO_OUT_FORMATS.get(ext, ext)
+
+
+def can_copy(codec, kind, ext):
+    """codec을 ext 컨테이너에 스트림 복사로 넣을 수 있는지 확인합니다. 코덱을 모르면 복사를 시도합니다."""
+    allowed = COPY_CODECS.get(ext)
+    if allowed is None or not codec or codec == 'none':
+        return True
+    return codec.lower().startswith(allowed[kind])
+
+
+def merge_command(ffmpeg_path, streams, output, ext, capabilities=None, hardware=True):
+    """비디오/오디오 파일들을 하나로 합치는 ffmpeg 명령. 코덱이 맞으면 스트림 복사, 아니면 그 스트림만 변환합니다.
+
+    streams는 (경로, vcodec, acodec) 목록입니다. 변환할 인코더는 capabilities(ffmpeg 조사 결과)에 있는 것 중에서
+    고르며(hardware가 참이면 하드웨어 인코더 우선), 맞는 인코더가 없으면 EncoderUnavailable을 냅니다.
+    """
+    command = [ffmpeg_path, "-hide_banner", "-loglevel", "error", "-nostdin", "-y"]
+    for path, _, _ in streams:
+        command += ["-i", path]
+    codec_args = []
+    output_index = {'video': 0, 'audio': 0}
+    for index, (_, vcodec, acodec) in enumerate(streams):
+        for kind, codec, selector in (('video', vcodec, 'v'), ('audio', acodec, 'a')):
+            if codec == 'none':
+                continue
+            command += ["-map", f"{index}:{selector}:0?" if codec is None else f"{index}:{selector}:0"]
+            stream = f"{selector}:{output_index[kind]}"
+            output_index[kind] += 1
+            if can_copy(codec, kind, ext):
+                codec_args += [f"-c:{stream}", "copy"]
+            else:
+                candidates = FALLBACK_ENCODERS.get(ext, {}).get(kind) or []
+                encoder = pick_encoder(candidates, kind, capabilities, hardware)
+                if encoder is None:
+                    names = ", ".join(name for name, _, _ in candidates) or "없음"
+                    raise EncoderUnavailable(f"{codec} {kind} 스트림을 {ext}에 넣으려면 ffmpeg에 인코더가 필요합니다 "
+                                             f"(후보: {names})")
+                codec_args += [f"-c:{stream}", encoder[0], *encoder[1]]
+    return command + codec_args + ["-f", output_format(ext), output]
+
+
+def remux_command(ffmpeg_path, source, output, ext):
+    """다시 인코딩하지 않고 컨테이너만 바꿉니다."""
+    return [ffmpeg_path, "-hide_banner", "-loglevel", "error", "-nostdin", "-y", "-i", source,
+            "-map", "0", "-c", "copy", "-f", output_format(ext), output]
+
+
+def transcode_command(ffmpeg_path, source, output, codec_args):
+    return [ffmpeg_path, "-hide_banner", "-loglevel", "error", "-nostdin", "-y", "-i", source,
+            *codec_args, output]
+
+
+def run_measured(command, started_callback=None, reap_lock=None):
+    """명령을 실행하고 (종료 코드, 오류 출력, CPU 시간)을 반환합니다.
+
+    POSIX에서는 os.wait4로 그 프로세스만의 CPU 시간(사용자+시스템)을 잽니다. 잴 수 없으면 None입니다.
+    거두기(reap)와 returncode 설정은 reap_lock 안에서 하므로, 같은 잠금 안에서 returncode가 None일 때만
+    kill하면 이미 거둔(재사용됐을 수 있는) pid에 신호를 보내지 않습니다.
+    """
+    reap_lock = reap_lock or threading.Lock()
+    process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE, text=True)
+    if started_callback is not None:
+        started_callback(process)
+    with process.stderr:
+        error = process.stderr.read().strip()  # 프로세스가 끝나면 닫힘 (-loglevel error라 출력이 작음)
+    if not hasattr(os, 'wait4'):
+        return process.wait(), error, None
+    if hasattr(os, 'waitid'):
+        # 거두지 않고 끝나기만 기다림 (잠금을 잡은 채 오래 막히지 않도록)
+        try:
+            os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+        except ChildProcessError:
+            pass  # 아래 wait4에서 처리
+    with reap_lock:
+        try:
+            _, status, usage = os.wait4(process.pid, 0)
+        except ChildProcessError:
+            # 다른 곳에서 이미 거둠: CPU 시간은 잴 수 없음
+            return process.wait(), error, None
+        process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, error, usage.ru_utime + usage.ru_stime
+
+
+def kill_unreaped(process):
+    """아직 거두지 않은 프로세스를 죽입니다. reap_lock 안에서 불러야 합니다.
+
+    Popen.kill은 먼저 poll()로 프로세스를 거둬 버리므로 POSIX에서는 pid로 직접 신호를 보냅니다.
+    """
+    if process.returncode is not None:
+        return
+    if not hasattr(os, 'wait4'):
+        process.kill()
+        return
+    try:
+        os.kill(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+class PostProcessTask:
+    """후처리 풀에서 실행할 ffmpeg 작업 하나 (병합, 리먹스, 변환)."""
+
+    def __init__(self, job_id, kind, command, output, priority=0, on_done=None, fallback_command=None):
+        self.job_id = job_id
+        self.kind = kind  # "merge", "remux", "transcode"
+        self.command = command
+        self.fallback_command = fallback_command  # 하드웨어 인코더가 실패하면 다시 실행할 소프트웨어 명령
+        self.output = output
+        self.priority = priority
+        self.sequence = 0
+        self.on_done = on_done  # 풀 스레드에서 task를 인자로 호출됨
+        self.process = None
+        self.process_lock = threading.Lock()  # 프로세스 거두기와 kill을 직렬화
+        self.cancelled = False
+        self.error = None
+        self.queued_at = time.monotonic()
+        self.wait_time = 0.0  # 대기열에서 기다린 시간 (초)
+        self.wall_time = None  # ffmpeg 실행 시간 (초)
+        self.cpu_time = None  # ffmpeg가 쓴 CPU 시간 (초, 잴 수 없으면 None)
+
+    def __lt__(self, other):
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+    def run(self):
+        self.wait_time = time.monotonic() - self.queued_at
+        started = time.monotonic()
+        try:
+            returncode, error, self.cpu_time = run_measured(self.command, self.process_started, self.process_lock)
+            if returncode != 0 and not self.cancelled and self.fallback_command is not None:
+                # 인코더 목록에 있어도 장치가 없으면 실패하므로 소프트웨어 인코더로 한 번 더
+                event_log.warning("encoder_fallback", job=self.job_id, kind=self.kind, error=error)
+                returncode, error, self.cpu_time = run_measured(self.fallback_command, self.process_started,
+                                                                 self.process_lock)
+            if returncode != 0 and not self.cancelled:
+                self.error = f"ffmpeg {self.kind} 실패: {error or f'exit code {returncode}'}"
+        except Exception as e:
+            self.error = str(e)
+        self.wall_time = time.monotonic() - started
+        if self.cancelled:
+            try:
+                os.remove(self.output)
+            except OSError:
+                pass
+
+    def process_started(self, process):
+        with self.process_lock:
+            self.process = process
+            if self.cancelled:
+                kill_unreaped(process)
+
+    def cancel(self):
+        self.cancelled = True
+        with self.process_lock:
+            if self.process is not None:
+                kill_unreaped(self.process)
+
+    def summary(self):
+        """사람이 읽는 요약 (예: "CPU 3.2초 / 실행 1.5초")."""
+        cpu = f"CPU {self.cpu_time:.1f}초 / " if self.cpu_time is not None else ""
+        return f"{cpu}실행 {self.wall_time or 0:.1f}초"
+
+
+class PostProcessPool:
+    """끝난 다운로드의 병합/리먹스/변환을 CPU 코어 수만큼의 스레드에서 우선순위 순으로 실행합니다.
+
+    다운로드 작업은 task를 넣고 바로 끝나므로 네트워크 슬롯을 병합 시간 동안 붙잡지 않습니다.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.condition = threading.Condition()
+        self.heap = []
+        self.running = set()
+        self.sequence = itertools.count()
+        self.threads = []
+
+    def submit(self, task):
+        with self.condition:
+            task.sequence = next(self.sequence)
+            task.queued_at = time.monotonic()
+            heapq.heappush(self.heap, task)
+            if len(self.threads) < self.max_workers and len(self.heap) > self.idle_workers():
+                thread = threading.Thread(target=self._worker, daemon=True)
+                self.threads.append(thread)
+                thread.start()
+            self.condition.notify()
+        return task
+
+    def idle_workers(self):
+        return len(self.threads) - len(self.running)
+
+    def cancel(self, task):
+        """대기 중이면 빼고, 실행 중이면 ffmpeg를 멈춥니다. 두 경우 모두 on_done이 호출됩니다."""
+        with self.condition:
+            queued = task in self.heap
+            if queued:
+                self.heap.remove(task)
+                heapq.heapify(self.heap)
+        task.cancel()
+        if queued and task.on_done is not None:
+            task.on_done(task)
+
+    def stats(self):
+        with self.condition:
+            return {"queued": len(self.heap), "running": len(self.running), "max_workers": self.max_workers}
+
+    def _worker(self):
+        while True:
+            with self.condition:
+                while not self.heap:
+                    self.condition.wait()
+                task = heapq.heappop(self.heap)
+                self.running.add(task)
+            try:
+                task.run()
+                if task.on_done is not None:
+                    task.on_done(task)
+            except Exception as e:
+                print(f"Error in post-processing job {task.job_id}: {e}")
+            finally:
+                with self.condition:
+                    self.running.discard(task)
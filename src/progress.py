@@ -0,0 +1,34 @@
+import threading
+
+
+class ProgressTable:
+    """다운로드 워커들이 진행 상황을 기록하는 공유 테이블입니다.
+
+    워커는 update()로 최신 값만 덮어쓰고, GUI는 타이머에서 drain()으로 바뀐 행만 가져갑니다.
+    같은 행의 여러 업데이트는 하나로 합쳐집니다.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records = {}  # row -> (progress, time_left, is_merged_format, is_video, speed, connections)
+        self.dirty = set()
+
+    def update(self, row, progress, time_left, is_merged_format, is_video, speed=0, connections=0):
+        record = (progress, time_left, is_merged_format, is_video, speed, connections)
+        with self.lock:
+            if self.records.get(row) != record:
+                self.records[row] = record
+                self.dirty.add(row)
+
+    def drain(self, rows=None):
+        """마지막 drain 이후 바뀐 행들의 최신 값을 반환합니다. rows를 주면 그 행만 가져갑니다."""
+        with self.lock:
+            targets = self.dirty if rows is None else self.dirty.intersection(rows)
+            changed = {row: self.records[row] for row in targets}
+            self.dirty.difference_update(changed)
+        return changed
+
+    def remove(self, row):
+        with self.lock:
+            self.records.pop(row, None)
+            self.dirty.discard(row)
@@ -0,0 +1,296 @@
+"""모든 작업이 함께 쓰는 재시도 정책과 호스트별 차단기(circuit breaker).
+
+서버가 요청을 제한하면(HTTP 429, Retry-After가 있는 403/503) 작업마다 따로 곧바로 재시도하지 않고,
+지수 백오프 + 지터로 기다립니다. 한 호스트에서 제한이 이어지면 차단기가 열려 그 호스트로 가는
+모든 요청을 잠시 멈추고, 차단기가 닫히면(대기 시간이 지나면) 기다리던 작업을 다시 대기열에 넣습니다.
+Qt를 import하지 않습니다.
+"""
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from metrics import event_log
+
+THROTTLE_STATUS = 429  # 서버가 요청을 제한할 때 주는 응답
+# 403은 대개 만료된 URL(다시 추출함)이므로 Retry-After가 있을 때만 제한으로 봄
+THROTTLE_WITH_RETRY_AFTER = (403, 503)
+MAX_RETRIES = 10  # yt-dlp의 retries/fragment_retries와 구간 다운로드 재시도 횟수
+THROTTLE_RETRIES = 3  # 요청 하나가 429를 받았을 때 공유 핸들러에서 바로 다시 보내는 횟수
+CANCEL_POLL_SECONDS = 0.25  # 백오프/시험 요청을 기다리는 동안 취소를 확인하는 간격
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+# 여러 서버가 함께 제한되는 사이트: 이 도메인의 하위 호스트는 차단기 하나를 씁니다.
+# 목록에 없는 호스트는 전체 호스트 이름을 씁니다 (끝 두 부분으로 묶으면 *.co.uk처럼 공용 접미사 아래의
+# 서로 다른 사이트가 한 차단기에 묶임).
+HOST_GROUPS = (
+    'googlevideo.com',  # rr1---sn-….googlevideo.com
+    'youtube.com',
+    'ytimg.com',
+    'ggpht.com',
+    'googleusercontent.com',
+    'vimeocdn.com',
+    'akamaized.net',
+    'cloudfront.net',
+)
+
+
+def host_key(url_or_host):
+    """차단기를 나누는 단위. HOST_GROUPS의 도메인은 그 도메인으로 묶고, 나머지는 호스트 이름 그대로입니다."""
+    host = urlsplit(url_or_host).hostname if '://' in url_or_host else url_or_host
+    host = (host or '').lower().rstrip('.')
+    for group in HOST_GROUPS:
+        if host == group or host.endswith('.' + group):
+            return group
+    return host
+
+
+def is_throttle(status, retry_after=None):
+    """서버가 요청을 제한했다는 응답인지. 429는 항상, 403/503은 Retry-After가 있을 때만 그렇게 봅니다."""
+    return status == THROTTLE_STATUS or (status in THROTTLE_WITH_RETRY_AFTER and bool(retry_after))
+
+
+class CircuitOpenError(Exception):
+    """차단기가 열린 호스트로 요청하려 한 경우. 작업은 실패하지 않고 차단기가 닫힐 때까지 기다립니다."""
+
+    def __init__(self, host, retry_at):
+        super().__init__(f"{host} 서버가 요청을 제한하고 있어 {max(0, retry_at - time.time()):.0f}초 동안 멈춥니다")
+        self.host = host
+        self.retry_at = retry_at
+
+
+class WaitCancelled(Exception):
+    """백오프나 다른 작업의 시험 요청을 기다리는 사이 작업이 취소된 경우."""
+
+    def __init__(self):
+        super().__init__("Download cancelled")
+
+
+def find_circuit_error(error):
+    """yt-dlp가 감싼 예외 안에서 CircuitOpenError를 찾습니다."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, CircuitOpenError):
+            return error
+        seen.add(id(error))
+        exc_info = getattr(error, 'exc_info', None)
+        error = (exc_info[1] if exc_info else None) or error.__cause__ or error.__context__
+    return None
+
+
+class RetryPolicy:
+    """지수 백오프 + full jitter. n번째 재시도는 0 ~ min(최대, 기본 × 배수^(n-1))초 사이에서 기다립니다."""
+
+    def __init__(self, base_delay=1.0, factor=2.0, max_delay=60.0, max_retries=MAX_RETRIES):
+        self.base_delay = base_delay
+        self.factor = factor
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+
+    def delay(self, attempt):
+        ceiling = min(self.max_delay, self.base_delay * self.factor ** max(0, attempt - 1))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """한 호스트의 차단기.
+
+    window초 안에 제한 응답이 threshold번 오면 열리고(OPEN), cooldown초 뒤 요청 하나만 시험으로
+    보냅니다(HALF_OPEN). 시험 요청이 성공하면 닫히고, 다시 제한되면 대기 시간을 두 배로 늘려 다시 엽니다.
+    """
+
+    def __init__(self, host, threshold=5, window=30.0, cooldown=30.0, max_cooldown=600.0):
+        self.host = host
+        self.threshold = threshold
+        self.window = window
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = CLOSED
+        self.failures = []  # 최근 제한 응답 시각
+        self.retry_at = 0  # OPEN일 때 시험 요청을 보낼 수 있는 시각 (time.time())
+        self.trips = 0
+
+    def before_request(self, now):
+        """요청을 보내도 되면 True, 시험 요청이 진행 중이면 False를 반환하고, 열려 있으면 CircuitOpenError를 냅니다."""
+        if self.state == OPEN:
+            if now < self.retry_at:
+                raise CircuitOpenError(self.host, self.retry_at)
+            self.state = HALF_OPEN  # 이 요청이 시험 요청
+            return True
+        return self.state == CLOSED
+
+    def throttled(self, now):
+        """제한 응답을 기록합니다. 차단기가 새로 열리면 True를 반환합니다."""
+        if self.state == HALF_OPEN:
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self.open(now)
+            return True
+        self.failures = [t for t in self.failures if now - t < self.window] + [now]
+        if self.state == CLOSED and len(self.failures) >= self.threshold:
+            self.open(now)
+            return True
+        return False
+
+    def inconclusive(self):
+        """제한인지 알 수 없는 결과 (연결 오류, 제한이 아닌 오류 응답). 시험 요청이었다면 다음 요청이 다시 시험합니다."""
+        if self.state == HALF_OPEN:
+            self.state = OPEN  # retry_at이 지났으므로 다음 before_request가 곧바로 시험 요청이 됨
+
+    def succeeded(self):
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self.cooldown = self.base_cooldown
+        self.failures.clear()
+
+    def open(self, now):
+        self.state = OPEN
+        self.trips += 1
+        self.failures.clear()
+        # 차단기가 닫힐 때 모든 작업이 동시에 몰리지 않도록 대기 시간에도 지터를 줌
+        self.retry_at = now + self.cooldown * random.uniform(1.0, 1.25)
+
+
+class RetryEngine:
+    """재시도 정책과 호스트별 차단기를 관리합니다. 요청을 보내는 쪽(http_pool)이 before_request/after_request를,
+    작업은 sleep_function()으로 만든 yt-dlp retry_sleep_functions를 씁니다."""
+
+    def __init__(self, policy=None, **breaker_options):
+        self.policy = policy or RetryPolicy()
+        self.breaker_options = breaker_options
+        self.breakers = {}  # 호스트 키 -> CircuitBreaker
+        self.listeners = {}  # 호스트 키 -> [차단기가 닫히면(대기 시간이 지나면) 부를 함수]
+        self.condition = threading.Condition()
+        self.local = threading.local()  # 스레드별 on_retry와 is_cancelled (bind())
+
+    def _breaker(self, host):
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(host, **self.breaker_options)
+        return breaker
+
+    def _cancel_check(self, is_cancelled):
+        return is_cancelled if is_cancelled is not None else getattr(self.local, 'is_cancelled', None)
+
+    def before_request(self, url, is_cancelled=None):
+        """요청 직전에 부릅니다. 차단기가 열려 있으면 CircuitOpenError를 내고,
+        다른 작업의 시험 요청이 진행 중이면 그 결과가 나올 때까지 기다립니다.
+        기다리는 사이 is_cancelled(없으면 bind()한 함수)가 참이 되면 WaitCancelled를 냅니다."""
+        host = host_key(url)
+        is_cancelled = self._cancel_check(is_cancelled)
+        with self.condition:
+            while not self._breaker(host).before_request(time.time()):
+                if is_cancelled is not None and is_cancelled():
+                    raise WaitCancelled()
+                self.condition.wait(CANCEL_POLL_SECONDS)
+
+    def wait(self, seconds, is_cancelled=None):
+        """백오프 시간만큼 기다립니다. 그 사이 작업이 취소되면 WaitCancelled를 냅니다."""
+        is_cancelled = self._cancel_check(is_cancelled)
+        deadline = time.monotonic() + seconds
+        while True:
+            if is_cancelled is not None and is_cancelled():
+                raise WaitCancelled()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, CANCEL_POLL_SECONDS))
+
+    def after_request(self, url, status, retry_after=None):
+        """응답을 받은 뒤 부릅니다. status는 HTTP 상태 코드이며, 연결 오류처럼 응답이 없으면 None입니다.
+        retry_after는 응답의 Retry-After 헤더 값입니다.
+
+        응답이 없거나 제한이 아닌 오류 응답(만료된 URL의 403 등)은 차단기 상태를 바꾸지 않으며, 시험 요청이었다면
+        차단기를 다시 열어 다음 요청이 시험하게 합니다.
+        """
+        host = host_key(url)
+        with self.condition:
+            breaker = self._breaker(host)
+            if is_throttle(status, retry_after):
+                if breaker.throttled(time.time()):
+                    event_log.warning("circuit_open", host=host, retry_in=round(breaker.retry_at - time.time(), 1),
+                                      trips=breaker.trips)
+                    # 데몬 스레드여야 대기 시간(최대 max_cooldown) 동안 프로그램 종료를 막지 않음
+                    timer = threading.Timer(max(0, breaker.retry_at - time.time()), self._notify_closed, (host,))
+                    timer.daemon = True
+                    timer.start()
+            elif status is not None and status < 400:
+                breaker.succeeded()
+            else:
+                breaker.inconclusive()
+            self.condition.notify_all()
+
+    def _notify_closed(self, host):
+        with self.condition:
+            breaker = self.breakers.get(host)
+            if breaker is not None and breaker.state == OPEN and breaker.retry_at > time.time():
+                return  # 그 사이 다시 열림 (새 타이머가 알림)
+            listeners = self.listeners.pop(host, [])
+        for listener in listeners:
+            try:
+                listener()
+            except Exception as e:
+                print(f"Error in circuit listener for {host}: {e}")
+
+    def when_closed(self, host, callback):
+        """host의 차단기가 닫히면(이미 닫혀 있으면 바로) callback을 부릅니다."""
+        with self.condition:
+            breaker = self.breakers.get(host)
+            if breaker is not None and breaker.state == OPEN and breaker.retry_at > time.time():
+                self.listeners.setdefault(host, []).append(callback)
+                return
+        callback()
+
+    def is_open(self, url_or_host):
+        host = host_key(url_or_host)
+        with self.condition:
+            breaker = self.breakers.get(host)
+            return breaker is not None and breaker.state == OPEN and breaker.retry_at > time.time()
+
+    def is_closed(self, url_or_host):
+        """차단기가 닫혀 있어 평소대로 요청해도 되는지 (한 번도 제한받지 않은 호스트 포함)."""
+        host = host_key(url_or_host)
+        with self.condition:
+            breaker = self.breakers.get(host)
+            return breaker is None or breaker.state == CLOSED
+
+    def stats(self):
+        with self.condition:
+            return {host: {'state': b.state, 'trips': b.trips, 'retry_at': b.retry_at}
+                    for host, b in self.breakers.items() if b.trips}
+
+    def bind(self, on_retry, is_cancelled=None):
+        """이 스레드에서 보내는 요청이 429로 다시 보내질 때 on_retry(기다릴 시간)를 부르고,
+        is_cancelled()가 참이면 기다리지 않고 멈춥니다. None이면 해제."""
+        self.local.on_retry = on_retry
+        self.local.is_cancelled = is_cancelled
+
+    def throttle_delay(self, attempt, retry_after=None):
+        """429를 받은 요청을 다시 보내기 전에 기다릴 시간. 서버가 Retry-After(초)를 주면 그 값을 따릅니다."""
+        if retry_after is not None:
+            delay = min(retry_after, self.policy.max_delay)
+        else:
+            delay = self.policy.delay(attempt)
+        on_retry = getattr(self.local, 'on_retry', None)
+        if on_retry is not None:
+            on_retry(delay)
+        return delay
+
+    def sleep_function(self, on_retry=None):
+        """yt-dlp retry_sleep_functions에 넣을 함수. n번째 재시도 전에 기다릴 시간(초)을 반환합니다.
+
+        on_retry(기다릴 시간)가 있으면 재시도마다 부릅니다 (작업별 재시도 수/백오프 시간 기록).
+        """
+        def sleep(n):  # yt-dlp는 첫 재시도에 n=0을 넘김
+            delay = self.policy.delay(n + 1)
+            if on_retry is not None:
+                on_retry(delay)
+            return delay
+        return sleep
+
+
+retry_engine = RetryEngine()
@@ -0,0 +1,233 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from retry_policy import retry_engine, host_key
+
+QUEUED = "queued"
+PAUSED = "paused"
+RUNNING = "running"
+WAITING = "waiting"  # 서버가 요청을 제한해 멈춘 작업 (차단기가 닫히면 다시 QUEUED)
+DONE = "done"
+CANCELLED = "cancelled"
+
+
+class ScheduledJob:
+    def __init__(self, job_id, task, priority, sequence):
+        self.job_id = job_id
+        self.task = task  # run() 메서드를 가진 객체 (DownloadWorker 등)
+        self.priority = priority  # 작을수록 먼저 실행
+        self.sequence = sequence  # 같은 우선순위에서의 순서
+        self.state = QUEUED
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+
+    @property
+    def sort_key(self):
+        return (self.priority, self.sequence)
+
+    @property
+    def wait_time(self):
+        end = self.started_at if self.started_at is not None else time.monotonic()
+        return end - self.enqueued_at
+
+
+class DownloadScheduler:
+    """다운로드 작업을 우선순위 큐에 넣고, 동시에 실행되는 네트워크 작업 수를 제한합니다.
+
+    yt-dlp 안에서 실행되는 후처리 단계(수정, 병합)는 CPU 코어 수로 제한되는 별도의 슬롯(postprocess_slot)을
+    사용합니다. 후처리 풀(PostProcessPool)을 쓰는 작업의 병합은 다운로드 슬롯을 반납한 뒤 풀에서 실행됩니다.
+
+    run()이 끝난 작업에 deferred_host가 있으면(호스트의 차단기가 열려 멈춤) 끝난 것으로 치지 않고 WAITING으로 두었다가,
+    차단기가 닫히면 다시 대기열에 넣습니다. 작업 URL(youtube.com)과 실제로 제한된 호스트(googlevideo.com)는 다르므로,
+    같은 사이트의 작업이 멈춘 호스트를 기억해 그 차단기가 닫힐 때까지 그 사이트의 대기 작업을 시작하지 않습니다.
+    """
+
+    def __init__(self, max_downloads=3, max_postprocess=None):
+        self.max_downloads = max_downloads
+        self.max_postprocess = max_postprocess or os.cpu_count() or 2
+        self.postprocess_slot = threading.BoundedSemaphore(self.max_postprocess)
+        self.lock = threading.Lock()
+        self.heap = []  # (sort_key, job_id) - 상태가 QUEUED인 작업만 유효
+        self.jobs = {}
+        self.running = 0
+        self.sequence = itertools.count()
+        self.completed_waits = []  # 최근 시작된 작업들의 대기 시간
+        self.held_hosts = set()  # 차단기가 열려 대기 작업을 붙잡아 둔 호스트
+        self.blocked_sites = {}  # 작업 URL의 호스트 키 -> 그 사이트의 작업을 멈춘 호스트 (deferred_host)
+
+    def submit(self, job_id, task, priority=0, paused=False):
+        with self.lock:
+            job = ScheduledJob(job_id, task, priority, next(self.sequence))
+            self.jobs[job_id] = job
+            if paused:
+                job.state = PAUSED
+            else:
+                heapq.heappush(self.heap, (job.sort_key, job_id))
+        self._dispatch()
+        return job
+
+    def set_max_downloads(self, max_downloads):
+        with self.lock:
+            self.max_downloads = max(1, max_downloads)
+        self._dispatch()
+
+    def state(self, job_id):
+        job = self.jobs.get(job_id)
+        return job.state if job else None
+
+    def cancel(self, job_id):
+        """대기 중인 작업을 큐에서 제거합니다. 실행 중인 작업은 작업 쪽에서 취소해야 합니다."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job and job.state in (QUEUED, PAUSED, WAITING):
+                job.state = CANCELLED
+                del self.jobs[job_id]
+                return True
+        return False
+
+    def pause(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job and job.state == QUEUED:
+                job.state = PAUSED
+                return True
+        return False
+
+    def resume(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if not job or job.state != PAUSED:
+                return False
+            job.state = QUEUED
+            heapq.heappush(self.heap, (job.sort_key, job_id))
+        self._dispatch()
+        return True
+
+    def move_up(self, job_id):
+        return self._move(job_id, -1)
+
+    def move_down(self, job_id):
+        return self._move(job_id, 1)
+
+    def _move(self, job_id, direction):
+        """대기 중인 작업의 순서를 바로 앞/뒤의 대기 작업과 바꿉니다."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if not job or job.state not in (QUEUED, PAUSED):
+                return False
+            waiting = sorted((j for j in self.jobs.values() if j.state in (QUEUED, PAUSED)),
+                             key=lambda j: j.sort_key)
+            index = waiting.index(job) + direction
+            if index < 0 or index >= len(waiting):
+                return False
+            other = waiting[index]
+            job.priority, other.priority = other.priority, job.priority
+            job.sequence, other.sequence = other.sequence, job.sequence
+            self.heap = [(j.sort_key, j.job_id) for j in waiting if j.state == QUEUED]
+            heapq.heapify(self.heap)
+            return True
+
+    def queued_jobs(self):
+        """대기 중(일시정지 포함)인 작업 ID를 실행될 순서대로 반환합니다."""
+        with self.lock:
+            waiting = [j for j in self.jobs.values() if j.state in (QUEUED, PAUSED)]
+        return [j.job_id for j in sorted(waiting, key=lambda j: j.sort_key)]
+
+    def stats(self):
+        with self.lock:
+            queued = [j for j in self.jobs.values() if j.state == QUEUED]
+            paused = sum(1 for j in self.jobs.values() if j.state == PAUSED)
+            waiting = sum(1 for j in self.jobs.values() if j.state == WAITING)
+            recent_waits = self.completed_waits[-50:]
+            return {
+                "queued": len(queued),
+                "paused": paused,
+                "waiting": waiting,
+                "running": self.running,
+                "max_downloads": self.max_downloads,
+                "oldest_wait": max((j.wait_time for j in queued), default=0),
+                "average_wait": sum(recent_waits) / len(recent_waits) if recent_waits else 0,
+            }
+
+    def _dispatch(self):
+        to_start = []
+        held = []
+        newly_held = set()
+        with self.lock:
+            while self.heap and self.running < self.max_downloads:
+                sort_key, job_id = heapq.heappop(self.heap)
+                job = self.jobs.get(job_id)
+                if job is None or job.state != QUEUED or job.sort_key != sort_key:
+                    continue  # 취소/일시정지되었거나 순서가 바뀐 오래된 항목
+                host = self._blocking_host(getattr(job.task, 'url', None))
+                if host is not None:
+                    held.append((sort_key, job_id))  # 차단기가 닫힐 때까지 뒤의 다른 호스트 작업을 먼저 시작
+                    if host not in self.held_hosts:
+                        self.held_hosts.add(host)
+                        newly_held.add(host)
+                    continue
+                job.state = RUNNING
+                job.started_at = time.monotonic()
+                self.completed_waits.append(job.wait_time)
+                del self.completed_waits[:-50]
+                self.running += 1
+                to_start.append(job)
+            for entry in held:
+                heapq.heappush(self.heap, entry)
+        for job in to_start:
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        for host in newly_held:
+            retry_engine.when_closed(host, lambda host=host: self._release_host(host))
+
+    def _blocking_host(self, url):
+        """url의 작업을 지금 시작하면 막힐 차단기가 열린 호스트. 없으면 None입니다. self.lock 안에서 부릅니다."""
+        if not url:
+            return None
+        site = host_key(url)
+        for host in (site, self.blocked_sites.get(site)):
+            if host is not None and retry_engine.is_open(host):
+                return host
+        return None
+
+    def _release_host(self, host):
+        with self.lock:
+            self.held_hosts.discard(host)
+            for site in [site for site, blocked in self.blocked_sites.items() if blocked == host]:
+                del self.blocked_sites[site]
+        self._dispatch()
+
+    def _run(self, job):
+        try:
+            job.task.run()
+        except Exception as e:
+            print(f"Error in scheduled job {job.job_id}: {e}")
+        finally:
+            deferred_host = getattr(job.task, 'deferred_host', None)
+            with self.lock:
+                self.running -= 1
+                waiting = bool(deferred_host) and job.state == RUNNING
+                if waiting:
+                    job.state = WAITING
+                    url = getattr(job.task, 'url', None)
+                    if url:
+                        self.blocked_sites[host_key(url)] = deferred_host
+                else:
+                    job.state = DONE
+                    self.jobs.pop(job.job_id, None)
+            if waiting:
+                retry_engine.when_closed(deferred_host, lambda: self._requeue(job))
+            self._dispatch()
+
+    def _requeue(self, job):
+        """차단기가 닫혀 멈췄던 작업을 원래 순서 그대로 다시 대기열에 넣습니다."""
+        with self.lock:
+            if self.jobs.get(job.job_id) is not job or job.state != WAITING:
+                return  # 그 사이 취소됨
+            job.state = QUEUED
+            job.enqueued_at = time.monotonic()
+            job.started_at = None
+            heapq.heappush(self.heap, (job.sort_key, job.job_id))
+        self._dispatch()
@@ -0,0 +1,125 @@
+import itertools
+import threading
+
+from downloader import get_video_formats
+from metadata_cache import normalize_video_key
+
+
+class _Flight:
+    """진행 중인 추출 하나. 같은 영상을 찾는 검색들이 함께 기다립니다."""
+
+    def __init__(self, key, url):
+        self.key = key
+        self.url = url
+        self.cancelled = threading.Event()
+        self.waiters = {}  # 세대 ID -> (on_result, on_error)
+
+
+class SearchCoordinator:
+    """영상 정보 검색을 조율합니다. Qt를 import하지 않습니다.
+
+    - 같은 영상(정규화한 URL)에 대한 동시 검색은 추출 하나를 함께 씁니다 (single-flight).
+    - 검색마다 세대 ID를 붙이고, 가장 최근 검색의 결과만 전달합니다. 새 검색이 시작되면
+      다른 영상의 추출은 취소되며, yt-dlp가 다음 요청을 보내려는 순간 멈춥니다.
+    - prefetch()는 결과를 캐시에만 채워 두므로 나중의 검색이 바로 끝나거나 진행 중인 추출에 합류합니다.
+
+    콜백은 (세대 ID, 결과)를 인자로 추출 스레드(캐시에 있으면 호출한 스레드)에서 호출됩니다.
+    다른 스레드로 넘겨 처리한다면 그때 is_current()로 다시 확인해야 합니다.
+    """
+
+    def __init__(self, ffmpeg_path, metadata_cache=None):
+        self.ffmpeg_path = ffmpeg_path
+        self.metadata_cache = metadata_cache
+        self.lock = threading.Lock()
+        self.generations = itertools.count(1)
+        self.current = 0  # 결과를 받을 검색의 세대 ID
+        self.flights = {}  # 영상 키 -> _Flight
+        self.shared = 0  # 진행 중인 추출에 합류한 검색 수
+        self.cancelled = 0  # 취소한 추출 수
+
+    def search(self, url, on_result, on_error):
+        """url의 정보를 찾습니다. 이 검색의 세대 ID를 반환합니다."""
+        key = normalize_video_key(url)
+        with self.lock:
+            generation = next(self.generations)
+            self.current = generation
+            self._cancel_other_flights(key)
+        info = self.metadata_cache.get(url) if self.metadata_cache is not None else None
+        if info is not None:
+            on_result(generation, info)
+            return generation
+        with self.lock:
+            if generation != self.current:
+                return generation  # 캐시를 보는 사이 다른 검색이 시작됨
+            self._join(key, url).waiters[generation] = (on_result, on_error)
+        return generation
+
+    def prefetch(self, url):
+        """결과를 전달하지 않고 추출만 미리 시작합니다. 화면에 보이는 검색은 취소하지 않습니다."""
+        key = normalize_video_key(url)
+        with self.lock:
+            if key in self.flights:
+                return
+            for flight in list(self.flights.values()):
+                if self.current not in flight.waiters:
+                    self._cancel(flight)  # 이전에 붙여 넣었던 다른 URL의 미리 받기
+        if self.metadata_cache is not None and self.metadata_cache.get(url) is not None:
+            return
+        with self.lock:
+            self._join(key, url)
+
+    def cancel(self):
+        """진행 중인 검색의 결과를 버리고 모든 추출을 취소합니다."""
+        with self.lock:
+            self.current = next(self.generations)
+            self._cancel_other_flights(None)
+
+    def is_current(self, generation):
+        with self.lock:
+            return generation == self.current
+
+    def stats(self):
+        with self.lock:
+            return {"in_flight": len(self.flights), "shared": self.shared, "cancelled": self.cancelled}
+
+    def _join(self, key, url):
+        flight = self.flights.get(key)
+        if flight is not None:
+            self.shared += 1
+            return flight
+        flight = _Flight(key, url)
+        self.flights[key] = flight
+        threading.Thread(target=self._run, args=(flight,), daemon=True).start()
+        return flight
+
+    def _cancel_other_flights(self, key):
+        for flight in list(self.flights.values()):
+            if flight.key != key:
+                self._cancel(flight)
+
+    def _cancel(self, flight):
+        flight.cancelled.set()
+        self.cancelled += 1
+        # 같은 영상을 다시 찾으면 취소된 추출에 합류하지 않고 새로 시작
+        if self.flights.get(flight.key) is flight:
+            del self.flights[flight.key]
+
+    def _run(self, flight):
+        result = error = None
+        try:
+            result = get_video_formats(flight.url, self.ffmpeg_path, self.metadata_cache,
+                                       is_cancelled=flight.cancelled.is_set)
+        except Exception as e:
+            error = e
+        with self.lock:
+            if self.flights.get(flight.key) is flight:
+                del self.flights[flight.key]
+            generation = self.current
+            callbacks = None if flight.cancelled.is_set() else flight.waiters.get(generation)
+        if callbacks is None:
+            return  # 취소되었거나 더 새로운 검색이 있어 결과를 버림
+        on_result, on_error = callbacks
+        if error is None:
+            on_result(generation, result)
+        else:
+            on_error(generation, str(error))
@@ -0,0 +1,199 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fragment_tuner import ungated_thread
+from retry_policy import retry_engine, find_circuit_error
+
+MIN_SEGMENT_SIZE = 1024 * 1024  # 이보다 작은 구간으로는 나누지 않음
+MAX_SEGMENTS = 16
+CHUNK_SIZE = 64 * 1024
+SEGMENT_RETRIES = retry_engine.policy.max_retries  # 구간 하나가 실패했을 때 그 자리부터 다시 시도하는 횟수
+STATE_SAVE_INTERVAL = 1.0  # 구간 진행 상태를 기록하는 최소 간격 (초)
+
+
+def is_segmentable(info):
+    """한 파일을 HTTP로 바로 받는 포맷(비디오+오디오가 합쳐진 진행형 포맷 등)인지 확인합니다."""
+    return (not info.get('requested_formats') and info.get('protocol') in ('http', 'https')
+            and bool(info.get('url')))
+
+
+class SegmentedDownload:
+    """진행형 포맷 하나를 바이트 구간으로 나눠 여러 연결로 동시에 받습니다.
+
+    yt-dlp의 연결 풀(ydl.urlopen)을 함께 쓰고, 미리 크기를 잡아 둔 .part 파일의 각 위치에
+    바로 쓰므로 다 받은 뒤 합치는 복사 단계가 없습니다. 구간별로 받은 바이트 수를 옆의
+    .segments 파일에 기록해 두어, 실패하거나 중단된 구간만 이어받습니다.
+    """
+
+    def __init__(self, ydl, info, path, segments, progress_hook=None, is_cancelled=None, on_retry=None):
+        self.ydl = ydl
+        self.url = info['url']
+        self.headers = dict(info.get('http_headers') or {})
+        self.path = path
+        self.part_path = f"{path}.part"
+        self.state_path = f"{path}.segments"
+        self.segments = max(1, min(segments, MAX_SEGMENTS))
+        self.progress_hook = progress_hook
+        self.is_cancelled = is_cancelled
+        self.on_retry = on_retry  # on_retry(기다릴 시간): 구간을 다시 요청할 때마다 호출
+        self.lock = threading.Lock()
+        self.failed = threading.Event()  # 한 구간이 끝내 실패하면 나머지 구간도 멈춤
+        self.total_bytes = 0
+        self.ranges = []  # [start, end, done] (end 포함)
+        self.started_at = None
+        self.resumed_bytes = 0
+        self.last_saved = 0
+
+    @property
+    def segment_count(self):
+        return len(self.ranges)
+
+    def open(self, start, end=None):
+        from yt_dlp.networking import Request
+        headers = dict(self.headers)
+        headers['Range'] = f"bytes={start}-{'' if end is None else end}"
+        return self.ydl.urlopen(Request(self.url, headers=headers))
+
+    def probe(self):
+        """서버가 구간 요청을 지원하면 전체 크기를, 아니면 None을 반환합니다."""
+        response = self.open(0, 0)
+        try:
+            content_range = response.headers.get('Content-Range') or ''
+            if response.status != 206 or '/' not in content_range:
+                return None
+            total = content_range.rsplit('/', 1)[1]
+            return int(total) if total.isdigit() else None
+        finally:
+            response.close()
+
+    def plan(self, total):
+        """이전 실행의 구간 기록이 맞으면 이어받고, 아니면 새로 나누고 .part 파일 크기를 미리 잡습니다."""
+        self.total_bytes = total
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get('total') == total and os.path.getsize(self.part_path) == total:
+                self.ranges = [list(r) for r in state['ranges']]
+                return
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        count = max(1, min(self.segments, total // MIN_SEGMENT_SIZE))
+        size = -(-total // count)
+        self.ranges = [[start, min(start + size, total) - 1, 0] for start in range(0, total, size)]
+        with open(self.part_path, "wb") as f:
+            if hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(f.fileno(), 0, total)
+            else:
+                f.truncate(total)
+        self.save_state()
+
+    def save_state(self):
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({'url': self.url, 'total': self.total_bytes, 'ranges': self.ranges}, f)
+        os.replace(temp_path, self.state_path)
+        self.last_saved = time.monotonic()
+
+    def run(self):
+        """받기를 마치면 True, 서버가 구간 요청을 지원하지 않거나 나눌 만큼 크지 않으면 False를 반환합니다."""
+        try:
+            total = self.probe()
+        except Exception as e:
+            if find_circuit_error(e) is not None:
+                raise  # 서버가 요청을 제한하는 중이면 yt-dlp로 넘기지 않고 작업을 멈춤
+            return False  # 만료된 URL 등은 yt-dlp가 처리하도록 넘김
+        if not total or total < MIN_SEGMENT_SIZE * 2 or self.segments < 2:
+            return False
+        self.plan(total)
+        self.resumed_bytes = self.downloaded_bytes()
+        self.started_at = time.monotonic()
+
+        pending = [r for r in self.ranges if r[0] + r[2] <= r[1]]
+        try:
+            with ThreadPoolExecutor(max_workers=len(pending) or 1) as executor:
+                for future in [executor.submit(self.fetch, r) for r in pending]:
+                    future.result()
+        except BaseException:
+            self.failed.set()
+            with self.lock:
+                self.save_state()  # 취소/실패해도 받은 구간은 다음에 이어받음
+            raise
+
+        # 구간이 모두 제 위치에 쓰였으므로 이름만 바꾸면 완성 (합치기 복사 없음)
+        os.replace(self.part_path, self.path)
+        try:
+            os.remove(self.state_path)
+        except OSError:
+            pass
+        self.report('finished')
+        return True
+
+    def fetch(self, segment):
+        """구간 하나를 받습니다. 연결이 끊기면 받은 자리부터 다시 요청합니다."""
+        retries = 0
+        # 이 스레드에서 보내는 요청도 작업의 재시도 수를 세고, 취소되면 백오프를 기다리지 않게 함
+        retry_engine.bind(self.on_retry, self.is_cancelled)
+        ungated_thread()  # 구간 연결 수는 segments로 정해지므로 조각 자리 제한을 받지 않음
+        with open(self.part_path, "r+b", buffering=0) as f:
+            while segment[0] + segment[2] <= segment[1]:
+                if self.is_cancelled is not None and self.is_cancelled():
+                    raise Exception("Download cancelled")
+                if self.failed.is_set():
+                    return
+                try:
+                    response = self.open(segment[0] + segment[2], segment[1])
+                    try:
+                        if response.status != 206:
+                            raise Exception(f"서버가 구간 요청을 무시했습니다 (HTTP {response.status})")
+                        f.seek(segment[0] + segment[2])
+                        while segment[0] + segment[2] <= segment[1]:
+                            if self.failed.is_set() or (self.is_cancelled is not None and self.is_cancelled()):
+                                break
+                            chunk = response.read(min(CHUNK_SIZE, segment[1] - segment[0] - segment[2] + 1))
+                            if not chunk:
+                                raise Exception("구간을 받는 중 연결이 끊겼습니다")
+                            f.write(chunk)
+                            with self.lock:
+                                segment[2] += len(chunk)
+                            retries = 0
+                            self.report('downloading')
+                    finally:
+                        response.close()
+                except Exception as e:
+                    if self.is_cancelled is not None and self.is_cancelled():
+                        raise
+                    retries += 1
+                    if retries > SEGMENT_RETRIES or find_circuit_error(e) is not None:
+                        self.failed.set()
+                        raise
+                    delay = retry_engine.policy.delay(retries)
+                    if self.on_retry is not None:
+                        self.on_retry(delay)
+                    retry_engine.wait(delay, self.is_cancelled)
+
+    def downloaded_bytes(self):
+        return sum(r[2] for r in self.ranges)
+
+    def report(self, status):
+        """yt-dlp의 진행 훅과 같은 형식으로 전체 진행 상황을 알립니다. 여러 구간 스레드에서 호출됩니다."""
+        with self.lock:
+            downloaded = self.downloaded_bytes()
+            elapsed = time.monotonic() - self.started_at
+            if status == 'downloading' and time.monotonic() - self.last_saved >= STATE_SAVE_INTERVAL:
+                self.save_state()
+            if self.progress_hook is None:
+                return
+            # 훅이 대역폭 제한으로 기다리는 동안 다른 구간도 멈추도록 잠금 안에서 호출
+            self.progress_hook({
+                'status': status,
+                'filename': self.path,
+                'tmpfilename': self.part_path,
+                'downloaded_bytes': downloaded,
+                'total_bytes': self.total_bytes,
+                'speed': (downloaded - self.resumed_bytes) / elapsed if elapsed > 0 else None,
+                'elapsed': elapsed,
+            })
@@ -0,0 +1,83 @@
+import json
+import os
+import sys
+import time
+
+from app_paths import get_app_data_directory
+
+# 가장 먼저 import되어야 이후 단계 시간을 잴 수 있음 (main.py 첫 줄에서 import)
+_started = time.perf_counter()
+
+REPORT_FILE = "startup_times.jsonl"
+MAX_REPORTS = 200  # 기록 파일에 남길 최근 실행 수
+PHASES = ("imports", "window", "first_paint", "search_ready")
+
+
+def time_before_main():
+    """프로세스 시작부터 이 모듈을 import할 때까지의 시간(초). 알 수 없는 플랫폼에서는 None입니다.
+
+    PyInstaller --onefile 번들의 압축 해제와 인터프리터 초기화 시간이 여기에 들어갑니다.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    process_age = uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    return max(0.0, process_age - (time.perf_counter() - _started))
+
+
+class StartupTimer:
+    """시작 단계(import, 창 생성, 첫 화면 그리기, 검색 준비)별 시간을 재고 기록합니다.
+
+    각 단계는 프로세스에서 startup 모듈을 처음 import한 시점부터의 경과 시간입니다. 모든 단계가
+    기록되면 앱 데이터 폴더의 startup_times.jsonl에 한 줄씩 남기고, YTD_STARTUP_REPORT가 설정되어
+    있으면 요약을 출력합니다.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.before_main = time_before_main()
+        self.reported = False
+
+    def mark(self, phase):
+        """phase를 처음 지날 때의 시간을 기록합니다. 같은 단계를 다시 지나면 무시합니다."""
+        if phase not in self.phases:
+            self.phases[phase] = time.perf_counter() - _started
+            if all(p in self.phases for p in PHASES):
+                self.report()
+
+    def summary(self):
+        parts = [f"{phase} {self.phases[phase] * 1000:.0f}ms" for phase in PHASES if phase in self.phases]
+        if self.before_main is not None:
+            parts.insert(0, f"before_main {self.before_main * 1000:.0f}ms")
+        return ", ".join(parts)
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+        record = {
+            "time": round(time.time(), 3),
+            "frozen": bool(getattr(sys, 'frozen', False)),
+            "before_main": None if self.before_main is None else round(self.before_main, 4),
+            "phases": {phase: round(seconds, 4) for phase, seconds in self.phases.items()},
+        }
+        if os.environ.get("YTD_STARTUP_REPORT"):
+            print(f"Startup: {self.summary()}")
+        try:
+            path = os.path.join(get_app_data_directory(), REPORT_FILE)
+            lines = []
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    lines = f.readlines()[-(MAX_REPORTS - 1):]
+            lines.append(json.dumps(record) + "\n")
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(lines)
+        except OSError as e:
+            print(f"Error writing startup report: {e}")
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,106 @@
+import os
+import subprocess
+import time
+
+from postprocess import output_format
+
+STREAMABLE_PROTOCOLS = ('http', 'https')
+
+
+def is_streamable(info):
+    """비디오/오디오를 따로 받아 합쳐야 하고, 두 스트림 모두 ffmpeg가 직접 받을 수 있는 HTTP URL인지 확인합니다."""
+    formats = info.get('requested_formats') or []
+    return len(formats) > 1 and all(f.get('protocol') in STREAMABLE_PROTOCOLS and f.get('url') for f in formats)
+
+
+class StreamingMux:
+    """비디오와 오디오 스트림을 받는 동시에 ffmpeg 하나로 합칩니다.
+
+    ffmpeg가 두 URL을 직접 읽어 스트림 복사(-c copy)로 .part 파일에 쓰므로 .fNNN 중간 파일과
+    다 받은 뒤의 병합 단계가 없습니다. 진행 상황은 ffmpeg의 -progress 출력으로 알립니다.
+    """
+
+    def __init__(self, ffmpeg_path, info, path, ext, progress_hook=None):
+        self.ffmpeg_path = ffmpeg_path
+        self.formats = info['requested_formats']
+        self.duration = info.get('duration')
+        self.path = path
+        self.part_path = f"{path}.part"
+        self.ext = ext
+        self.progress_hook = progress_hook
+        self.process = None
+        self.stopped = False
+
+    def command(self):
+        command = [self.ffmpeg_path, "-hide_banner", "-loglevel", "error", "-nostats", "-y"]
+        for fmt in self.formats:
+            headers = fmt.get('http_headers') or {}
+            if headers:
+                command += ["-headers", "".join(f"{key}: {value}\r\n" for key, value in headers.items())]
+            command += ["-i", fmt['url']]
+        for index, fmt in enumerate(self.formats):
+            command += ["-map", f"{index}:{fmt.get('manifest_stream_number', 0)}"]
+        command += ["-c", "copy", "-f", output_format(self.ext), "-progress", "pipe:1",
+                    self.part_path]
+        return command
+
+    def run(self):
+        if self.stopped:
+            raise Exception("Download cancelled")
+        started = time.monotonic()
+        self.process = subprocess.Popen(self.command(), stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE, text=True)
+        try:
+            status = {}
+            for line in self.process.stdout:
+                key, _, value = line.strip().partition("=")
+                status[key] = value
+                if key == "progress":
+                    # 한 블록(total_size, out_time_us, ..., progress)이 끝날 때마다 알림
+                    self.report(status, time.monotonic() - started)
+                    status = {}
+            self.process.wait()
+        except BaseException:
+            self.stop()
+            raise
+        finally:
+            error = self.process.stderr.read().strip()
+            self.process.stderr.close()
+            self.process.stdout.close()
+        if self.stopped:
+            raise Exception("Download cancelled")
+        if self.process.returncode != 0:
+            raise Exception(f"ffmpeg 스트리밍 병합 실패: {error or f'exit code {self.process.returncode}'}")
+
+        os.replace(self.part_path, self.path)
+        if self.progress_hook is not None:
+            size = os.path.getsize(self.path)
+            self.progress_hook({'status': 'finished', 'filename': self.path, 'downloaded_bytes': size,
+                                'total_bytes': size, 'elapsed': time.monotonic() - started})
+
+    def report(self, status, elapsed):
+        if self.progress_hook is None:
+            return
+        try:
+            written = int(status.get("total_size") or 0)
+            out_seconds = int(status.get("out_time_us") or 0) / 1000000
+        except ValueError:
+            return
+        total = 0
+        if self.duration and out_seconds > 0:
+            total = int(written * self.duration / min(out_seconds, self.duration))
+        self.progress_hook({
+            'status': 'downloading',
+            'filename': self.path,
+            'tmpfilename': self.part_path,
+            'downloaded_bytes': written,
+            'total_bytes': total or None,
+            'speed': written / elapsed if elapsed > 0 else None,
+            'elapsed': elapsed,
+        })
+
+    def stop(self):
+        """ffmpeg를 멈춥니다. 작업 취소 시 다른 스레드에서 호출됩니다."""
+        self.stopped = True
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
@@ -0,0 +1,167 @@
+import hashlib
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QBuffer, QIODevice, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+
+from app_paths import get_cache_directory
+from disk_cache import DiskCache
+from http_pool import shared_pools
+
+
+def scale_image(image, size):
+    """size는 (최대 너비, 최대 높이)이며 0은 제한 없음을 뜻합니다."""
+    width, height = size
+    if width and height:
+        return image.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatio,
+                            Qt.TransformationMode.SmoothTransformation)
+    if height:
+        return image.scaledToHeight(height, Qt.TransformationMode.SmoothTransformation)
+    if width:
+        return image.scaledToWidth(width, Qt.TransformationMode.SmoothTransformation)
+    return image
+
+
+def cache_name(url, size):
+    digest = hashlib.sha1(f"{url}|{size[0]}x{size[1]}".encode("utf-8")).hexdigest()
+    return f"{digest}.png"
+
+
+class ThumbnailTaskSignals(QObject):
+    finished = pyqtSignal(str, object, object)  # url, {size: QImage}, 원본 QImage (없으면 None)
+
+
+class ThumbnailTask(QRunnable):
+    """썸네일 하나를 받아서 요청된 크기들로 디코딩/스케일링합니다. GUI 스레드 밖에서 실행됩니다."""
+
+    def __init__(self, url, sizes, session, disk_cache, source=None):
+        super().__init__()
+        self.url = url
+        self.sizes = sizes
+        self.session = session  # 세션을 반환하는 함수 (디스크 캐시에 없을 때만 호출)
+        self.disk_cache = disk_cache
+        self.source = source  # 이미 받아둔 원본이 있으면 다시 받지 않음
+        self.signals = ThumbnailTaskSignals()
+
+    def run(self):
+        images = {}
+        missing = []
+        for size in self.sizes:
+            data = self.disk_cache.read(cache_name(self.url, size))
+            image = QImage()
+            if data is not None and image.loadFromData(data):
+                images[size] = image
+            else:
+                missing.append(size)
+
+        source = self.source
+        if missing and source is None:
+            try:
+                response = self.session().get(self.url, timeout=10)
+                image = QImage()
+                if response.status_code == 200 and image.loadFromData(response.content):
+                    source = image
+            except Exception as e:
+                print(f"Error loading thumbnail: {e}")
+
+        if source is not None:
+            for size in missing:
+                image = scale_image(source, size)
+                images[size] = image
+                self.disk_cache.write(cache_name(self.url, size), self.encode(image))
+
+        self.signals.finished.emit(self.url, images, source)
+
+    @staticmethod
+    def encode(image):
+        buffer = QBuffer()
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        image.save(buffer, "PNG")
+        return bytes(buffer.data())
+
+
+class ThumbnailService(QObject):
+    """썸네일을 백그라운드에서 받아 메모리 + 디스크에 캐시하고, 준비되면 시그널로 전달합니다.
+
+    같은 URL에 대한 요청은 크기가 달라도 한 번만 내려받습니다.
+    """
+    thumbnail_ready = pyqtSignal(str, object, QPixmap)  # url, (width, height), pixmap
+    thumbnail_failed = pyqtSignal(str, object)  # url, (width, height)
+
+    def __init__(self, max_memory_items=256, max_disk_bytes=50 * 1024 * 1024, max_threads=4, parent=None):
+        super().__init__(parent)
+        self.max_memory_items = max_memory_items
+        self.memory = OrderedDict()  # (url, size) -> QPixmap
+        self.sources = OrderedDict()  # url -> 원본 QImage (다른 크기 요청 시 재사용)
+        self.disk_cache = DiskCache(get_cache_directory("thumbnails"), max_disk_bytes)
+        self.pending = {}  # url -> {size: [callback, ...]}
+        self.in_flight = set()  # 작업이 진행 중인 URL
+        self.threadpool = QThreadPool()
+        self.threadpool.setMaxThreadCount(max_threads)
+        self.max_threads = max_threads
+
+    @staticmethod
+    def session():
+        # 다운로드/추출과 같은 호스트별 연결 풀을 씀 (requests는 처음 네트워크로 받을 때 작업 스레드에서 import)
+        return shared_pools.session()
+
+    def request(self, url, size, callback=None):
+        """캐시에 있으면 바로 QPixmap을 반환하고, 없으면 None을 반환한 뒤 준비되면 알려줍니다.
+
+        callback은 GUI 스레드에서 QPixmap(실패 시 None)을 인자로 호출됩니다.
+        """
+        size = tuple(size)
+        key = (url, size)
+        pixmap = self.memory.get(key)
+        if pixmap is not None:
+            self.memory.move_to_end(key)
+            if callback:
+                callback(pixmap)
+            return pixmap
+
+        callbacks = self.pending.setdefault(url, {}).setdefault(size, [])
+        if callback:
+            callbacks.append(callback)
+        if url not in self.in_flight:
+            self._start_task(url, self.sources.get(url))
+        return None
+
+    def prefetch(self, url, sizes):
+        for size in sizes:
+            self.request(url, size)
+
+    def _start_task(self, url, source=None):
+        self.in_flight.add(url)
+        task = ThumbnailTask(url, list(self.pending[url]), self.session, self.disk_cache, source)
+        task.signals.finished.connect(self.task_finished)
+        self.threadpool.start(task)
+
+    def task_finished(self, url, images, source):
+        self.in_flight.discard(url)
+        waiting = self.pending.get(url, {})
+        for size, image in images.items():
+            pixmap = QPixmap.fromImage(image)
+            key = (url, size)
+            self.memory[key] = pixmap
+            self.memory.move_to_end(key)
+            for callback in waiting.pop(size, []):
+                callback(pixmap)
+            self.thumbnail_ready.emit(url, size, pixmap)
+        while len(self.memory) > self.max_memory_items:
+            self.memory.popitem(last=False)
+
+        if source is not None:
+            self.sources[url] = source
+            self.sources.move_to_end(url)
+            while len(self.sources) > 8:
+                self.sources.popitem(last=False)
+
+        if waiting and (source is not None or images):
+            # 작업 도중 들어온 다른 크기 요청은 다시 처리 (원본이 있으면 재사용)
+            self._start_task(url, source)
+            return
+        for size in list(waiting):
+            for callback in waiting.pop(size):
+                callback(None)
+            self.thumbnail_failed.emit(url, size)
+        self.pending.pop(url, None)
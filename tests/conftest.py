@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 앱 모듈은 src/에서 바로 import됨 (패키지가 아님)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,131 @@
+import pytest
+
+import bandwidth
+from bandwidth import BandwidthGovernor, BURST_SECONDS, ACTIVE_SECONDS
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(bandwidth.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(bandwidth.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_unlimited_never_waits(clock):
+    governor = BandwidthGovernor()
+    governor.consume("a", 10 ** 9)
+    assert governor.job_rate() == 0
+    assert clock.sleeps == []
+
+
+def test_total_rate_is_shared_by_active_jobs(clock):
+    governor = BandwidthGovernor(total_rate=1000)
+    for job in "abcd":
+        governor.register(job)
+        governor.consume(job, 1)
+    assert governor.job_rate() == 250
+    governor.unregister("d")
+    assert governor.job_rate() == pytest.approx(1000 / 3)
+
+
+def test_idle_job_does_not_take_a_share(clock):
+    governor = BandwidthGovernor(total_rate=1000)
+    governor.register("active")
+    governor.register("idle")  # 추출이나 병합 중인 작업
+    governor.consume("active", 500)
+    assert governor.job_rate() == 1000
+    start = clock.now
+    for _ in range(20):
+        governor.consume("active", 500)
+    assert 20 * 500 / (clock.now - start) == pytest.approx(1000, rel=0.05)
+
+
+def test_job_stops_counting_after_going_idle(clock):
+    governor = BandwidthGovernor(total_rate=1000)
+    governor.consume("a", 100)
+    governor.consume("b", 100)
+    assert governor.job_rate() == 500
+    clock.now += ACTIVE_SECONDS + 1
+    governor.consume("a", 100)
+    assert governor.job_rate() == 1000
+
+
+def test_per_job_rate_caps_fair_share(clock):
+    governor = BandwidthGovernor(total_rate=1000, per_job_rate=100)
+    governor.consume("a", 1)
+    governor.consume("b", 1)
+    assert governor.job_rate() == 100
+    governor.set_per_job_rate(0)
+    assert governor.job_rate() == 500
+
+
+def test_consume_waits_for_fair_share(clock):
+    governor = BandwidthGovernor(total_rate=1000)
+    governor.consume("b", 1)
+    clock.sleeps.clear()
+    governor.consume("a", 500)  # 쉬던 작업은 BURST_SECONDS만큼 몰아 받을 수 있음
+    assert clock.sleeps[-1] == pytest.approx(1.0 - BURST_SECONDS)
+    governor.consume("b", 1)  # b가 계속 받는 중
+    governor.consume("a", 500)  # 이후에는 작업당 500 B/s
+    assert clock.sleeps[-1] == pytest.approx(1.0)
+
+
+def test_two_jobs_get_equal_throughput(clock):
+    governor = BandwidthGovernor(total_rate=1000)
+    governor.register("a")
+    governor.register("b")
+    received = {"a": 0, "b": 0}
+    start = clock.now
+    while clock.now - start < 20:
+        for job in ("a", "b"):
+            governor.consume(job, 100)
+            received[job] += 100
+    elapsed = clock.now - start
+    assert received["a"] == received["b"]
+    assert (received["a"] + received["b"]) / elapsed == pytest.approx(1000, rel=0.05)
+
+
+def test_rate_change_applies_to_next_consume(clock):
+    governor = BandwidthGovernor(total_rate=1000)
+    governor.register("a")
+    governor.consume("a", 1000)
+    governor.set_total_rate(2000)
+    governor.consume("a", 1000)
+    assert clock.sleeps[-1] == pytest.approx(0.5)  # 이전 한도였으면 1초
+
+
+def test_cancel_event_interrupts_wait(clock):
+    class Event:
+        waited = None
+
+        def wait(self, seconds):
+            self.waited = seconds
+
+    event = Event()
+    governor = BandwidthGovernor(total_rate=100)
+    governor.consume("a", 1000, event)
+    assert event.waited == pytest.approx(10 - BURST_SECONDS)
+    assert clock.sleeps == []
+
+
+def test_throughput_uses_recent_window(clock):
+    governor = BandwidthGovernor()
+    governor.consume("a", 3000)
+    assert governor.throughput("a") == pytest.approx(3000 / bandwidth.THROUGHPUT_WINDOW)
+    clock.now += bandwidth.THROUGHPUT_WINDOW + 1
+    assert governor.throughput("a") == 0
+    assert governor.throughput("missing") == 0
@@ -0,0 +1,33 @@
+import json
+import sys
+
+import cli
+
+
+def test_events_go_to_stdout_and_stdout_is_restored(tmp_path, capsys, monkeypatch):
+    def run(args, events):
+        print("engine log")  # 엔진의 print 로그
+        events.emit("summary", submitted=0)
+        return 0
+    monkeypatch.setattr(cli, "run", run)
+    stdout = sys.stdout
+
+    assert cli.main(["-o", str(tmp_path)]) == 0
+
+    assert sys.stdout is stdout
+    captured = capsys.readouterr()
+    assert [json.loads(line)["event"] for line in captured.out.splitlines()] == ["summary"]
+    assert captured.err == "engine log\n"
+
+
+def test_empty_input_writes_only_json_events(tmp_path, capsys):
+    urls = tmp_path / "urls.txt"
+    urls.write_text("# 빈 목록\n", encoding="utf-8")
+    stdout = sys.stdout
+
+    code = cli.main(["-i", str(urls), "-o", str(tmp_path), "--no-cache", "--no-library"])
+
+    assert code == 0
+    assert sys.stdout is stdout
+    events = [json.loads(line)["event"] for line in capsys.readouterr().out.splitlines()]
+    assert events[0] == "summary" and "connections" in events
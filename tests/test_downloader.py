@@ -0,0 +1,43 @@
+from downloader import download_key
+
+
+def test_same_title_from_different_videos_has_different_keys():
+    format = {'format_id': '137+140'}
+    first = download_key('https://www.youtube.com/watch?v=aaaaaaaaaaa', format)
+    second = download_key('https://www.youtube.com/watch?v=bbbbbbbbbbb', format)
+    assert first != second
+
+
+def test_same_video_links_share_a_key():
+    format = {'format_id': '137+140'}
+    assert download_key('https://youtu.be/aaaaaaaaaaa', format) == \
+        download_key('https://www.youtube.com/watch?v=aaaaaaaaaaa&t=10', format)
+    assert download_key('https://youtu.be/aaaaaaaaaaa', format) != \
+        download_key('https://youtu.be/aaaaaaaaaaa', {'format_id': '22'})
+
+
+def test_other_sites_are_keyed_by_url():
+    format = {'format_id': 'hls-720'}
+    assert download_key('https://vimeo.com/1', format) != download_key('https://vimeo.com/2', format)
+
+
+def test_streaming_merge_skipped_while_host_is_throttled(tmp_path, monkeypatch):
+    import downloader
+    from downloader import DownloadJob
+    from retry_policy import RetryEngine
+
+    engine = RetryEngine(threshold=1)
+    monkeypatch.setattr(downloader, "retry_engine", engine)
+    started = []
+    monkeypatch.setattr(downloader, "StreamingMux", lambda *args: started.append(args))
+    selected = {'requested_formats': [
+        {'url': 'https://rr1---sn-a.googlevideo.com/videoplayback?itag=137', 'protocol': 'https'},
+        {'url': 'https://rr1---sn-a.googlevideo.com/videoplayback?itag=140', 'protocol': 'https'},
+    ]}
+    job = DownloadJob(1, 'https://www.youtube.com/watch?v=aaaaaaaaaaa', {'format_id': '137+140', 'ext': 'mp4'},
+                      str(tmp_path), "video", "ffmpeg", stream_merge=True)
+    job.full_path = str(tmp_path / "video.mp4")
+
+    engine.after_request(selected['requested_formats'][0]['url'], 429)
+    assert job.download_streaming(selected) is False
+    assert started == []
@@ -0,0 +1,104 @@
+import os
+import threading
+
+from filenames import FilenameReserver
+
+
+def test_reserve_creates_placeholders_in_order(tmp_path):
+    reserver = FilenameReserver()
+    paths = [reserver.reserve(tmp_path, "video", "mp4") for _ in range(3)]
+    assert [os.path.basename(p) for p in paths] == ["video.mp4", "video_1.mp4", "video_2.mp4"]
+    assert all(os.path.getsize(p) == 0 for p in paths)
+
+
+def test_reserve_skips_existing_files(tmp_path):
+    (tmp_path / "video.mp4").write_bytes(b"data")
+    assert os.path.basename(FilenameReserver().reserve(tmp_path, "video", "mp4")) == "video_1.mp4"
+
+
+def test_file_created_after_scan_is_not_overwritten(tmp_path):
+    reserver = FilenameReserver()
+    reserver.reserve(tmp_path, "other", "mp4")  # 디렉터리 색인을 만듦
+    (tmp_path / "video.mp4").write_bytes(b"data")  # 색인 뒤에 다른 프로세스가 만든 파일
+    path = reserver.reserve(tmp_path, "video", "mp4")
+    assert os.path.basename(path) == "video_1.mp4"
+    assert (tmp_path / "video.mp4").read_bytes() == b"data"
+
+
+def test_concurrent_reservations_are_unique(tmp_path):
+    reserver = FilenameReserver()
+    paths = []
+    lock = threading.Lock()
+
+    def reserve():
+        path = reserver.reserve(tmp_path, "video", "mp4")
+        with lock:
+            paths.append(path)
+
+    threads = [threading.Thread(target=reserve) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(paths)) == 20
+
+
+def test_released_name_is_reused_lowest_first(tmp_path):
+    reserver = FilenameReserver()
+    paths = [reserver.reserve(tmp_path, "video", "mp4") for _ in range(4)]
+    reserver.release(paths[2])
+    reserver.release(paths[1])
+    assert not os.path.exists(paths[1])
+    assert reserver.reserve(tmp_path, "video", "mp4") == paths[1]
+    assert reserver.reserve(tmp_path, "video", "mp4") == paths[2]
+    assert os.path.basename(reserver.reserve(tmp_path, "video", "mp4")) == "video_4.mp4"
+
+
+def test_release_keeps_file_with_content(tmp_path):
+    reserver = FilenameReserver()
+    path = reserver.reserve(tmp_path, "video", "mp4")
+    with open(path, "wb") as f:
+        f.write(b"partial")
+    reserver.release(path)
+    assert os.path.exists(path)
+    assert reserver.reserve(tmp_path, "video", "mp4") != path
+
+
+def test_committed_name_is_not_reused(tmp_path):
+    reserver = FilenameReserver()
+    path = reserver.reserve(tmp_path, "video", "mp4")
+    reserver.commit(path)
+    assert reserver.reserve(tmp_path, "video", "mp4") != path
+
+
+def test_claim_blocks_name(tmp_path):
+    reserver = FilenameReserver()
+    reserver.claim(tmp_path / "video.mp4")
+    assert os.path.basename(reserver.reserve(tmp_path, "video", "mp4")) == "video_1.mp4"
+
+
+def test_retained_name_is_not_reused(tmp_path):
+    reserver = FilenameReserver()
+    path = reserver.reserve(tmp_path, "video", "mp4")
+    reserver.retain(path)
+    assert not os.path.exists(path)  # 빈 자리표시 파일은 지움
+    assert reserver.reserve(tmp_path, "video", "mp4") != path
+
+
+def test_failed_job_keeps_name_for_same_title_from_other_video(tmp_path, monkeypatch):
+    import downloader
+    from downloader import DownloadJob
+
+    reserver = FilenameReserver()
+    monkeypatch.setattr(downloader, "filename_reserver", reserver)
+    format = {"format_id": "137+140", "ext": "mp4"}
+    failed = DownloadJob(1, "https://www.youtube.com/watch?v=aaaaaaaaaaa", format, str(tmp_path), "video", None)
+    failed.full_path = reserver.reserve(tmp_path, "video", "mp4")
+    leftover = tmp_path / "video.f137.mp4.part"  # 실패한 작업이 남긴 중간 파일
+    leftover.write_bytes(b"other video")
+    failed.fail("HTTP Error 500")
+
+    path = reserver.reserve(tmp_path, "video", "mp4")  # 같은 제목의 다른 영상
+    assert path != failed.full_path
+    assert not os.path.basename(path).startswith("video.")
+    assert leftover.read_bytes() == b"other video"
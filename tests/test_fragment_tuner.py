@@ -0,0 +1,166 @@
+import threading
+import time
+
+import pytest
+
+import fragment_tuner
+from fragment_tuner import (FragmentTuner, FragmentGate, tuning_key, ungated_thread, INITIAL_CONCURRENCY,
+                            MIN_CONCURRENCY, MAX_CONCURRENCY)
+
+
+def test_starts_small_per_key():
+    tuner = FragmentTuner()
+    assert tuner.concurrency("Youtube") == INITIAL_CONCURRENCY
+    tuner.report("Youtube", INITIAL_CONCURRENCY, 1000)
+    assert tuner.concurrency("Vimeo") == INITIAL_CONCURRENCY
+
+
+def test_additive_increase_while_throughput_improves():
+    tuner = FragmentTuner()
+    concurrency = tuner.concurrency("Youtube")
+    for throughput in (1000, 1500, 2000):
+        concurrency = tuner.report("Youtube", concurrency, throughput)
+    assert concurrency == INITIAL_CONCURRENCY + 3
+    assert tuner.concurrency("Youtube") == concurrency
+
+
+def test_holds_when_throughput_is_flat():
+    tuner = FragmentTuner()
+    tuner.report("Youtube", 4, 1000)
+    assert tuner.report("Youtube", 5, 1050) == 5
+
+
+def test_steps_back_when_throughput_drops():
+    tuner = FragmentTuner()
+    tuner.report("Youtube", 4, 1000)
+    assert tuner.report("Youtube", 5, 800) == 4
+
+
+def test_multiplicative_decrease_on_errors():
+    tuner = FragmentTuner()
+    assert tuner.report("Youtube", 8, 5000, errors=2) == 4
+    assert tuner.report("Youtube", 4, 9000, errors=1) == 2  # 처리량이 좋아져도 오류가 있으면 줄임
+
+
+def test_bounds():
+    tuner = FragmentTuner()
+    assert tuner.report("Youtube", MIN_CONCURRENCY, 100, errors=1) == MIN_CONCURRENCY
+    assert tuner.report("Youtube", MAX_CONCURRENCY, 10 ** 9) == MAX_CONCURRENCY
+
+
+def test_tuning_key_separates_host_and_stream_kind():
+    video = {'url': 'https://rr1---sn-abc.googlevideo.com/videoplayback', 'vcodec': 'avc1', 'acodec': 'none'}
+    audio = {'url': 'https://rr5---sn-xyz.googlevideo.com/videoplayback', 'vcodec': 'none', 'acodec': 'opus'}
+    other = {'fragment_base_url': 'https://cdn.example.org/hls/', 'vcodec': 'avc1', 'acodec': 'mp4a'}
+    assert tuning_key(video) == ('googlevideo.com', 'video')
+    assert tuning_key(audio) == ('googlevideo.com', 'audio')
+    assert tuning_key(other) == ('cdn.example.org', 'av')
+    assert tuning_key({'extractor_key': 'Generic'}) == ('generic', 'unknown')
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.headers = {'Content-Length': str(len(body))}
+        self.body = body
+        self.closed = False
+
+    def read(self, amt=None):
+        if amt is None:
+            amt = len(self.body)
+        data, self.body = self.body[:amt], self.body[amt:]
+        return data
+
+    def close(self):
+        self.closed = True
+
+
+def run_in_thread(target):
+    result = {}
+
+    def run():
+        try:
+            result['value'] = target()
+        except Exception as e:
+            result['error'] = e
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, result
+
+
+def test_gate_limits_transfers_and_limit_changes_while_running():
+    gate = FragmentGate(limit=1)
+    urlopen = gate.wrap(lambda request: FakeResponse(b'x' * 10))
+    first = urlopen('frag1')
+    assert gate.active() == 1
+
+    second, result = run_in_thread(lambda: urlopen('frag2'))
+    second.join(0.3)
+    assert second.is_alive()  # 자리가 없어 기다림
+
+    gate.set_limit(2)
+    second.join(2)
+    assert not second.is_alive() and 'value' in result
+    first.read(4)
+    assert gate.active() == 1  # 끝난 스레드의 자리는 빠지고, 아직 다 읽지 않은 응답은 자리를 쥐고 있음
+
+
+def test_gate_releases_after_content_length_without_eof_read():
+    gate = FragmentGate(limit=1)
+    urlopen = gate.wrap(lambda request: FakeResponse(b'x' * 10))
+    response = urlopen('frag1')
+    response.read(6)
+    response.read(4)
+    assert gate.active() == 0
+    thread, result = run_in_thread(lambda: urlopen('frag2'))
+    thread.join(2)
+    assert 'value' in result
+
+
+def test_gate_releases_on_close_and_failed_open():
+    gate = FragmentGate(limit=1)
+    gate.wrap(lambda request: FakeResponse(b'x' * 10))('frag1').close()
+    assert gate.active() == 0
+
+    def fail(request):
+        raise OSError("connection refused")
+    with pytest.raises(OSError):
+        gate.wrap(fail)('frag2')
+    assert gate.active() == 0
+
+
+def test_gate_drops_stale_and_dead_holders(monkeypatch):
+    gate = FragmentGate(limit=1)
+    urlopen = gate.wrap(lambda request: FakeResponse(b'x' * 10))
+    thread, _ = run_in_thread(lambda: urlopen('abandoned'))
+    thread.join(2)
+    assert gate.active() == 0  # 응답을 버리고 끝난 스레드의 자리
+
+    urlopen('kept')
+    now = time.monotonic()
+    monkeypatch.setattr(fragment_tuner.time, 'monotonic', lambda: now + fragment_tuner.STALE_HOLD_SECONDS + 1)
+    assert gate.active() == 0
+
+
+def test_ungated_thread_bypasses_gate():
+    gate = FragmentGate(limit=1)
+    urlopen = gate.wrap(lambda request: FakeResponse(b'x' * 10))
+    urlopen('fragment')
+
+    def job_thread():
+        ungated_thread()
+        return urlopen('manifest')
+    thread, result = run_in_thread(job_thread)
+    thread.join(2)
+    assert 'value' in result
+    assert gate.active() == 1
+
+
+def test_gate_wait_stops_when_cancelled():
+    cancelled = threading.Event()
+    gate = FragmentGate(limit=1, is_cancelled=cancelled.is_set)
+    urlopen = gate.wrap(lambda request: FakeResponse(b'x' * 10))
+    urlopen('frag1')
+    thread, result = run_in_thread(lambda: urlopen('frag2'))
+    cancelled.set()
+    thread.join(2)
+    assert not thread.is_alive() and 'error' in result
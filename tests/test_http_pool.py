@@ -0,0 +1,111 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_pool import ConnectionPools, PoolStats, pool_stats
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def host_stats(host):
+    return dict(pool_stats.snapshot()["hosts"].get(host, {'requests': 0, 'reused': 0, 'connections': 0}))
+
+
+def test_summary_counts_only_explicit_reuse():
+    stats = PoolStats()
+    stats.request("a")  # 연결에 실패한 요청
+    snapshot = stats.snapshot()
+    assert snapshot["requests"] == 1
+    assert snapshot["reused"] == 0
+    assert snapshot["reuse_ratio"] == 0.0
+
+    stats.connected("a", 0.2)
+    stats.request("a")
+    stats.request("a", reused=True)
+    snapshot = stats.snapshot()
+    assert snapshot["hosts"]["a"]["reuse_ratio"] == pytest.approx(1 / 3)
+    assert snapshot["average_handshake"] == pytest.approx(0.2)
+
+
+def test_keep_alive_connection_is_reused(server):
+    pytest.importorskip("requests")
+    before = host_stats("127.0.0.1")
+    session = ConnectionPools().session()
+    for _ in range(3):
+        assert session.get(server + "/a").content == b"ok"
+    after = host_stats("127.0.0.1")
+    assert after["requests"] - before["requests"] == 3
+    assert after["connections"] - before["connections"] == 1
+    assert after["reused"] - before["reused"] == 2
+
+
+def test_failed_connect_is_not_counted_as_reuse():
+    requests = pytest.importorskip("requests")
+    before = host_stats("example.invalid")
+    with pytest.raises(requests.ConnectionError):
+        ConnectionPools().session().get("http://example.invalid/", timeout=5)
+    after = host_stats("example.invalid")
+    assert after["connections"] == before["connections"]
+    assert after["reused"] == before["reused"]
+
+
+def test_snapshot_sums_hosts():
+    stats = PoolStats()
+    stats.connected("a", 0.1)
+    stats.request("a")
+    stats.request("a", reused=True)
+    stats.connected("b", 0.3)
+    stats.request("b")
+    snapshot = stats.snapshot()
+    assert (snapshot["requests"], snapshot["reused"], snapshot["connections"]) == (3, 1, 2)
+    assert snapshot["reuse_ratio"] == pytest.approx(1 / 3)
+    assert snapshot["average_handshake"] == pytest.approx(0.2)
+    assert snapshot["hosts"]["b"]["reuse_ratio"] == 0.0
+
+
+def test_pool_size_by_host_suffix():
+    pools = ConnectionPools(default_size=4)
+    assert pools.pool_size("rr3---sn-abc.googlevideo.com") == 16
+    assert pools.pool_size("googlevideo.com") == 16
+    assert pools.pool_size("notgooglevideo.com") == 4
+    pools.configure(default_size=32)
+    assert pools.pool_size("rr3---sn-abc.googlevideo.com") == 32  # 기본값이 더 크면 기본값
+    pools.configure(host_sizes={"example.org": 64})
+    assert pools.pool_size("cdn.example.org") == 64
+
+
+def test_yt_dlp_requests_share_the_pool(server):
+    pytest.importorskip("requests")
+    from http_pool import load_yt_dlp
+
+    yt_dlp = load_yt_dlp()
+    before = host_stats("127.0.0.1")
+    for _ in range(2):
+        with yt_dlp.YoutubeDL({"quiet": True}) as ydl:  # 작업마다 새 YoutubeDL을 만들어도 연결을 이어 씀
+            assert ydl.urlopen(server + "/b").read() == b"ok"
+    after = host_stats("127.0.0.1")
+    assert after["requests"] - before["requests"] == 2
+    assert after["reused"] - before["reused"] == 1
@@ -0,0 +1,117 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+import journal
+from journal import JobJournal, QUEUED, RUNNING, PAUSED, FINISHED, FAILED, CANCELLED
+from downloader import cleanup_leftover_files
+
+FORMAT = {"format_id": "137+140", "ext": "mp4"}
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    jobs = JobJournal(str(tmp_path / "jobs.sqlite3"))
+    yield jobs
+    jobs.close()
+
+
+def add(jobs, tmp_path, name, status):
+    job_id = jobs.add_job("https://example.org/" + name, name, FORMAT, str(tmp_path))
+    jobs.set_output_path(job_id, str(tmp_path / f"{name}.mp4"))
+    jobs.set_status(job_id, status)
+    return job_id
+
+
+def test_resumable_jobs_survive_reopen(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    first = JobJournal(path)
+    running = add(first, tmp_path, "running", RUNNING)
+    first.update_progress(running, "running.f137.mp4", 100, 1000, force=True)
+    first.update_progress(running, "running.f140.m4a", 50, 200, force=True)
+    add(first, tmp_path, "done", FINISHED)
+    paused = add(first, tmp_path, "paused", PAUSED)
+    first.close()  # 비정상 종료 뒤 다시 시작
+
+    second = JobJournal(path)
+    restored = second.resumable_jobs()
+    second.close()
+    assert [job["id"] for job in restored] == [running, paused]
+    assert restored[0]["format"] == FORMAT
+    assert restored[0]["downloaded_bytes"] == 150 and restored[0]["total_bytes"] == 1200
+    assert restored[0]["files"] == {"running.f137.mp4": [100, 1000], "running.f140.m4a": [50, 200]}
+
+
+def test_progress_writes_are_throttled(jobs, tmp_path, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(journal.time, "monotonic", lambda: now[0])
+    job_id = add(jobs, tmp_path, "video", RUNNING)
+    jobs.update_progress(job_id, "video.mp4", 10, 100)
+    jobs.update_progress(job_id, "video.mp4", 20, 100)  # 1초 안: 메모리에만 기록
+    assert jobs.resumable_jobs()[0]["downloaded_bytes"] == 10
+    now[0] += journal.PROGRESS_WRITE_INTERVAL
+    jobs.update_progress(job_id, "video.mp4", 30, 100)
+    assert jobs.resumable_jobs()[0]["downloaded_bytes"] == 30
+
+
+def test_pending_cleanup_lists_failed_and_cancelled_jobs(jobs, tmp_path):
+    failed = add(jobs, tmp_path, "failed", FAILED)
+    cancelled = add(jobs, tmp_path, "cancelled", CANCELLED)
+    add(jobs, tmp_path, "finished", FINISHED)
+    add(jobs, tmp_path, "queued", QUEUED)
+
+    pending = {job["id"]: job for job in jobs.pending_cleanup()}
+    assert set(pending) == {failed, cancelled}
+    assert pending[failed]["status"] == FAILED
+    assert pending[failed]["output_path"] == str(tmp_path / "failed.mp4")
+
+    jobs.mark_cleaned(failed)
+    assert [job["id"] for job in jobs.pending_cleanup()] == [cancelled]
+
+
+def test_pending_cleanup_skips_path_reused_by_later_job(jobs, tmp_path):
+    failed = jobs.add_job("https://example.org/a", "video", FORMAT, str(tmp_path))
+    jobs.set_output_path(failed, str(tmp_path / "video.mp4"))
+    jobs.set_status(failed, FAILED)
+    retry = jobs.add_job("https://example.org/a", "video", FORMAT, str(tmp_path))
+    jobs.set_output_path(retry, str(tmp_path / "video.mp4"))  # 같은 경로로 다시 받는 중
+
+    assert jobs.pending_cleanup() == []
+    jobs.set_status(retry, CANCELLED)
+    assert [job["id"] for job in jobs.pending_cleanup()] == [retry]  # 앞의 작업은 정리됨으로 표시됨
+
+
+def test_cleanup_keeps_failed_output_and_removes_intermediates(jobs, tmp_path):
+    add(jobs, tmp_path, "failed", FAILED)
+    add(jobs, tmp_path, "cancelled", CANCELLED)
+    names = ["failed.mp4", "failed.f137.mp4.part", "failed.f140.m4a", "failed.temp.mp4",
+             "cancelled.mp4.part", "cancelled.mp4.segments", "other.mp4.part"]
+    for name in names:
+        (tmp_path / name).write_bytes(b"x")
+
+    cleanup_leftover_files(jobs.pending_cleanup())
+
+    assert sorted(n for n in os.listdir(tmp_path) if not n.startswith("jobs.")) == ["failed.mp4", "other.mp4.part"]
+
+
+def test_migrates_journal_without_cleaned_column(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, title TEXT, "
+        "format_json TEXT NOT NULL, thumbnail_url TEXT, output_dir TEXT NOT NULL, output_path TEXT, "
+        "status TEXT NOT NULL, downloaded_bytes INTEGER NOT NULL DEFAULT 0, total_bytes INTEGER NOT NULL DEFAULT 0, "
+        "files_json TEXT NOT NULL DEFAULT '{}', error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)")
+    connection.execute("INSERT INTO jobs (url, format_json, output_dir, output_path, status, created_at, updated_at) "
+                       "VALUES (?, ?, ?, ?, ?, 0, 0)",
+                       ("https://example.org/a", json.dumps(FORMAT), str(tmp_path), str(tmp_path / "a.mp4"), FAILED))
+    connection.commit()
+    connection.close()
+
+    jobs = JobJournal(path)
+    try:
+        assert [job["output_path"] for job in jobs.pending_cleanup()] == [str(tmp_path / "a.mp4")]
+    finally:
+        jobs.close()
@@ -0,0 +1,104 @@
+import time
+
+import metadata_cache
+from metadata_cache import MetadataCache, EXPIRY_MARGIN
+
+URL = "https://www.youtube.com/watch?v=aaaaaaaaaaa"
+
+
+def make_info(video_id="aaaaaaaaaaa", expire=None):
+    url = "https://rr1---sn.googlevideo.com/videoplayback?itag=22"
+    if expire is not None:
+        url += f"&expire={int(expire)}"
+    return {"id": video_id, "title": video_id, "formats": [{"format_id": "22", "url": url}]}
+
+
+def test_same_video_shares_entry(tmp_path):
+    cache = MetadataCache(tmp_path)
+    cache.put(URL, make_info())
+    assert cache.get("https://youtu.be/aaaaaaaaaaa")["id"] == "aaaaaaaaaaa"
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_get_returns_copy(tmp_path):
+    cache = MetadataCache(tmp_path)
+    cache.put(URL, make_info())
+    cache.get(URL)["title"] = "changed"
+    assert cache.get(URL)["title"] == "aaaaaaaaaaa"
+
+
+def test_default_ttl_expires(tmp_path, monkeypatch):
+    cache = MetadataCache(tmp_path, default_ttl=60)
+    now = time.time()
+    monkeypatch.setattr(metadata_cache.time, "time", lambda: now)
+    cache.put(URL, make_info())
+    assert cache.get(URL) is not None
+    monkeypatch.setattr(metadata_cache.time, "time", lambda: now + 61)
+    assert cache.get(URL) is None
+    assert cache.stats()["disk_entries"] == 0  # 만료된 디스크 항목도 지움
+
+
+def test_url_expiry_shortens_ttl(tmp_path, monkeypatch):
+    cache = MetadataCache(tmp_path, default_ttl=3600)
+    now = time.time()
+    monkeypatch.setattr(metadata_cache.time, "time", lambda: now)
+    cache.put(URL, make_info(expire=now + EXPIRY_MARGIN + 100))
+    monkeypatch.setattr(metadata_cache.time, "time", lambda: now + 99)
+    assert cache.get(URL) is not None
+    monkeypatch.setattr(metadata_cache.time, "time", lambda: now + 101)
+    assert cache.get(URL) is None
+
+
+def test_nearly_expired_info_is_not_stored(tmp_path):
+    cache = MetadataCache(tmp_path)
+    cache.put(URL, make_info(expire=time.time() + EXPIRY_MARGIN - 1))
+    assert cache.get(URL) is None
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_memory_lru_evicts_oldest_and_falls_back_to_disk(tmp_path):
+    cache = MetadataCache(tmp_path, max_memory_entries=2)
+    urls = [f"https://www.youtube.com/watch?v={c * 11}" for c in "abc"]
+    for url in urls[:2]:
+        cache.put(url, make_info(url[-11:]))
+    cache.get(urls[0])  # a를 최근 사용으로
+    cache.put(urls[2], make_info(urls[2][-11:]))
+    assert list(cache.memory) == ["youtube:" + "a" * 11, "youtube:" + "c" * 11]
+    assert cache.get(urls[1])["id"] == "b" * 11
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_entries_survive_new_instance(tmp_path):
+    MetadataCache(tmp_path).put(URL, make_info())
+    cache = MetadataCache(tmp_path)
+    assert cache.get(URL)["id"] == "aaaaaaaaaaa"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_size_limit_evicts_least_recently_used(tmp_path):
+    urls = [f"https://www.youtube.com/watch?v={c * 11}" for c in "abc"]
+    (tmp_path / "probe").mkdir()
+    probe = MetadataCache(tmp_path / "probe")
+    probe.put(urls[0], make_info(urls[0][-11:]))
+    entry_bytes = probe.stats()["disk_bytes"]
+
+    # 항목 두 개 반까지만 들어가는 디스크 캐시 (메모리 캐시는 끔)
+    (tmp_path / "cache").mkdir()
+    cache = MetadataCache(tmp_path / "cache", max_memory_entries=0, max_disk_bytes=entry_bytes * 5 // 2)
+    for url in urls[:2]:
+        cache.put(url, make_info(url[-11:]))
+        time.sleep(0.01)  # mtime 순서
+    cache.get(urls[0])  # a를 최근 사용으로
+    time.sleep(0.01)
+    cache.put(urls[2], make_info(urls[2][-11:]))
+    assert cache.stats()["disk_bytes"] <= entry_bytes * 5 // 2
+    assert cache.get(urls[1]) is None
+    assert cache.get(urls[0]) is not None
+    assert cache.get(urls[2]) is not None
+
+
+def test_invalidate(tmp_path):
+    cache = MetadataCache(tmp_path)
+    cache.put(URL, make_info())
+    cache.invalidate(URL)
+    assert cache.get(URL) is None
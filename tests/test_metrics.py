@@ -0,0 +1,107 @@
+import json
+import urllib.request
+
+import pytest
+
+import metrics
+from metrics import EventLog, JobMetrics, MetricsRegistry, MetricsServer, DEBUG, INFO, OFF
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(metrics.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def test_resumed_file_counts_only_new_bytes(clock):
+    job = JobMetrics(1, "https://example.org/v")
+    clock.now += 0.5
+    job.progress("video.mp4", 50_000_000)  # 이어받기: 이미 받아 둔 50 MB부터 알림
+    clock.now += 1.0
+    job.progress("video.mp4", 51_000_000)
+    assert job.bytes == 1_000_000
+    assert job.ttfb == 0.5
+    assert job.fields()["average_throughput"] == int(1_000_000 / 1.5)
+
+
+def test_bytes_are_summed_per_file(clock):
+    job = JobMetrics(1, "https://example.org/v")
+    for name in ("video.f137.mp4", "audio.f140.m4a"):
+        job.progress(name, 1024)
+        job.progress(name, 4096)
+        job.progress(name, 4096)  # 같은 값이 다시 와도 세지 않음
+    assert job.bytes == 2 * 3072
+
+
+def test_throughput_samples_per_interval(clock):
+    job = JobMetrics(1, "https://example.org/v")
+    job.transfer_started()
+    job.progress("video.mp4", 0)
+    for second in range(1, 4):
+        clock.now += 1.0
+        job.progress("video.mp4", second * 2000)
+    assert job.samples == [[1.0, 2000], [2.0, 2000], [3.0, 2000]]
+
+
+def test_restart_measures_a_new_run(clock):
+    job = JobMetrics(1, "https://example.org/v")
+    job.progress("video.mp4", 0)
+    job.progress("video.mp4", 10)
+    job.start()  # 서버 제한으로 멈췄다 다시 실행
+    job.progress("video.mp4", 10)
+    job.progress("video.mp4", 30)
+    assert job.bytes == 20
+
+
+def test_event_log_drops_lower_levels(tmp_path):
+    path = tmp_path / "events.jsonl"
+    log = EventLog(str(path), level=INFO)
+    log.debug("progress", job=1)
+    log.info("job", job=1, outcome="finished")
+    assert not log.enabled(DEBUG)
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [(r["event"], r["level"]) for r in records] == [("job", "info")]
+
+
+def test_event_log_turns_off_when_unwritable(tmp_path):
+    log = EventLog(str(tmp_path / "missing" / "events.jsonl"))
+    log.info("job")
+    assert log.level == OFF
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    jobs = registry.counter("jobs_total", "jobs")
+    seconds = registry.histogram("job_seconds", "seconds", (1, 5))
+    jobs.inc(outcome="finished")
+    jobs.inc(2, outcome="failed")
+    seconds.observe(0.5)
+    seconds.observe(3)
+    seconds.observe(10)
+    text = registry.render()
+    assert 'jobs_total{outcome="failed"} 2' in text
+    assert 'job_seconds_bucket{le="1"} 1' in text
+    assert 'job_seconds_bucket{le="5"} 2' in text
+    assert 'job_seconds_bucket{le="+Inf"} 3' in text
+    assert "job_seconds_sum 13.5" in text
+
+
+def test_metrics_server_serves_registry():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "jobs").inc()
+    server = MetricsServer(0, metrics_registry=registry)
+    port = server.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert "jobs_total 1" in response.read().decode("utf-8")
+    finally:
+        server.stop()
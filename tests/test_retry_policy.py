@@ -0,0 +1,206 @@
+import threading
+import time
+
+import pytest
+
+import retry_policy
+from retry_policy import (CircuitBreaker, CircuitOpenError, RetryEngine, RetryPolicy, WaitCancelled, CLOSED, OPEN,
+                          HALF_OPEN, host_key, is_throttle, find_circuit_error)
+
+MEDIA_URL = "https://rr3---sn-abc.googlevideo.com/videoplayback?itag=22"
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda low, high: high if low == 0 else low)
+
+
+def trip(breaker, now=100.0):
+    for _ in range(breaker.threshold):
+        opened = breaker.throttled(now)
+    return opened
+
+
+def test_host_key_groups_media_servers():
+    assert host_key(MEDIA_URL) == "googlevideo.com"
+    assert host_key("https://www.youtube.com/watch?v=x") == "youtube.com"
+    assert host_key("http://127.0.0.1:8080/a") == "127.0.0.1"
+
+
+def test_host_key_keeps_unrelated_sites_apart():
+    assert host_key("https://www.bbc.co.uk/iplayer") == "www.bbc.co.uk"
+    assert host_key("https://news.example.co.uk/") != host_key("https://shop.other.co.uk/")
+    assert host_key("https://abc.net.au/") != host_key("https://xyz.com.au/")
+
+
+def test_is_throttle():
+    assert is_throttle(429)
+    assert not is_throttle(403)  # 만료된 URL일 수 있음
+    assert is_throttle(403, "30")
+    assert not is_throttle(None)
+    assert not is_throttle(404, "30")
+
+
+def test_policy_delay_is_bounded_full_jitter():
+    policy = RetryPolicy(base_delay=1, factor=2, max_delay=10)
+    assert [policy.delay(n) for n in (1, 2, 3, 4, 5)] == [1, 2, 4, 8, 10]
+
+
+def test_breaker_opens_after_threshold_in_window():
+    breaker = CircuitBreaker("h", threshold=3, window=10, cooldown=30)
+    assert not breaker.throttled(100)
+    assert not breaker.throttled(105)
+    assert not breaker.throttled(111)  # 첫 번째는 창 밖
+    assert breaker.state == CLOSED
+    assert breaker.throttled(112)
+    assert breaker.state == OPEN
+    assert breaker.retry_at == 112 + 30
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(141)
+
+
+def test_half_open_probe_success_closes():
+    breaker = CircuitBreaker("h", threshold=1, cooldown=30)
+    trip(breaker)
+    assert breaker.before_request(131)  # 시험 요청
+    assert breaker.state == HALF_OPEN
+    assert not breaker.before_request(131)  # 다른 요청은 결과를 기다림
+    breaker.succeeded()
+    assert breaker.state == CLOSED
+    assert breaker.before_request(131)
+
+
+def test_half_open_probe_throttled_doubles_cooldown():
+    breaker = CircuitBreaker("h", threshold=1, cooldown=30, max_cooldown=100)
+    trip(breaker)
+    breaker.before_request(131)
+    assert breaker.throttled(131)
+    assert breaker.state == OPEN
+    assert breaker.retry_at == 131 + 60
+    breaker.before_request(200)
+    breaker.throttled(200)
+    assert breaker.cooldown == 100  # max_cooldown에서 멈춤
+    breaker.before_request(400)
+    breaker.succeeded()
+    assert breaker.cooldown == 30
+
+
+def test_half_open_inconclusive_reopens_for_next_probe():
+    breaker = CircuitBreaker("h", threshold=1, cooldown=30)
+    trip(breaker)
+    breaker.before_request(131)
+    breaker.inconclusive()
+    assert breaker.state == OPEN
+    assert breaker.before_request(132)  # 대기 시간은 이미 지났으므로 다음 요청이 바로 시험
+    assert breaker.state == HALF_OPEN
+
+
+def test_engine_only_real_responses_close_breaker(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(retry_policy.time, "time", lambda: now[0])
+    engine = RetryEngine(threshold=1, cooldown=30)
+    engine.after_request(MEDIA_URL, 429)
+    assert engine.is_open(MEDIA_URL)
+    now[0] = 131
+    engine.before_request(MEDIA_URL)
+    breaker = engine.breakers["googlevideo.com"]
+    engine.after_request(MEDIA_URL, None)  # 연결 오류
+    assert breaker.state == OPEN
+    engine.before_request(MEDIA_URL)
+    engine.after_request(MEDIA_URL, 403)  # 제한이 아닌 오류 응답
+    assert breaker.state == OPEN
+    engine.before_request(MEDIA_URL)
+    engine.after_request(MEDIA_URL, 206)
+    assert breaker.state == CLOSED
+
+
+def test_engine_ignores_expired_url_403():
+    engine = RetryEngine(threshold=2)
+    for _ in range(5):
+        engine.after_request(MEDIA_URL, 403)
+    assert not engine.is_open(MEDIA_URL)
+    engine.after_request(MEDIA_URL, 403, "10")
+    engine.after_request(MEDIA_URL, 403, "10")
+    assert engine.is_open(MEDIA_URL)
+
+
+def test_engine_notifies_listeners_when_closed():
+    engine = RetryEngine(threshold=1, cooldown=0.05)
+    closed = threading.Event()
+    engine.after_request(MEDIA_URL, 429)
+    timers = [t for t in threading.enumerate() if isinstance(t, threading.Timer)]
+    assert timers and all(t.daemon for t in timers)  # 종료를 막지 않음
+    engine.when_closed("googlevideo.com", closed.set)
+    assert not closed.is_set()
+    assert closed.wait(2)
+
+
+def test_when_closed_calls_immediately_if_closed():
+    calls = []
+    RetryEngine().when_closed("googlevideo.com", lambda: calls.append(True))
+    assert calls == [True]
+
+
+def test_sleep_function_counts_first_retry_as_attempt_one():
+    delays = []
+    engine = RetryEngine(RetryPolicy(base_delay=1, factor=2, max_delay=60))
+    sleep = engine.sleep_function(delays.append)
+    assert [sleep(n) for n in (0, 1, 2)] == [1, 2, 4]
+    assert delays == [1, 2, 4]
+
+
+def test_find_circuit_error_unwraps_causes():
+    circuit_error = CircuitOpenError("googlevideo.com", 0)
+    try:
+        try:
+            raise circuit_error
+        except CircuitOpenError as e:
+            raise RuntimeError("wrapped") from e
+    except RuntimeError as wrapped:
+        assert find_circuit_error(wrapped) is circuit_error
+    assert find_circuit_error(ValueError()) is None
+
+
+def test_wait_stops_when_cancelled():
+    cancelled = threading.Event()
+    threading.Timer(0.1, cancelled.set).start()
+    started = time.monotonic()
+    with pytest.raises(WaitCancelled):
+        RetryEngine().wait(30, cancelled.is_set)
+    assert time.monotonic() - started < 2
+
+
+def test_wait_uses_bound_cancel_check():
+    engine = RetryEngine()
+    engine.bind(None, lambda: True)
+    try:
+        with pytest.raises(WaitCancelled):
+            engine.wait(30)
+    finally:
+        engine.bind(None)
+    engine.wait(0.01)  # 해제 후에는 그냥 기다림
+
+
+def test_waiting_for_probe_stops_when_cancelled(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(retry_policy.time, "time", lambda: now[0])
+    engine = RetryEngine(threshold=1, cooldown=30)
+    engine.after_request(MEDIA_URL, 429)
+    now[0] = 131
+    engine.before_request(MEDIA_URL)  # 다른 작업이 시험 요청 중
+    with pytest.raises(WaitCancelled):
+        engine.before_request(MEDIA_URL, lambda: True)
+
+
+def test_engine_is_closed_only_without_throttling(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(retry_policy.time, "time", lambda: now[0])
+    engine = RetryEngine(threshold=1, cooldown=30)
+    assert engine.is_closed(MEDIA_URL)  # 한 번도 제한받지 않은 호스트
+    engine.after_request(MEDIA_URL, 429)
+    assert not engine.is_closed(MEDIA_URL)
+    now[0] = 131
+    engine.before_request(MEDIA_URL)  # 반열림: 시험 요청 중
+    assert not engine.is_open(MEDIA_URL) and not engine.is_closed(MEDIA_URL)
+    engine.after_request(MEDIA_URL, 200)
+    assert engine.is_closed(MEDIA_URL)
@@ -0,0 +1,138 @@
+import threading
+
+import pytest
+
+import search
+from search import SearchCoordinator
+
+VIDEO = "https://www.youtube.com/watch?v=aaaaaaaaaaa"
+SAME_VIDEO = "https://youtu.be/aaaaaaaaaaa"
+OTHER = "https://www.youtube.com/watch?v=bbbbbbbbbbb"
+
+
+class FakeExtractor:
+    """get_video_formats 대역. release()할 때까지 추출이 끝나지 않습니다."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+        self.started = threading.Semaphore(0)
+        self.released = threading.Event()
+        self.cancel_checks = {}
+
+    def __call__(self, url, ffmpeg_path, cache=None, options=None, is_cancelled=None):
+        with self.lock:
+            self.calls.append(url)
+            self.cancel_checks[url] = is_cancelled
+        self.started.release()
+        self.released.wait(5)
+        if url == "error":
+            raise RuntimeError("extract failed")
+        return {"url": url}
+
+    def wait_started(self, count=1):
+        for _ in range(count):
+            assert self.started.acquire(timeout=5)
+
+
+class Results:
+    def __init__(self):
+        self.done = threading.Event()
+        self.items = []
+
+    def on_result(self, generation, info):
+        self.items.append(("result", generation, info))
+        self.done.set()
+
+    def on_error(self, generation, message):
+        self.items.append(("error", generation, message))
+        self.done.set()
+
+
+class FakeCache:
+    def __init__(self, entries):
+        self.entries = entries
+
+    def get(self, url):
+        return self.entries.get(url)
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    extractor = FakeExtractor()
+    monkeypatch.setattr(search, "get_video_formats", extractor)
+    yield extractor
+    extractor.released.set()
+
+
+def test_same_video_searches_share_one_extraction(extractor):
+    coordinator = SearchCoordinator(None)
+    first, second = Results(), Results()
+    coordinator.search(VIDEO, first.on_result, first.on_error)
+    extractor.wait_started()
+    generation = coordinator.search(SAME_VIDEO, second.on_result, second.on_error)
+    extractor.released.set()
+    assert second.done.wait(5)
+
+    assert extractor.calls == [VIDEO]
+    assert second.items == [("result", generation, {"url": VIDEO})]
+    assert first.items == []  # 더 새로운 검색만 결과를 받음
+    assert coordinator.stats() == {"in_flight": 0, "shared": 1, "cancelled": 0}
+
+
+def test_new_search_cancels_other_video(extractor):
+    coordinator = SearchCoordinator(None)
+    first, second = Results(), Results()
+    coordinator.search(VIDEO, first.on_result, first.on_error)
+    extractor.wait_started()
+    coordinator.search(OTHER, second.on_result, second.on_error)
+    extractor.wait_started()
+
+    assert extractor.cancel_checks[VIDEO]()  # yt-dlp가 다음 요청 전에 멈춤
+    assert not extractor.cancel_checks[OTHER]()
+    extractor.released.set()
+    assert second.done.wait(5)
+    assert [item[0] for item in second.items] == ["result"]
+    assert first.items == []
+    assert coordinator.stats()["cancelled"] == 1
+
+
+def test_cached_result_is_returned_without_extraction(extractor):
+    coordinator = SearchCoordinator(None, FakeCache({VIDEO: {"id": "cached"}}))
+    results = Results()
+    generation = coordinator.search(VIDEO, results.on_result, results.on_error)
+    assert results.items == [("result", generation, {"id": "cached"})]
+    assert extractor.calls == []
+
+
+def test_errors_go_to_current_search(extractor):
+    coordinator = SearchCoordinator(None)
+    results = Results()
+    generation = coordinator.search("error", results.on_result, results.on_error)
+    extractor.released.set()
+    assert results.done.wait(5)
+    assert results.items == [("error", generation, "extract failed")]
+
+
+def test_prefetch_is_joined_by_later_search(extractor):
+    coordinator = SearchCoordinator(None)
+    coordinator.prefetch(VIDEO)
+    extractor.wait_started()
+    results = Results()
+    generation = coordinator.search(SAME_VIDEO, results.on_result, results.on_error)
+    extractor.released.set()
+    assert results.done.wait(5)
+    assert extractor.calls == [VIDEO]
+    assert results.items == [("result", generation, {"url": VIDEO})]
+
+
+def test_cancel_drops_results(extractor):
+    coordinator = SearchCoordinator(None)
+    results = Results()
+    generation = coordinator.search(VIDEO, results.on_result, results.on_error)
+    extractor.wait_started()
+    coordinator.cancel()
+    assert not coordinator.is_current(generation)
+    assert extractor.cancel_checks[VIDEO]()
+    extractor.released.set()
+    assert not results.done.wait(0.3)
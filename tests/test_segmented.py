@@ -0,0 +1,124 @@
+import json
+import os
+import re
+
+import pytest
+
+import segmented
+from segmented import SegmentedDownload, is_segmentable
+
+DATA = bytes(range(256)) * 1024  # 256 KiB
+URL = "https://media.example.org/video.mp4"
+
+
+class FakeResponse:
+    def __init__(self, status, body, headers, drop_after=None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.drop_after = drop_after  # 이만큼 보낸 뒤 연결이 끊긴 것처럼 빈 값을 돌려줌
+        self.sent = 0
+
+    def read(self, amt):
+        if self.drop_after is not None and self.sent >= self.drop_after:
+            return b""
+        chunk = self.body[self.sent:self.sent + amt]
+        self.sent += len(chunk)
+        return chunk
+
+    def close(self):
+        pass
+
+
+class FakeYdl:
+    """Range 요청을 data로 답하는 ydl.urlopen 대역."""
+
+    def __init__(self, data=DATA, ranges=True, drop=None):
+        self.data = data
+        self.ranges = ranges
+        self.drop = drop or {}  # 구간 시작 위치 -> 끊기 전에 보낼 바이트 수 (한 번만)
+        self.requests = []
+
+    def urlopen(self, request):
+        start, end = re.fullmatch(r"bytes=(\d+)-(\d*)", request.headers["Range"]).groups()
+        start, end = int(start), int(end) if end else len(self.data) - 1
+        self.requests.append((start, end))
+        if not self.ranges:
+            return FakeResponse(200, self.data, {})
+        headers = {"Content-Range": f"bytes {start}-{end}/{len(self.data)}"}
+        return FakeResponse(206, self.data[start:end + 1], headers, self.drop.pop(start, None))
+
+
+@pytest.fixture(autouse=True)
+def small_segments(monkeypatch):
+    monkeypatch.setattr(segmented, "MIN_SEGMENT_SIZE", 32 * 1024)
+    monkeypatch.setattr(segmented, "CHUNK_SIZE", 4096)
+    monkeypatch.setattr(segmented.retry_engine, "wait", lambda seconds, is_cancelled=None: None)
+
+
+def download(tmp_path, ydl, segments=4, **kwargs):
+    return SegmentedDownload(ydl, {"url": URL}, str(tmp_path / "video.mp4"), segments, **kwargs)
+
+
+def test_is_segmentable():
+    assert is_segmentable({"url": URL, "protocol": "https"})
+    assert not is_segmentable({"url": URL, "protocol": "m3u8_native"})
+    assert not is_segmentable({"url": URL, "protocol": "https", "requested_formats": [{}, {}]})
+
+
+def test_segments_are_written_in_place(tmp_path):
+    ydl = FakeYdl()
+    hooks = []
+    job = download(tmp_path, ydl, progress_hook=hooks.append)
+    assert job.run() is True
+    assert (tmp_path / "video.mp4").read_bytes() == DATA
+    assert sorted(os.listdir(tmp_path)) == ["video.mp4"]  # .part/.segments 없음
+    assert job.segment_count == 4
+    assert sorted(ydl.requests[1:]) == [(0, 65535), (65536, 131071), (131072, 196607), (196608, 262143)]
+    assert hooks[-1]["status"] == "finished" and hooks[-1]["downloaded_bytes"] == len(DATA)
+
+
+def test_falls_back_without_range_support_or_small_files(tmp_path):
+    assert download(tmp_path, FakeYdl(ranges=False)).run() is False
+    assert download(tmp_path, FakeYdl(data=DATA[:40 * 1024])).run() is False
+    assert download(tmp_path, FakeYdl(), segments=1).run() is False
+    assert os.listdir(tmp_path) == []
+
+
+def test_dropped_connection_resumes_from_received_offset(tmp_path):
+    ydl = FakeYdl(drop={65536: 10000})
+    retries = []
+    assert download(tmp_path, ydl, on_retry=retries.append).run() is True
+    assert (tmp_path / "video.mp4").read_bytes() == DATA
+    assert len(retries) == 1
+    assert (65536 + 12288, 131071) in ydl.requests  # 받은 청크 다음 자리부터 다시 요청
+
+
+def test_resumes_only_missing_ranges(tmp_path):
+    part = tmp_path / "video.mp4.part"
+    part.write_bytes(DATA[:100000] + b"\0" * (len(DATA) - 100000))
+    ranges = [[0, 131071, 100000], [131072, 262143, 0]]
+    (tmp_path / "video.mp4.segments").write_text(json.dumps({"url": URL, "total": len(DATA), "ranges": ranges}))
+
+    ydl = FakeYdl()
+    job = download(tmp_path, ydl, segments=2)
+    assert job.run() is True
+    assert job.resumed_bytes == 100000
+    assert sorted(ydl.requests[1:]) == [(100000, 131071), (131072, 262143)]
+    assert (tmp_path / "video.mp4").read_bytes() == DATA
+
+
+def test_cancel_keeps_state_for_next_run(tmp_path):
+    cancelled = []
+    ydl = FakeYdl()
+
+    def hook(d):
+        if d["downloaded_bytes"] >= 64 * 1024:
+            cancelled.append(True)
+    job = download(tmp_path, ydl, progress_hook=hook, is_cancelled=lambda: bool(cancelled))
+    with pytest.raises(Exception, match="cancelled"):
+        job.run()
+    state = json.loads((tmp_path / "video.mp4.segments").read_text())
+    assert state["total"] == len(DATA)
+    assert 0 < sum(r[2] for r in state["ranges"]) < len(DATA)
+    assert not (tmp_path / "video.mp4").exists()